@@ -0,0 +1,252 @@
+# artifacts.py
+import json
+import os
+import posixpath
+from datetime import date, datetime, timezone
+from email.utils import format_datetime
+from html.parser import HTMLParser
+from xml.sax.saxutils import escape
+from manifest import load_json, save_json
+
+ARTIFACTS_PATH = os.path.join(".build", "artifacts.json")
+SITEMAP_FILE = "sitemap.xml"
+FEED_FILE = "feed.xml"
+SEARCH_INDEX_FILE = "search.json"
+ARTIFACT_FILES = (SITEMAP_FILE, FEED_FILE, SEARCH_INDEX_FILE)
+
+# Characters of body text kept per page for the search index and feed
+SEARCH_TEXT_LIMIT = 5000
+SUMMARY_LENGTH = 300
+
+# Pages under this output directory are posts in the RSS feed
+BLOG_DIR = "blog"
+
+_BLOCK_TAGS = {"p", "div", "pre", "blockquote", "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+class PageTextExtractor(HTMLParser):
+    """Collects the visible text of the HTML written to it, up to a limit."""
+
+    def __init__(self, limit=SEARCH_TEXT_LIMIT):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+
+    def write(self, html):
+        if self.size < self.limit:
+            self.feed(html)
+
+    def handle_data(self, data):
+        if self.size < self.limit:
+            self.parts.append(data)
+            self.size += len(data)
+
+    def handle_endtag(self, tag):
+        # Keep words of neighbouring blocks apart
+        if tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def text(self):
+        """Return the collected text with whitespace collapsed."""
+        self.close()
+        return " ".join("".join(self.parts).split())[:self.limit]
+
+class _Tee:
+    def __init__(self, out, extractor):
+        self.out = out
+        self.extractor = extractor
+
+    def write(self, text):
+        self.extractor.write(text)
+        return self.out.write(text)
+
+class CapturedBody:
+    """Page body that also feeds everything it writes into a PageTextExtractor.
+
+    Used as a template value, so the text of a page is collected while the page
+    is written instead of by reading the HTML back afterwards. Any other object
+    with a write method can take the extractor's place.
+    """
+    __slots__ = ("body", "extractor")
+
+    def __init__(self, body, extractor):
+        self.body = body
+        self.extractor = extractor
+
+    def write_to(self, out):
+        tee = _Tee(out, self.extractor)
+        if hasattr(self.body, "write_to"):
+            self.body.write_to(tee)
+        else:
+            tee.write(self.body)
+
+def page_url(output_path, basepath="/"):
+    """Return the URL a page is served at, given its path relative to the output directory."""
+    output_path = output_path.replace(os.sep, "/")
+    if posixpath.basename(output_path) == "index.html":
+        output_path = posixpath.dirname(output_path)
+        if output_path:
+            output_path += "/"
+    return basepath + output_path
+
+class SiteArtifacts:
+    """Per-page data for the sitemap, RSS feed and search index, collected during rendering.
+
+    pages maps each page's path relative to output_dir to its title and text,
+    plus the date and draft flag of its front matter when it has them. Drafts
+    are left out of every artifact.
+    The data is kept in ARTIFACTS_PATH so an incremental build only needs to
+    collect the pages it re-renders.
+    """
+
+    def __init__(self, output_dir, basepath="/", path=None, pages=None):
+        self.output_dir = output_dir
+        self.basepath = basepath
+        self.path = path
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, output_dir, basepath="/", path=ARTIFACTS_PATH):
+        """Load the pages collected by earlier builds, or start with none."""
+        return cls(output_dir, basepath, path, load_json(path, {}))
+
+    def save(self):
+        save_json(self.pages, self.path)
+
+    def subset(self):
+        """Return an empty, unsaved collector for the same site."""
+        return SiteArtifacts(self.output_dir, self.basepath)
+
+    def add_page(self, dest_path, title, text, metadata=None, listing=False):
+        """Record a page that was rendered to dest_path, with its front matter.
+
+        Listing pages, such as the blog index, are in the sitemap and search
+        index but never in the feed.
+        """
+        rel = os.path.relpath(dest_path, self.output_dir).replace(os.sep, "/")
+        page = {"title": title, "text": text}
+        if listing:
+            page["listing"] = True
+        metadata = metadata or {}
+        if "date" in metadata:
+            page["date"] = str(metadata["date"])
+        if metadata.get("draft") is True:
+            page["draft"] = True
+        self.pages[rel] = page
+
+    def published(self):
+        """Return the (path, page) pairs of the pages that are not drafts, in URL order."""
+        return sorted(((rel, page) for rel, page in self.pages.items() if not page.get("draft")),
+                      key=lambda item: page_url(item[0]))
+
+    def prune(self):
+        """Forget pages whose output file no longer exists."""
+        for rel in list(self.pages):
+            if not os.path.isfile(os.path.join(self.output_dir, rel)):
+                del self.pages[rel]
+
+    def sitemap(self, site_url):
+        """Return a sitemap.xml listing every page."""
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for rel, page in self.published():
+            lastmod = _parse_date(page.get("date"))
+            lastmod = f"<lastmod>{lastmod.date().isoformat()}</lastmod>" if lastmod else ""
+            lines.append(f"  <url><loc>{escape(self._absolute_url(site_url, rel))}</loc>{lastmod}</url>")
+        lines.append("</urlset>")
+        return "\n".join(lines) + "\n"
+
+    def feed(self, site_url):
+        """Return an RSS 2.0 feed of the pages under the blog directory, newest first."""
+        home = self.pages.get("index.html")
+        site_title = home["title"] if home else site_url
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<rss version="2.0">',
+            "<channel>",
+            f"  <title>{escape(site_title)}</title>",
+            f"  <link>{escape(self._absolute_url(site_url, 'index.html'))}</link>",
+            f"  <description>{escape(site_title)}</description>",
+        ]
+        posts = [
+            (rel, page) for rel, page in self.published()
+            if rel.startswith(BLOG_DIR + "/") and rel != f"{BLOG_DIR}/index.html" and not page.get("listing")
+        ]
+        # Stable sort, so undated posts keep their URL order after the dated ones
+        posts.sort(key=lambda item: _parse_date(item[1].get("date")) or datetime.min.replace(tzinfo=timezone.utc),
+                   reverse=True)
+        for rel, page in posts:
+            link = escape(self._absolute_url(site_url, rel))
+            lines.extend([
+                "  <item>",
+                f"    <title>{escape(page['title'])}</title>",
+                f"    <link>{link}</link>",
+                f"    <guid>{link}</guid>",
+            ])
+            published = _parse_date(page.get("date"))
+            if published is not None:
+                lines.append(f"    <pubDate>{format_datetime(published)}</pubDate>")
+            lines.extend([
+                f"    <description>{escape(summarize(page['text']))}</description>",
+                "  </item>",
+            ])
+        lines.extend(["</channel>", "</rss>"])
+        return "\n".join(lines) + "\n"
+
+    def search_index(self):
+        """Return the search index as a list of {url, title, text} entries."""
+        return [
+            {"url": page_url(rel, self.basepath), "title": page["title"], "text": page["text"]}
+            for rel, page in self.published()
+        ]
+
+    def write(self, site_url=None, search_index=True):
+        """Write the sitemap and feed (when the site URL is known) and the search index.
+
+        Returns the paths of the files written.
+        """
+        self.prune()
+        files = {}
+        if site_url:
+            files[SITEMAP_FILE] = self.sitemap(site_url)
+            files[FEED_FILE] = self.feed(site_url)
+        if search_index:
+            files[SEARCH_INDEX_FILE] = json.dumps(self.search_index(), ensure_ascii=False)
+
+        written = []
+        for name, content in files.items():
+            dest_path = os.path.join(self.output_dir, name)
+            tmp_path = dest_path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(content)
+            os.replace(tmp_path, dest_path)
+            written.append(dest_path)
+        if self.path is not None:
+            self.save()
+        return written
+
+    def _absolute_url(self, site_url, rel):
+        return site_url.rstrip("/") + page_url(rel, self.basepath)
+
+def summarize(text):
+    """Cut text down to a short summary, on a word boundary."""
+    if len(text) <= SUMMARY_LENGTH:
+        return text
+    return text[:SUMMARY_LENGTH].rsplit(" ", 1)[0] + "..."
+
+def _parse_date(value):
+    """Return a front matter date, e.g. 2024-05-01, as a UTC datetime, or None if it is not one."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        try:
+            parsed = datetime.combine(date.fromisoformat(str(value)[:10]), datetime.min.time())
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
@@ -0,0 +1,334 @@
+# benchmark.py
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from block_markdown import markdown_to_blocks, block_to_block_type, markdown_to_html_node
+from inline_markdown import text_to_textnodes, inline_markdown_to_html, _text_to_textnodes_chained
+from textnode import text_node_to_html_node
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+BENCHMARK_VERSION = 1
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron "
+    "while elves men and dwarves received lesser rings as gifts"
+).split()
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def _inline_text(rng, words=12, link_density=0.3):
+    """A line of prose with emphasis, code spans and links sprinkled in."""
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < link_density / 2:
+            word = f"[{word}](/blog/{word})"
+        elif roll < link_density:
+            word = f"![{word}](/images/{word}.png)" if rng.random() < 0.2 else f"**{word}**"
+        elif roll < link_density + 0.1:
+            word = f"_{word}_"
+        elif roll < link_density + 0.15:
+            word = f"`{word}`"
+        parts.append(word)
+    return " ".join(parts)
+
+def long_paragraphs(rng, size):
+    """Paragraphs of many inline-formatted lines."""
+    return "\n\n".join(
+        "\n".join(_inline_text(rng, 20) for _ in range(20)) for _ in range(size)
+    )
+
+def huge_lists(rng, size):
+    """Alternating unordered and ordered lists with many items."""
+    blocks = []
+    for i in range(size):
+        if i % 2 == 0:
+            blocks.append("\n".join(f"- {_inline_text(rng, 8)}" for _ in range(200)))
+        else:
+            blocks.append("\n".join(f"{n + 1}. {_inline_text(rng, 8)}" for n in range(200)))
+    return "\n\n".join(blocks)
+
+def code_blocks(rng, size):
+    """Many fenced code blocks separated by short paragraphs."""
+    blocks = []
+    for _ in range(size * 10):
+        code = "\n".join(f"print({_sentence(rng, 4)!r})" for _ in range(10))
+        blocks.append(f"```\n{code}\n```")
+        blocks.append(_sentence(rng))
+    return "\n\n".join(blocks)
+
+def dense_links(rng, size):
+    """Paragraphs where most words are links or images."""
+    return "\n\n".join(_inline_text(rng, 200, link_density=0.9) for _ in range(size))
+
+def mixed_page(rng, size=1):
+    """A typical page: a title, headings, prose, a quote, a list and code."""
+    return "\n\n".join([
+        f"# {_sentence(rng, 5)}",
+        _inline_text(rng, 40),
+        f"## {_sentence(rng, 3)}",
+        "\n".join(f"> {_sentence(rng)}" for _ in range(3)),
+        "\n".join(f"- {_inline_text(rng, 6)}" for _ in range(5)),
+        "```\n" + "\n".join(_sentence(rng, 6) for _ in range(4)) + "\n```",
+        _inline_text(rng, 60),
+    ] * size)
+
+CORPORA = {
+    "long_paragraphs": long_paragraphs,
+    "huge_lists": huge_lists,
+    "code_blocks": code_blocks,
+    "dense_links": dense_links,
+    "mixed_page": mixed_page,
+}
+
+def _stage_blocks(markdown):
+    return markdown_to_blocks(markdown)
+
+def _stage_block_types(blocks):
+    return [block_to_block_type(block) for block in blocks]
+
+def _stage_inline(blocks):
+    return [text_to_textnodes(block.replace("\n", " ")) for block in blocks if not block.startswith("```")]
+
+def _stage_inline_chained(blocks):
+    # The split-per-delimiter parser the single-pass scanner replaced, kept as a reference point
+    return [_text_to_textnodes_chained(block.replace("\n", " ")) for block in blocks if not block.startswith("```")]
+
+def _stage_inline_via_nodes(blocks):
+    return [
+        "".join(text_node_to_html_node(node).to_html() for node in text_to_textnodes(block.replace("\n", " ")))
+        for block in blocks if not block.startswith("```")
+    ]
+
+def _stage_inline_html(blocks):
+    return [inline_markdown_to_html(block.replace("\n", " ")) for block in blocks if not block.startswith("```")]
+
+def _stage_parse(markdown):
+    return markdown_to_html_node(markdown)
+
+def _stage_to_html(node):
+    return node.to_html()
+
+def _measure(func, arg, repeat):
+    """Return (best seconds, peak traced bytes) of func(arg)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+def _result(corpus, stage, seconds, nbytes, peak):
+    return {
+        "corpus": corpus,
+        "stage": stage,
+        "seconds": seconds,
+        "bytes": nbytes,
+        "mb_per_s": nbytes / seconds / 1e6 if seconds else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+def bench_corpus(name, markdown, repeat=3):
+    """Benchmark every pipeline stage on one markdown document."""
+    nbytes = len(markdown.encode("utf-8"))
+    blocks = markdown_to_blocks(markdown)
+    node = markdown_to_html_node(markdown)
+    stages = [
+        ("markdown_to_blocks", _stage_blocks, markdown),
+        ("block_to_block_type", _stage_block_types, blocks),
+        ("text_to_textnodes", _stage_inline, blocks),
+        ("text_to_textnodes_chained", _stage_inline_chained, blocks),
+        ("inline_via_nodes", _stage_inline_via_nodes, blocks),
+        ("inline_to_html", _stage_inline_html, blocks),
+        ("markdown_to_html_node", _stage_parse, markdown),
+        ("to_html", _stage_to_html, node),
+    ]
+    results = []
+    for stage, func, arg in stages:
+        seconds, peak = _measure(func, arg, repeat)
+        results.append(_result(name, stage, seconds, nbytes, peak))
+    return results
+
+def bench_site(pages, seed=0):
+    """Build a synthetic site of the given number of pages end to end."""
+    from main import generate_pages_recursive
+
+    rng = random.Random(seed)
+    tmp = tempfile.mkdtemp(prefix="ssg-bench-")
+    try:
+        content = os.path.join(tmp, "content")
+        template = os.path.join(tmp, "template.html")
+        with open(template, 'w') as f:
+            f.write("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+        nbytes = 0
+        for i in range(pages):
+            page_dir = os.path.join(content, "blog", f"{i // 100:03d}", f"post{i}")
+            os.makedirs(page_dir)
+            markdown = mixed_page(rng)
+            nbytes += len(markdown.encode("utf-8"))
+            with open(os.path.join(page_dir, "index.md"), 'w') as f:
+                f.write(markdown)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_recursive(content, template, os.path.join(tmp, "docs"))
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return [_result(f"site_{pages}_pages", "generate_pages_recursive", seconds, nbytes, peak)]
+    finally:
+        shutil.rmtree(tmp)
+
+# Subclasses without __slots__ get a per-instance __dict__ again, which is
+# what every node carried before the node classes were slotted
+class _DictTextNode(TextNode):
+    pass
+
+class _DictLeafNode(LeafNode):
+    pass
+
+class _DictParentNode(ParentNode):
+    pass
+
+NODE_FACTORIES = {
+    "TextNode": (lambda: TextNode("text", TextType.TEXT), lambda: _DictTextNode("text", TextType.TEXT)),
+    "LeafNode": (lambda: LeafNode("b", "text"), lambda: _DictLeafNode("b", "text")),
+    "ParentNode": (lambda: ParentNode("p", None), lambda: _DictParentNode("p", None)),
+}
+
+def _bytes_per_instance(factory, count):
+    tracemalloc.start()
+    try:
+        nodes = [factory() for _ in range(count)]
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del nodes
+    return size / count
+
+def bench_node_memory(count=100000):
+    """Measure the bytes allocated per node, slotted against __dict__-based nodes."""
+    results = []
+    for name, (slotted, with_dict) in NODE_FACTORIES.items():
+        slotted_bytes = _bytes_per_instance(slotted, count)
+        dict_bytes = _bytes_per_instance(with_dict, count)
+        results.append({
+            "class": name,
+            "slotted_bytes": slotted_bytes,
+            "dict_bytes": dict_bytes,
+            "saved_bytes": dict_bytes - slotted_bytes,
+        })
+    return results
+
+def _count_nodes(node):
+    if node.children is None:
+        return 1
+    return 1 + sum(_count_nodes(child) for child in node.children)
+
+def bench_page_memory(markdown, node_memory):
+    """Measure the node tree of one page and what it would cost with __dict__ nodes."""
+    tracemalloc.start()
+    try:
+        node = markdown_to_html_node(markdown)
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    nodes = _count_nodes(node)
+    saved = {r["class"]: r["saved_bytes"] for r in node_memory}["LeafNode"]
+    return {"nodes": nodes, "tree_kib": size / 1024, "dict_tree_kib": (size + nodes * saved) / 1024}
+
+def run_benchmarks(size=10, pages=0, repeat=3, seed=0, corpora=None, node_memory=0):
+    """Run the benchmark suite and return a JSON-serializable report."""
+    results = []
+    for name in corpora or CORPORA:
+        markdown = CORPORA[name](random.Random(seed), size)
+        results.extend(bench_corpus(name, markdown, repeat))
+    if pages:
+        results.extend(bench_site(pages, seed))
+    report = {
+        "version": BENCHMARK_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "size": size,
+        "results": results,
+    }
+    if node_memory:
+        report["node_memory"] = bench_node_memory(node_memory)
+        large_page = huge_lists(random.Random(seed), size)
+        report["page_memory"] = bench_page_memory(large_page, report["node_memory"])
+    return report
+
+def format_report(report, baseline=None):
+    """Format a report as a table, with the change against a baseline report if given."""
+    previous = {}
+    if baseline is not None:
+        previous = {(r["corpus"], r["stage"]): r for r in baseline["results"]}
+
+    lines = [f"{'corpus':<20} {'stage':<27} {'ms':>10} {'MB/s':>9} {'peak KiB':>10}" + ("  change" if previous else "")]
+    for r in report["results"]:
+        line = f"{r['corpus']:<20} {r['stage']:<27} {r['seconds'] * 1000:>10.2f} {r['mb_per_s']:>9.2f} {r['peak_kib']:>10.1f}"
+        old = previous.get((r["corpus"], r["stage"]))
+        if old is not None and old["seconds"]:
+            line += f"  {(r['seconds'] / old['seconds'] - 1) * 100:+6.1f}%"
+        lines.append(line)
+
+    if report.get("node_memory"):
+        lines.append("")
+        lines.append(f"{'node class':<20} {'slotted B':>10} {'__dict__ B':>11} {'saved B':>9}")
+        for r in report["node_memory"]:
+            lines.append(f"{r['class']:<20} {r['slotted_bytes']:>10.1f} {r['dict_bytes']:>11.1f} {r['saved_bytes']:>9.1f}")
+        page = report["page_memory"]
+        lines.append(
+            f"huge_lists page: {page['nodes']} nodes, {page['tree_kib']:.1f} KiB slotted "
+            f"vs {page['dict_tree_kib']:.1f} KiB with __dict__ nodes"
+        )
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the markdown pipeline on synthetic corpora.")
+    parser.add_argument("--size", type=int, default=10, help="scale factor of each corpus (default: 10)")
+    parser.add_argument("--pages", type=int, default=0, help="also build a synthetic site with this many pages")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per stage, best is kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus generator")
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA), help="only run this corpus")
+    parser.add_argument("--node-memory", type=int, default=0, metavar="N",
+                        help="also measure bytes per node by allocating N nodes of each class")
+    parser.add_argument("--json", metavar="PATH", help="write the report as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON report to compare timings against")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.size, args.pages, args.repeat, args.seed, args.corpus, args.node_memory)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
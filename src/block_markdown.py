@@ -1,7 +1,14 @@
+import io
+import re
 from enum import Enum
 from htmlnode import HTMLNode, ParentNode, LeafNode
 from textnode import text_node_to_html_node
-from inline_markdown import text_to_textnodes
+from inline_markdown import text_to_textnodes, write_inline_html
+from highlight import highlight
+from frontmatter import skip_front_matter
+
+# Language name after an opening ``` fence, e.g. ```python
+_FENCE_LANGUAGE_RE = re.compile(r"[\w+#.-]+")
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -11,53 +18,79 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
-def markdown_to_blocks(markdown):
-    """Split a markdown document into blocks separated by blank lines."""
-    # Split on double newlines (blank lines)
-    blocks = markdown.split("\n\n")
+def _strip_block_lines(lines):
+    """Strip a block given as lines the way str.strip would strip the joined text."""
+    start = 0
+    end = len(lines)
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    if start == end:
+        return []
     
-    # Strip whitespace and filter out empty blocks
-    filtered_blocks = []
-    for block in blocks:
-        stripped = block.strip()
-        if stripped:
-            filtered_blocks.append(stripped)
+    block_lines = lines[start:end]
+    block_lines[0] = block_lines[0].lstrip()
+    block_lines[-1] = block_lines[-1].rstrip()
+    return block_lines
+
+def iter_markdown_blocks(lines):
+    """Yield each block of a markdown document as a list of lines.
+
+    lines may be any iterable of lines, such as an open file, so a document is
+    consumed in a single pass while holding only one block in memory. A block
+    ends at an empty line, matching a split on "\n\n".
+    """
+    current = []
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+        if line:
+            current.append(line)
+            continue
+        block_lines = _strip_block_lines(current)
+        if block_lines:
+            yield block_lines
+        current = []
     
-    return filtered_blocks
+    block_lines = _strip_block_lines(current)
+    if block_lines:
+        yield block_lines
+
+def markdown_to_blocks(markdown):
+    """Split a markdown document into blocks separated by blank lines."""
+    return ["\n".join(block_lines) for block_lines in iter_markdown_blocks(markdown.split("\n"))]
 
 def block_to_block_type(block):
     """Determine the type of a markdown block."""
-    lines = block.split("\n")
-    
-    # Check for heading (1-6 # followed by space)
-    if block.startswith(("###### ", "##### ", "#### ", "### ", "## ", "# ")):
-        return BlockType.HEADING
-    
-    # Check for code block (starts with ``` and ends with ```)
-    if block.startswith("```") and block.endswith("```") and len(lines) > 1:
-        return BlockType.CODE
-    
-    # Check for quote block (every line starts with >)
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
-    
-    # Check for unordered list (every line starts with "- ")
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
-    
-    # Check for ordered list (lines start with 1. 2. 3. etc.)
-    is_ordered_list = True
+    return block_lines_to_block_type(block.split("\n"))
+
+def block_lines_to_block_type(lines):
+    """Determine the type of a markdown block given as a list of lines."""
+    return classify_block(lines).block_type
+
+def _is_heading(lines):
+    # 1-6 # followed by space
+    return lines[0].startswith(("###### ", "##### ", "#### ", "### ", "## ", "# "))
+
+def _is_code(lines):
+    # Starts with ``` and ends with ```
+    return lines[0].startswith("```") and lines[-1].endswith("```") and len(lines) > 1
+
+def _is_quote(lines):
+    # Every line starts with >
+    return all(line.startswith(">") for line in lines)
+
+def _is_unordered_list(lines):
+    # Every line starts with "- "
+    return all(line.startswith("- ") for line in lines)
+
+def _is_ordered_list(lines):
+    # Lines start with 1. 2. 3. etc.
     for i, line in enumerate(lines):
-        expected_prefix = f"{i + 1}. "
-        if not line.startswith(expected_prefix):
-            is_ordered_list = False
-            break
-    
-    if is_ordered_list and len(lines) > 0:
-        return BlockType.ORDERED_LIST
-    
-    # Default to paragraph
-    return BlockType.PARAGRAPH
+        if not line.startswith(f"{i + 1}. "):
+            return False
+    return True
 
 def text_to_children(text):
     """Convert inline markdown text to a list of HTMLNode children."""
@@ -68,15 +101,16 @@ def text_to_children(text):
         children.append(html_node)
     return children
 
-def paragraph_to_html_node(block):
-    """Convert a paragraph block to an HTMLNode."""
-    # Replace newlines with spaces for paragraphs
-    text = block.replace("\n", " ")
+def paragraph_to_html_node(lines):
+    """Convert a paragraph block, given as lines, to an HTMLNode."""
+    # Join lines with spaces for paragraphs
+    text = " ".join(lines)
     children = text_to_children(text)
     return ParentNode("p", children)
 
-def heading_to_html_node(block):
-    """Convert a heading block to an HTMLNode."""
+def _heading_parts(lines):
+    """Return the (level, inline text) of a heading block."""
+    block = "\n".join(lines)
     # Count the number of # characters
     level = 0
     for char in block:
@@ -86,28 +120,39 @@ def heading_to_html_node(block):
             break
     
     # Get the text after the # and space
-    text = block[level + 1:]
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    return level, block[level + 1:]
+
+def heading_to_html_node(lines):
+    """Convert a heading block, given as lines, to an HTMLNode."""
+    level, text = _heading_parts(lines)
+    return ParentNode(f"h{level}", text_to_children(text))
 
-def code_to_html_node(block):
-    """Convert a code block to an HTMLNode."""
+def code_to_html_node(lines):
+    """Convert a code block, given as lines, to an HTMLNode.
+
+    A language after the opening ``` becomes a language-* class, and the code
+    is highlighted at build time when there is a lexer for it.
+    """
     # Remove the opening and closing ```
-    if not block.startswith("```"):
+    if not lines[0].startswith("```"):
         raise ValueError("Invalid code block")
     
-    # Remove first ``` line and last ``` line
-    # The content is everything between the first newline and the last ```
-    first_newline = block.index("\n")
-    code_text = block[first_newline + 1:-3]  # -3 to remove the closing ```
+    # Drop the opening ``` line; the content runs up to the closing ```
+    code_text = "\n".join(lines[1:])[:-3]
+    
+    language = _FENCE_LANGUAGE_RE.match(lines[0], 3)
+    if language is None:
+        # Code blocks should not parse inline markdown
+        return ParentNode("pre", [LeafNode("code", code_text)])
     
-    # Code blocks should not parse inline markdown
-    code_node = LeafNode("code", code_text)
+    language = language.group().lower()
+    highlighted = highlight(code_text, language)
+    code_node = LeafNode("code", highlighted if highlighted is not None else code_text,
+                         {"class": f"language-{language}"})
     return ParentNode("pre", [code_node])
 
-def quote_to_html_node(block):
-    """Convert a quote block to an HTMLNode."""
-    lines = block.split("\n")
+def _quote_text(lines):
+    """Return the inline text of a quote block."""
     # Remove the > from each line
     cleaned_lines = []
     for line in lines:
@@ -117,64 +162,189 @@ def quote_to_html_node(block):
         elif line.startswith(">"):
             cleaned_lines.append(line[1:])
     
-    text = "\n".join(cleaned_lines)
-    children = text_to_children(text)
-    return ParentNode("blockquote", children)
+    return "\n".join(cleaned_lines)
 
-def unordered_list_to_html_node(block):
-    """Convert an unordered list block to an HTMLNode."""
-    lines = block.split("\n")
-    list_items = []
-    
-    for line in lines:
-        # Remove the "- " prefix
-        text = line[2:]
-        children = text_to_children(text)
-        list_items.append(ParentNode("li", children))
-    
-    return ParentNode("ul", list_items)
+def quote_to_html_node(lines):
+    """Convert a quote block, given as lines, to an HTMLNode."""
+    return ParentNode("blockquote", text_to_children(_quote_text(lines)))
 
-def ordered_list_to_html_node(block):
-    """Convert an ordered list block to an HTMLNode."""
-    lines = block.split("\n")
-    list_items = []
-    
-    for line in lines:
-        # Remove the "N. " prefix (where N is the number)
-        # Find the first space after the number
-        space_index = line.index(". ") + 2
-        text = line[space_index:]
-        children = text_to_children(text)
-        list_items.append(ParentNode("li", children))
+def _unordered_item_texts(lines):
+    """Return the inline text of each item of an unordered list block."""
+    # Remove the "- " prefix
+    return [line[2:] for line in lines]
+
+def _ordered_item_texts(lines):
+    """Return the inline text of each item of an ordered list block."""
+    # Remove the "N. " prefix, up to the first ". " after the number
+    return [line[line.index(". ") + 2:] for line in lines]
+
+def unordered_list_to_html_node(lines):
+    """Convert an unordered list block, given as lines, to an HTMLNode."""
+    return ParentNode("ul", [ParentNode("li", text_to_children(text)) for text in _unordered_item_texts(lines)])
+
+def ordered_list_to_html_node(lines):
+    """Convert an ordered list block, given as lines, to an HTMLNode."""
+    return ParentNode("ol", [ParentNode("li", text_to_children(text)) for text in _ordered_item_texts(lines)])
+
+def _write_inline_element(tag, text, out):
+    out.write(f"<{tag}>")
+    write_inline_html(text, out)
+    out.write(f"</{tag}>")
+
+def _write_list(tag, texts, out):
+    out.write(f"<{tag}>")
+    for text in texts:
+        _write_inline_element("li", text, out)
+    out.write(f"</{tag}>")
+
+def _write_paragraph(lines, out):
+    _write_inline_element("p", " ".join(lines), out)
+
+def _write_heading(lines, out):
+    level, text = _heading_parts(lines)
+    _write_inline_element(f"h{level}", text, out)
+
+def _write_quote(lines, out):
+    _write_inline_element("blockquote", _quote_text(lines), out)
+
+def _write_unordered_list(lines, out):
+    _write_list("ul", _unordered_item_texts(lines), out)
+
+def _write_ordered_list(lines, out):
+    _write_list("ol", _ordered_item_texts(lines), out)
+
+# Writers that render the built-in block types straight to HTML without
+# building nodes, keyed by the converter whose output they match
+_BLOCK_WRITERS = {
+    paragraph_to_html_node: _write_paragraph,
+    heading_to_html_node: _write_heading,
+    quote_to_html_node: _write_quote,
+    unordered_list_to_html_node: _write_unordered_list,
+    ordered_list_to_html_node: _write_ordered_list,
+}
+
+class BlockRule:
+    """How to recognise one type of block and convert it to an HTMLNode."""
+    __slots__ = ("block_type", "matches", "convert", "first_chars")
     
-    return ParentNode("ol", list_items)
+    def __init__(self, block_type, matches, convert, first_chars=None):
+        self.block_type = block_type
+        self.matches = matches
+        self.convert = convert
+        self.first_chars = first_chars
+
+# Rules indexed by the first character a block must start with; rules that
+# accept any first character are tried after the indexed ones
+_rules_by_first_char = {}
+_rules_any_first_char = []
+
+_PARAGRAPH_RULE = BlockRule(BlockType.PARAGRAPH, lambda lines: True, paragraph_to_html_node)
+
+def register_block_type(block_type, matches, convert, first_chars=None, prepend=False):
+    """Register a block type without touching the classification code.
+
+    matches(lines) decides whether a block (a list of lines) is of this type and
+    convert(lines) turns it into an HTMLNode. first_chars lists the characters a
+    matching block can start with, so only relevant rules are tried for a block;
+    None means any. Rules are tried in registration order, or ahead of existing
+    ones with prepend. Blocks no rule matches become paragraphs.
+    """
+    rule = BlockRule(block_type, matches, convert, first_chars)
+    buckets = [_rules_any_first_char] if first_chars is None else [
+        _rules_by_first_char.setdefault(char, []) for char in first_chars
+    ]
+    for bucket in buckets:
+        if prepend:
+            bucket.insert(0, rule)
+        else:
+            bucket.append(rule)
+    return rule
+
+def unregister_block_type(rule):
+    """Remove a rule returned by register_block_type."""
+    for bucket in [_rules_any_first_char, *_rules_by_first_char.values()]:
+        if rule in bucket:
+            bucket.remove(rule)
+
+def classify_block(lines):
+    """Return the BlockRule for a markdown block given as a list of lines."""
+    for rule in _rules_by_first_char.get(lines[0][:1], ()):
+        if rule.matches(lines):
+            return rule
+    for rule in _rules_any_first_char:
+        if rule.matches(lines):
+            return rule
+    return _PARAGRAPH_RULE
+
+register_block_type(BlockType.HEADING, _is_heading, heading_to_html_node, "#")
+register_block_type(BlockType.CODE, _is_code, code_to_html_node, "`")
+register_block_type(BlockType.QUOTE, _is_quote, quote_to_html_node, ">")
+register_block_type(BlockType.UNORDERED_LIST, _is_unordered_list, unordered_list_to_html_node, "-")
+register_block_type(BlockType.ORDERED_LIST, _is_ordered_list, ordered_list_to_html_node, "1")
 
 def block_to_html_node(block):
     """Convert a single markdown block to an HTMLNode."""
-    block_type = block_to_block_type(block)
-    
-    if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
-    elif block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
-    elif block_type == BlockType.CODE:
-        return code_to_html_node(block)
-    elif block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
-    elif block_type == BlockType.UNORDERED_LIST:
-        return unordered_list_to_html_node(block)
-    elif block_type == BlockType.ORDERED_LIST:
-        return ordered_list_to_html_node(block)
-    else:
-        raise ValueError(f"Unknown block type: {block_type}")
+    return block_lines_to_html_node(block.split("\n"))
+
+def block_lines_to_html_node(lines):
+    """Convert a single markdown block, given as lines, to an HTMLNode."""
+    return classify_block(lines).convert(lines)
+
+def iter_markdown_html_nodes(lines):
+    """Yield an HTMLNode per block as lines of a markdown document are consumed."""
+    for block_lines in iter_markdown_blocks(lines):
+        yield block_lines_to_html_node(block_lines)
+
+def write_markdown_html(lines, out):
+    """Write the HTML of the blocks of a markdown document to out, without the enclosing <div>.
+
+    Output is identical to writing the nodes of iter_markdown_html_nodes, but
+    built-in block types go through the inline fast path without building a
+    node tree. Blocks of registered types are converted to nodes as usual.
+    """
+    for block_lines in iter_markdown_blocks(lines):
+        convert = classify_block(block_lines).convert
+        writer = _BLOCK_WRITERS.get(convert)
+        if writer is not None:
+            writer(block_lines, out)
+        else:
+            convert(block_lines).write_to(out)
+
+def markdown_to_html(markdown):
+    """Convert a full markdown document to the HTML of markdown_to_html_node, without building it."""
+    buffer = io.StringIO()
+    buffer.write("<div>")
+    write_markdown_html(markdown.split("\n"), buffer)
+    buffer.write("</div>")
+    return buffer.getvalue()
 
 def markdown_to_html_node(markdown):
     """Convert a full markdown document to an HTMLNode."""
-    blocks = markdown_to_blocks(markdown)
-    children = []
+    children = list(iter_markdown_html_nodes(markdown.split("\n")))
+    return ParentNode("div", children)
+
+class MarkdownFileNode(HTMLNode):
+    """A <div> whose children are parsed from a markdown file, after its front matter, while it is written.
+
+    Only one block of the document is held in memory at a time, so very large
+    pages serialize in bounded memory.
+    """
+    __slots__ = ("path",)
     
-    for block in blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
+    def __init__(self, path):
+        super().__init__("div")
+        self.path = path
+    
+    def to_html(self):
+        buffer = io.StringIO()
+        self.write_to(buffer)
+        return buffer.getvalue()
+    
+    def write_to(self, out):
+        out.write("<div>")
+        with open(self.path, 'r') as f:
+            write_markdown_html(skip_front_matter(f), out)
+        out.write("</div>")
     
-    return ParentNode("div", children)
\ No newline at end of file
+    def __repr__(self):
+        return f"MarkdownFileNode({self.path})"
@@ -0,0 +1,90 @@
+# cache.py
+import json
+import os
+from manifest import hash_file, hash_text
+
+CACHE_DIR = os.path.join(".build", "cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Modules whose code determines the rendered body HTML
+PARSER_MODULES = ("block_markdown.py", "inline_markdown.py", "textnode.py", "htmlnode.py", "highlight.py",
+                  "frontmatter.py")
+
+_parser_version = None
+
+def parser_version():
+    """Return a hash of the parser source, so cached output is dropped when the parser changes."""
+    global _parser_version
+    if _parser_version is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        hashes = [hash_file(os.path.join(src_dir, module)) for module in PARSER_MODULES]
+        _parser_version = hash_text("".join(hashes))
+    return _parser_version
+
+class RenderCache:
+    """On-disk cache of rendered page bodies and titles, keyed by markdown content.
+
+    Entries are small JSON files sharded by key prefix. Reading an entry bumps
+    its mtime, and prune() evicts the least recently used entries once the
+    cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, markdown):
+        """Return the cache key of a markdown document."""
+        return hash_text(parser_version() + "\0" + markdown)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, markdown):
+        """Return the cached (title, body_html) for markdown, or None on a miss."""
+        path = self._entry_path(self.key(markdown))
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry["title"], entry["html"]
+
+    def put(self, markdown, title, html):
+        """Store the rendered title and body HTML of markdown."""
+        path = self._entry_path(self.key(markdown))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"title": title, "html": html}, f)
+        os.replace(tmp_path, path)
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits in max_bytes.
+
+        Returns the number of entries removed.
+        """
+        entries = []
+        total = 0
+        for root, dirs, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
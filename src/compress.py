@@ -0,0 +1,108 @@
+# compress.py
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+from manifest import hash_file, load_json, save_json
+import profiler
+
+try:
+    import brotli
+except ImportError:
+    # Without the brotli package only .gz files are written
+    brotli = None
+
+COMPRESSED_PATH = os.path.join(".build", "compressed.json")
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".xml", ".svg", ".txt")
+
+# Files smaller than this gain too little to be worth a compressed copy
+MIN_COMPRESS_SIZE = 256
+
+def available_formats():
+    """Return the compressed file suffixes that can be written here."""
+    return (".gz", ".br") if brotli is not None else (".gz",)
+
+def compress_data(data, suffix):
+    """Compress bytes at the highest level for a precompressed suffix."""
+    if suffix == ".gz":
+        # A fixed mtime keeps the output identical between builds
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if suffix == ".br":
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"Unknown compression format: {suffix}")
+
+def compress_file(job):
+    """Write the compressed siblings of one file; the unit of work of the pool.
+
+    job is a (path, suffixes) tuple. Returns the (bytes read, bytes written).
+    """
+    path, suffixes = job
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = 0
+    for suffix in suffixes:
+        compressed = compress_data(data, suffix)
+        tmp_path = path + suffix + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path + suffix)
+        written += len(compressed)
+    return len(data), written
+
+def compressed_siblings(index):
+    """Return the output-relative paths of the compressed files an index records."""
+    return {rel + suffix for rel, (file_hash, suffixes) in index.items() for suffix in suffixes}
+
+def load_index(path=COMPRESSED_PATH):
+    """Load {output path: [content hash, suffixes]} of the last build, or {} if unusable."""
+    return load_json(path, {})
+
+def save_index(index, path=COMPRESSED_PATH):
+    save_json(index, path)
+
+def compress_outputs(output_dir, jobs=1, index_path=COMPRESSED_PATH, suffixes=None):
+    """Write .gz (and .br) siblings for the text files in output_dir, in a process pool.
+
+    Only files whose content hash changed since the last run, or whose siblings
+    are missing, are compressed again. Siblings of files that are gone are
+    removed. Returns a (compressed, unchanged) tuple of file counts.
+    """
+    suffixes = tuple(suffixes or available_formats())
+    old_index = load_index(index_path)
+    index = {}
+    to_compress = []
+    unchanged = 0
+    for root, dirs, filenames in os.walk(output_dir):
+        for filename in sorted(filenames):
+            if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, filename)
+            if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            rel = os.path.relpath(path, output_dir).replace(os.sep, "/")
+            entry = [hash_file(path), list(suffixes)]
+            index[rel] = entry
+            if old_index.get(rel) == entry and all(os.path.exists(path + suffix) for suffix in suffixes):
+                unchanged += 1
+            else:
+                to_compress.append((path, suffixes))
+
+    # Compressed copies of files that are gone or no longer compressed would be served stale
+    for rel in compressed_siblings(old_index) - compressed_siblings(index):
+        path = os.path.join(output_dir, rel)
+        if os.path.isfile(path):
+            os.remove(path)
+
+    with profiler.stage("compress") as record:
+        if jobs > 1 and len(to_compress) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(compress_file, to_compress))
+        else:
+            results = [compress_file(job) for job in to_compress]
+        record["bytes"] = sum(read for read, written in results)
+
+    save_index(index, index_path)
+    read = sum(read for read, written in results)
+    written = sum(written for read, written in results)
+    print(f"Compressed {len(to_compress)} file(s) ({'/'.join(suffixes)}), {unchanged} unchanged, "
+          f"{read} -> {written} bytes")
+    return len(to_compress), unchanged
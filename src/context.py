@@ -0,0 +1,44 @@
+# context.py
+
+class BuildContext:
+    """The caches and indexes a build reads and updates while rendering pages.
+
+    Each one is optional and left out of the build when None: cache is a
+    RenderCache, outputs an OutputIndex, artifacts SiteArtifacts, images an
+    ImagePipeline, deps a DependencyGraph and links a LinkIndex.
+    """
+
+    def __init__(self, cache=None, outputs=None, artifacts=None, images=None, deps=None, links=None):
+        self.cache = cache
+        self.outputs = outputs
+        self.artifacts = artifacts
+        self.images = images
+        self.deps = deps
+        self.links = links
+
+    def subset(self, dest_path):
+        """Return the context a worker process renders dest_path with.
+
+        The indexes only hold what that page needs, so the worker gets little to
+        unpickle and sends back only its own entries, see merge(). The render
+        cache and images are shared read-only as they are.
+        """
+        return BuildContext(
+            self.cache,
+            self.outputs.subset([dest_path]) if self.outputs is not None else None,
+            self.artifacts.subset() if self.artifacts is not None else None,
+            self.images,
+            self.deps.subset() if self.deps is not None else None,
+            self.links.subset() if self.links is not None else None,
+        )
+
+    def merge(self, subset):
+        """Add the entries a worker recorded in a context returned by subset()."""
+        if self.outputs is not None:
+            self.outputs.entries.update(subset.outputs.entries)
+        if self.artifacts is not None:
+            self.artifacts.pages.update(subset.artifacts.pages)
+        if self.deps is not None:
+            self.deps.outputs.update(subset.deps.outputs)
+        if self.links is not None:
+            self.links.pages.update(subset.links.pages)
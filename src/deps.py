@@ -0,0 +1,97 @@
+# deps.py
+import json
+from manifest import hash_file, hash_text
+
+BASEPATH_INPUT = "basepath"
+IMAGE_INPUT_PREFIX = "image:"
+
+def image_input(rel):
+    """Return the input key of a static image, given its path relative to the static directory."""
+    return IMAGE_INPUT_PREFIX + rel
+
+class InputStates:
+    """Current hashes of build inputs, each computed at most once per build.
+
+    An input is the basepath, an image:<path> key for the attributes of an
+    image, or the path of any other file, such as a page or template.
+    """
+
+    def __init__(self, basepath="/", images=None, known=None):
+        self.basepath = basepath
+        self.images = images
+        self.states = dict(known or {})
+
+    def get(self, key):
+        """Return the hash of an input, or None if it no longer exists."""
+        if key not in self.states:
+            self.states[key] = self._compute(key)
+        return self.states[key]
+
+    def _compute(self, key):
+        if key == BASEPATH_INPUT:
+            return hash_text(self.basepath)
+        if key.startswith(IMAGE_INPUT_PREFIX):
+            entry = self.images.images.get(key[len(IMAGE_INPUT_PREFIX):]) if self.images is not None else None
+            if entry is None:
+                return None
+            return hash_text(json.dumps([entry["width"], entry["height"], [v[:2] for v in entry["variants"]]]))
+        try:
+            return hash_file(key)
+        except OSError:
+            return None
+
+class DependencyGraph:
+    """Which inputs each page output was rendered from, recorded while rendering.
+
+    outputs maps each output path relative to output_dir to the sorted input
+    keys of its last render. Together with the input hashes of that build it
+    tells exactly which outputs a changed file invalidates, and why.
+    """
+
+    def __init__(self, output_dir, outputs=None):
+        self.output_dir = output_dir
+        self.outputs = outputs if outputs is not None else {}
+
+    def subset(self):
+        """Return an empty recorder for the same output directory, to record a single page into."""
+        return DependencyGraph(self.output_dir)
+
+    def record(self, rel, inputs):
+        """Replace the inputs of the output at rel, a path relative to output_dir."""
+        self.outputs[rel] = sorted(set(inputs))
+
+    def prune(self, current):
+        """Forget outputs that are not in current."""
+        for rel in list(self.outputs):
+            if rel not in current:
+                del self.outputs[rel]
+
+    def inputs(self):
+        """Return every input any output depends on."""
+        return {key for keys in self.outputs.values() for key in keys}
+
+    def dependents(self, key):
+        """Return the sorted outputs that depend on an input."""
+        return sorted(rel for rel, keys in self.outputs.items() if key in keys)
+
+    def changed_inputs(self, rel, old_states, states):
+        """Return why the output at rel is out of date, as a list of reasons, or [] if it is not.
+
+        old_states holds the input hashes of the build that recorded the
+        graph, states is the InputStates of this build.
+        """
+        keys = self.outputs.get(rel)
+        if keys is None:
+            return ["no recorded dependencies"]
+        reasons = []
+        for key in keys:
+            state = states.get(key)
+            if state == old_states.get(key):
+                continue
+            if state is None:
+                reasons.append(f"{key} removed")
+            elif old_states.get(key) is None:
+                reasons.append(f"{key} added")
+            else:
+                reasons.append(f"{key} changed")
+        return reasons
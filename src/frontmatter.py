@@ -0,0 +1,242 @@
+# frontmatter.py
+import os
+import re
+from manifest import load_json, save_json
+
+METADATA_PATH = os.path.join(".build", "metadata.json")
+FRONT_MATTER_FENCE = "---"
+
+# A page head that is not closed within this many lines is not front matter
+FRONT_MATTER_MAX_LINES = 100
+
+_KEY_RE = re.compile(r"^([\w-]+)\s*:\s*(.*)$")
+_INT_RE = re.compile(r"^-?\d+$")
+
+def parse_value(text):
+    """Parse a front matter scalar or [a, b] list."""
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [parse_value(item) for item in text[1:-1].split(",") if item.strip()]
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text in ("true", "false"):
+        return text == "true"
+    if _INT_RE.match(text):
+        return int(text)
+    return text
+
+def parse_front_matter(lines):
+    """Parse the key: value lines between the front matter fences.
+
+    Values may be strings (optionally quoted), integers, true/false, [a, b]
+    lists, or an empty value followed by "- item" lines. Dates are kept as the
+    strings they are written as, e.g. 2024-05-01.
+    """
+    metadata = {}
+    list_key = None
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and list_key is not None:
+            metadata[list_key].append(parse_value(stripped[2:]))
+            continue
+        match = _KEY_RE.match(stripped)
+        if match is None:
+            raise ValueError(f"Invalid front matter line {number}: {line!r}")
+        key, value = match.groups()
+        if value:
+            metadata[key] = parse_value(value)
+            list_key = None
+        else:
+            metadata[key] = []
+            list_key = key
+    return metadata
+
+def _front_matter_end(lines):
+    """Return the index of the closing fence of front matter opening lines, or None."""
+    if not lines or lines[0].rstrip("\r\n") != FRONT_MATTER_FENCE:
+        return None
+    for index in range(1, min(len(lines), FRONT_MATTER_MAX_LINES + 1)):
+        if lines[index].rstrip("\r\n") == FRONT_MATTER_FENCE:
+            return index
+    return None
+
+def split_front_matter(markdown):
+    """Return the (metadata, body) of a markdown document; metadata is {} without front matter."""
+    if not markdown.startswith(FRONT_MATTER_FENCE):
+        return {}, markdown
+    # Only split the head, the body may be huge
+    lines = markdown.split("\n", FRONT_MATTER_MAX_LINES + 1)
+    end = _front_matter_end(lines[:FRONT_MATTER_MAX_LINES + 1])
+    if end is None:
+        return {}, markdown
+    return parse_front_matter(lines[1:end]), "\n".join(lines[end + 1:])
+
+def skip_front_matter(lines):
+    """Yield the lines of a document, such as an open file, after its front matter."""
+    lines = iter(lines)
+    head = []
+    for line in lines:
+        head.append(line)
+        if len(head) == 1 and line.rstrip("\r\n") != FRONT_MATTER_FENCE:
+            break
+        if len(head) > 1 and line.rstrip("\r\n") == FRONT_MATTER_FENCE:
+            head = []
+            break
+        if len(head) > FRONT_MATTER_MAX_LINES:
+            break
+    yield from head
+    yield from lines
+
+def find_title(lines):
+    """Return the text of the first "# " heading in lines, or None if there is none."""
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("# "):
+            # Remove the # and any leading/trailing whitespace
+            return stripped[2:].strip()
+    return None
+
+def read_page_head(path):
+    """Return the (metadata, title) of a markdown file, reading only as far as needed.
+
+    Files with a title in their front matter are read no further than the
+    front matter; otherwise reading stops at the first "# " heading.
+    """
+    with open(path, 'r') as f:
+        head = []
+        for line in f:
+            head.append(line)
+            if head[0].rstrip("\r\n") != FRONT_MATTER_FENCE:
+                break
+            if len(head) > 1 and line.rstrip("\r\n") == FRONT_MATTER_FENCE:
+                break
+            if len(head) > FRONT_MATTER_MAX_LINES:
+                break
+
+        end = _front_matter_end(head)
+        if end is None:
+            metadata = {}
+            body_head = head
+        else:
+            metadata = parse_front_matter(head[1:end])
+            body_head = []
+        title = metadata.get("title")
+        if title is None:
+            title = find_title(body_head)
+        if title is None:
+            title = find_title(f)
+    return metadata, title
+
+def template_values(metadata):
+    """Return the front matter as template slot values; lists are joined with ", "."""
+    values = {}
+    for key, value in metadata.items():
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        values[key] = str(value)
+    return values
+
+class MetadataIndex:
+    """Title and front matter of every page, queried without re-reading the pages.
+
+    pages maps each markdown path relative to content_dir to its "title",
+    "metadata" and the [size, mtime_ns] of the source it was read from. The
+    index is only brought up to date on the first query, and then re-reads
+    just the heads of pages that changed since it was saved.
+    """
+
+    def __init__(self, content_dir, path=None, pages=None):
+        self.content_dir = content_dir
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.fresh = False
+
+    @classmethod
+    def load(cls, content_dir, path=METADATA_PATH):
+        """Load the page heads read by earlier builds; they are brought up to date on the first query."""
+        return cls(content_dir, path, load_json(path, {}))
+
+    def save(self):
+        save_json(self.pages, self.path)
+
+    def refresh(self):
+        """Re-read the heads of new and changed pages and drop removed ones.
+
+        Returns the number of pages read.
+        """
+        seen = set()
+        read = 0
+        for root, dirs, filenames in os.walk(self.content_dir):
+            for filename in filenames:
+                if not filename.endswith(".md"):
+                    continue
+                path = os.path.join(root, filename)
+                rel = os.path.relpath(path, self.content_dir)
+                seen.add(rel)
+                stat = os.stat(path)
+                source = [stat.st_size, stat.st_mtime_ns]
+                entry = self.pages.get(rel)
+                if entry is not None and entry["source"] == source:
+                    continue
+                metadata, title = read_page_head(path)
+                self.pages[rel] = {"source": source, "title": title, "metadata": metadata}
+                read += 1
+
+        for rel in list(self.pages):
+            if rel not in seen:
+                del self.pages[rel]
+        self.fresh = True
+        return read
+
+    def _ensure_fresh(self):
+        if not self.fresh:
+            self.refresh()
+
+    def get(self, rel):
+        """Return the entry of one page, or None if there is no such page."""
+        self._ensure_fresh()
+        return self.pages.get(rel)
+
+    def query(self, directory=None, tag=None, include_drafts=False, sort_by="date", reverse=True):
+        """Return (markdown path, entry) pairs of matching pages, sorted by a metadata key.
+
+        directory limits the pages to those under a content subdirectory, tag to
+        those listing it in their tags. Drafts are left out unless asked for.
+        Pages without the sort key come last, ordered by path.
+        """
+        self._ensure_fresh()
+        prefix = os.path.join(directory, "") if directory else ""
+        matches = []
+        for rel, entry in self.pages.items():
+            metadata = entry["metadata"]
+            if not rel.startswith(prefix):
+                continue
+            if metadata.get("draft") is True and not include_drafts:
+                continue
+            if tag is not None and tag not in as_list(metadata.get("tags")):
+                continue
+            matches.append((rel, entry))
+
+        with_key = sorted((item for item in matches if sort_by in item[1]["metadata"]),
+                          key=lambda item: (str(item[1]["metadata"][sort_by]), item[0]), reverse=reverse)
+        without_key = sorted((item for item in matches if sort_by not in item[1]["metadata"]),
+                             key=lambda item: item[0])
+        return with_key + without_key
+
+    def tags(self, include_drafts=False):
+        """Return {tag: sorted markdown paths of the pages with it}."""
+        tags = {}
+        for rel, entry in self.query(include_drafts=include_drafts):
+            for tag in as_list(entry["metadata"].get("tags")):
+                tags.setdefault(str(tag), []).append(rel)
+        return {tag: sorted(pages) for tag, pages in tags.items()}
+
+def as_list(value):
+    """Return a front matter value as a list; a single value becomes a list of one."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
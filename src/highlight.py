@@ -0,0 +1,162 @@
+# highlight.py
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+from htmlnode import SafeHTML
+
+# Highlighted snippets kept in memory; identical snippets on other pages reuse them
+SNIPPET_CACHE_SIZE = 1024
+
+class Lexer:
+    """A language's token rules, compiled into one regex the first time they are used."""
+    __slots__ = ("name", "rules", "_regex", "_classes")
+
+    def __init__(self, name, rules):
+        self.name = name
+        self.rules = rules
+        self._regex = None
+        self._classes = None
+
+    def compile(self):
+        if self._regex is None:
+            self._regex = re.compile("|".join(f"(?P<t{i}>{pattern})" for i, (token, pattern) in enumerate(self.rules)),
+                                     re.MULTILINE)
+            self._classes = {f"t{i}": token for i, (token, pattern) in enumerate(self.rules)}
+        return self._regex
+
+    def highlight(self, code):
+        """Return code as escaped SafeHTML with each token wrapped in a <span class="hl-...">."""
+        regex = self.compile()
+        parts = []
+        position = 0
+        for match in regex.finditer(code):
+            if match.start() == match.end():
+                continue
+            parts.append(html.escape(code[position:match.start()], quote=False))
+            parts.append(f'<span class="hl-{self._classes[match.lastgroup]}">'
+                         f'{html.escape(match.group(), quote=False)}</span>')
+            position = match.end()
+        parts.append(html.escape(code[position:], quote=False))
+        return SafeHTML("".join(parts))
+
+_lexers = {}
+_snippets = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+# The pipelined build renders pages on several threads, which share the cache
+_snippets_lock = threading.Lock()
+
+def register_lexer(names, rules):
+    """Register token rules for the fence languages in names.
+
+    rules is a list of (token, pattern) pairs tried in order at each position;
+    the token becomes the hl-<token> class of the matched text. The patterns
+    are only compiled once a snippet of the language is highlighted.
+    """
+    lexer = Lexer(names[0], rules)
+    for name in names:
+        _lexers[name.lower()] = lexer
+    return lexer
+
+def get_lexer(language):
+    """Return the Lexer for a fence language, or None if there is none."""
+    return _lexers.get(language.lower())
+
+def highlight(code, language):
+    """Return code highlighted as HTML, or None if the language has no lexer.
+
+    Results are cached by (lexer, hash of the code).
+    """
+    lexer = get_lexer(language)
+    if lexer is None:
+        return None
+
+    key = (lexer.name, hashlib.sha256(code.encode("utf-8")).digest())
+    with _snippets_lock:
+        cached = _snippets.get(key)
+        if cached is not None:
+            _snippets.move_to_end(key)
+            _stats["hits"] += 1
+            return cached
+        _stats["misses"] += 1
+
+    highlighted = lexer.highlight(code)
+    with _snippets_lock:
+        _snippets[key] = highlighted
+        if len(_snippets) > SNIPPET_CACHE_SIZE:
+            _snippets.popitem(last=False)
+    return highlighted
+
+def snippet_cache_info():
+    """Return {"hits", "misses", "size"} of the snippet cache."""
+    with _snippets_lock:
+        return {"hits": _stats["hits"], "misses": _stats["misses"], "size": len(_snippets)}
+
+def clear_snippet_cache():
+    with _snippets_lock:
+        _snippets.clear()
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+def _words(*words):
+    return r"\b(?:" + "|".join(words) + r")\b"
+
+_NUMBER = r"\b(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+_DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+_SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+
+register_lexer(["python", "py"], [
+    ("comment", r"#[^\n]*"),
+    ("string", r'[rRbBfFuU]{0,2}(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\')'),
+    ("string", r"[rRbBfFuU]{0,2}(?:" + _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + ")"),
+    ("decorator", r"^[ \t]*@[\w.]+"),
+    ("keyword", _words("False", "None", "True", "and", "as", "assert", "async", "await", "break", "class",
+                       "continue", "def", "del", "elif", "else", "except", "finally", "for", "from", "global",
+                       "if", "import", "in", "is", "lambda", "nonlocal", "not", "or", "pass", "raise",
+                       "return", "try", "while", "with", "yield")),
+    ("builtin", _words("print", "len", "range", "open", "str", "int", "float", "list", "dict", "set",
+                       "tuple", "isinstance", "super", "self")),
+    ("number", _NUMBER),
+])
+
+register_lexer(["javascript", "js", "typescript", "ts"], [
+    ("comment", r"//[^\n]*|/\*[\s\S]*?\*/"),
+    ("string", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + r"|`(?:\\.|[^`\\])*`"),
+    ("keyword", _words("async", "await", "break", "case", "catch", "class", "const", "continue", "default",
+                       "delete", "do", "else", "export", "extends", "false", "finally", "for", "function",
+                       "if", "import", "in", "instanceof", "interface", "let", "new", "null", "of", "return",
+                       "super", "switch", "this", "throw", "true", "try", "type", "typeof", "undefined",
+                       "var", "void", "while", "yield")),
+    ("number", _NUMBER),
+])
+
+register_lexer(["json"], [
+    ("attr", _DOUBLE_QUOTED + r"(?=\s*:)"),
+    ("string", _DOUBLE_QUOTED),
+    ("keyword", _words("true", "false", "null")),
+    ("number", r"-?" + _NUMBER),
+])
+
+register_lexer(["bash", "sh", "shell", "console"], [
+    ("comment", r"(?<![\w$])#[^\n]*"),
+    ("string", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED),
+    ("variable", r"\$(?:\{[^}\n]*\}|\w+|[@#?$!*-])"),
+    ("keyword", _words("if", "then", "else", "elif", "fi", "for", "while", "until", "do", "done", "case",
+                       "esac", "in", "function", "return", "export", "local")),
+])
+
+register_lexer(["css"], [
+    ("comment", r"/\*[\s\S]*?\*/"),
+    ("string", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED),
+    ("keyword", r"@[\w-]+|!important"),
+    ("attr", r"[\w-]+(?=\s*:[^;{}]*[;}])"),
+    ("number", r"#[0-9a-fA-F]{3,8}\b|-?\d*\.?\d+(?:%|[a-zA-Z]+)?"),
+])
+
+register_lexer(["html", "xml", "svg"], [
+    ("comment", r"<!--[\s\S]*?-->"),
+    ("tag", r"</?[\w:-]+|/?>"),
+    ("attr", r"\b[\w:-]+(?==)"),
+    ("string", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED),
+])
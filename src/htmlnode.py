@@ -1,5 +1,31 @@
+import html
+import io
+
+class SafeHTML(str):
+    """Markup that is already safe to output, so serialization never escapes it again."""
+    __slots__ = ()
+
+def escape_text(text):
+    """Escape &, < and > in text content; text without them is returned as is."""
+    if isinstance(text, SafeHTML):
+        return text
+    # Fast path: most text has nothing to escape, and "in" checks are far cheaper than replacing
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def escape_attribute(value):
+    """Escape an attribute value for use between double quotes."""
+    if isinstance(value, SafeHTML):
+        return value
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value and "'" not in value:
+        return value
+    return html.escape(value, quote=True)
 
 class HTMLNode:
+    # Pages allocate nodes by the hundred thousand, so no per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+    
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -9,13 +35,19 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError
     
+    def write_to(self, out):
+        """Write the node's HTML to out, any object with a write(str) method."""
+        out.write(self.to_html())
+    
     def props_to_html(self):
-        return "".join(f' {key}="{value}"' for key, value in self.props.items()) if self.props else ""
+        return "".join(f' {key}="{escape_attribute(value)}"' for key, value in self.props.items()) if self.props else ""
     
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
     
@@ -23,27 +55,39 @@ class LeafNode(HTMLNode):
         if self.value is None:
             raise ValueError("All leaf nodes must have a value")
         
+        # Text is escaped here, unless it is marked as SafeHTML
+        value = escape_text(self.value)
         if self.tag is None:
-            return self.value
+            return value
         
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
     
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
     
     def to_html(self):
+        buffer = io.StringIO()
+        self.write_to(buffer)
+        return buffer.getvalue()
+    
+    def write_to(self, out):
+        """Stream the tree into out fragment by fragment, without building child strings."""
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         
         if self.children is None:
             raise ValueError("ParentNode must have children")
         
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        out.write(f"<{self.tag}{self.props_to_html()}>")
+        for child in self.children:
+            child.write_to(out)
+        out.write(f"</{self.tag}>")
     
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
\ No newline at end of file
@@ -0,0 +1,296 @@
+# images.py
+import json
+import os
+import posixpath
+import re
+import struct
+from html import escape, unescape
+from urllib.parse import unquote, urlsplit
+from manifest import hash_file, hash_text, load_json, save_json
+from sync import copy_file, is_up_to_date
+import profiler
+
+try:
+    from PIL import Image
+except ImportError:
+    # Without Pillow images still get width and height, but no variants
+    Image = None
+
+IMAGES_DIR = os.path.join(".build", "images")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+# Widths of the downscaled variants offered in srcset; only those narrower
+# than the source image are made
+VARIANT_WIDTHS = (480, 960, 1440)
+JPEG_QUALITY = 82
+
+def image_size(path):
+    """Return the (width, height) of a PNG, GIF, JPEG or WebP file, or None if it is not one.
+
+    Only the header is read, so this works without Pillow.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _webp_size(head)
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return _jpeg_size(f)
+    return None
+
+def _webp_size(head):
+    chunk = head[12:16]
+    if chunk == b"VP8X":
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return width, height
+    if chunk == b"VP8L":
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    return None
+
+def _jpeg_size(f):
+    """Walk the JPEG segments up to the start-of-frame marker that holds the size."""
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+def variant_path(rel, width):
+    """Return where the variant of a static image at the given width is placed."""
+    root, ext = posixpath.splitext(rel)
+    return f"{root}-{width}w{ext}"
+
+class ImagePipeline:
+    """Dimensions and downscaled variants of the images in the static directory.
+
+    Processed results live under cache_dir, keyed by a hash of the source, so
+    rebuilds only process new or changed images. images maps each image path
+    relative to the static directory to its width, height and variants, each a
+    [width, height, cached file] triple.
+    """
+
+    def __init__(self, cache_dir=IMAGES_DIR, basepath="/", widths=VARIANT_WIDTHS, entries=None, placed=None):
+        self.cache_dir = cache_dir
+        self.basepath = basepath
+        self.widths = tuple(widths)
+        self.entries = entries if entries is not None else {}
+        self.placed = placed if placed is not None else []
+        self.images = {}
+
+    @classmethod
+    def load(cls, cache_dir=IMAGES_DIR, basepath="/", widths=VARIANT_WIDTHS):
+        """Load the cache index, starting empty if it is missing or corrupt."""
+        index = load_json(os.path.join(cache_dir, "index.json"), {})
+        entries, placed = index.get("entries"), index.get("placed")
+        if not isinstance(entries, dict) or not isinstance(placed, list):
+            entries, placed = {}, []
+        return cls(cache_dir, basepath, widths, entries, placed)
+
+    def save(self):
+        save_json({"entries": self.entries, "placed": self.placed}, os.path.join(self.cache_dir, "index.json"))
+
+    def _key(self, file_hash):
+        # Variants depend on the widths asked for and on whether Pillow can make them
+        settings = ",".join(map(str, self.widths)) + (":pil" if Image is not None else "")
+        return hash_text(file_hash + "\0" + settings)
+
+    def process(self, static_dir):
+        """Read or reuse the dimensions and variants of every image in static_dir.
+
+        Returns a (processed, cached) tuple of image counts.
+        """
+        processed = cached = 0
+        self.images = {}
+        used = set()
+        for root, dirs, filenames in os.walk(static_dir):
+            for filename in sorted(filenames):
+                if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, filename)
+                rel = os.path.relpath(path, static_dir).replace(os.sep, "/")
+                key = self._key(hash_file(path))
+                entry = self.entries.get(key)
+                if entry is None or not all(os.path.exists(v[2]) for v in entry["variants"]):
+                    with profiler.stage("images", path) as record:
+                        entry = self._process_image(path, key)
+                        record["bytes"] = os.path.getsize(path)
+                    if entry is None:
+                        continue
+                    self.entries[key] = entry
+                    processed += 1
+                else:
+                    cached += 1
+                used.add(key)
+                self.images[rel] = entry
+
+        # Forget entries of images that are gone, along with their variants
+        for key in list(self.entries):
+            if key not in used:
+                for width, height, cached_path in self.entries.pop(key)["variants"]:
+                    if os.path.exists(cached_path):
+                        os.remove(cached_path)
+        return processed, cached
+
+    def _process_image(self, path, key):
+        size = image_size(path)
+        if size is None:
+            return None
+        width, height = size
+        variants = []
+        if Image is not None:
+            widths = [w for w in self.widths if w < width]
+            if widths:
+                ext = os.path.splitext(path)[1].lower()
+                os.makedirs(os.path.join(self.cache_dir, key[:2]), exist_ok=True)
+                with Image.open(path) as source:
+                    for variant_width in widths:
+                        variant_height = max(1, round(height * variant_width / width))
+                        cached_path = os.path.join(self.cache_dir, key[:2], f"{key}-{variant_width}w{ext}")
+                        resized = source.resize((variant_width, variant_height), Image.LANCZOS)
+                        if ext in (".jpg", ".jpeg"):
+                            resized.convert("RGB").save(cached_path, quality=JPEG_QUALITY, optimize=True)
+                        else:
+                            resized.save(cached_path, optimize=True)
+                        # A variant that is not smaller than the original saves nothing
+                        if os.path.getsize(cached_path) >= os.path.getsize(path):
+                            os.remove(cached_path)
+                            continue
+                        variants.append([variant_width, variant_height, cached_path])
+        return {"width": width, "height": height, "variants": variants}
+
+    def variant_outputs(self):
+        """Return {output path: cached file} for every variant to place in the output directory."""
+        return {
+            variant_path(rel, width): cached_path
+            for rel, entry in self.images.items()
+            for width, height, cached_path in entry["variants"]
+        }
+
+    def place(self, output_dir, mode="copy"):
+        """Put the variants in output_dir next to their images and remove ones no longer made.
+
+        Returns the number of files copied.
+        """
+        outputs = self.variant_outputs()
+        for rel in self.placed:
+            path = os.path.join(output_dir, rel)
+            if rel not in outputs and os.path.isfile(path):
+                os.remove(path)
+
+        copied = 0
+        for rel, cached_path in sorted(outputs.items()):
+            dst = os.path.join(output_dir, rel)
+            if is_up_to_date(cached_path, dst):
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            copy_file(cached_path, dst, mode)
+            copied += 1
+        self.placed = sorted(outputs)
+        self.save()
+        return copied
+
+    def signature(self):
+        """Return a hash of the image attributes pages are rendered with."""
+        return hash_text(json.dumps(
+            {rel: [entry["width"], entry["height"], [v[:2] for v in entry["variants"]]]
+             for rel, entry in self.images.items()},
+            sort_keys=True,
+        ))
+
+    def static_path(self, url):
+        """Return the path relative to the static directory an image url points at, or None if it is external."""
+        # url comes from serialized HTML, so its attribute escaping is undone first
+        parts = urlsplit(unescape(url))
+        if parts.scheme or parts.netloc or not parts.path.startswith("/"):
+            return None
+        return unquote(parts.path).lstrip("/")
+
+    def attributes(self, url):
+        """Return the extra <img> attributes for an image url, or "" if it is not a known image."""
+        rel = self.static_path(url)
+        entry = self.images.get(rel) if rel is not None else None
+        if entry is None:
+            return ""
+
+        attributes = f' width="{entry["width"]}" height="{entry["height"]}"'
+        if entry["variants"]:
+            candidates = [f"{self.basepath}{variant_path(rel, width)} {width}w" for width, height, _ in entry["variants"]]
+            candidates.append(f"{self.basepath}{rel} {entry['width']}w")
+            attributes += f' srcset="{escape(", ".join(candidates), quote=True)}"'
+            attributes += f' sizes="(max-width: {entry["width"]}px) 100vw, {entry["width"]}px"'
+        return attributes
+
+_IMG_PREFIX = '<img src="'
+_IMG_SRC_RE = re.compile(r'<img src="([^"]*)"')
+
+class ImageTagWriter:
+    """Write-through wrapper that adds an ImagePipeline's attributes to <img> tags.
+
+    An <img src="..." split across two writes is held back until it is complete.
+    The static paths of the local images seen are added to used, if given.
+    """
+
+    def __init__(self, out, images, used=None):
+        self.out = out
+        self.images = images
+        self.used = used
+        self.pending = ""
+
+    def _add_attributes(self, match):
+        if self.used is not None:
+            rel = self.images.static_path(match.group(1))
+            if rel is not None:
+                self.used.add(rel)
+        return match.group(0) + self.images.attributes(match.group(1))
+
+    def write(self, text):
+        data = self.pending + text
+        start = data.rfind(_IMG_PREFIX)
+        if start != -1 and data.find('"', start + len(_IMG_PREFIX)) == -1:
+            cut = start
+        else:
+            cut = len(data)
+            for length in range(min(len(_IMG_PREFIX) - 1, len(data)), 0, -1):
+                if _IMG_PREFIX.startswith(data[-length:]):
+                    cut -= length
+                    break
+        self.pending = data[cut:]
+        self.out.write(_IMG_SRC_RE.sub(self._add_attributes, data[:cut]))
+
+    def flush(self):
+        self.out.write(self.pending)
+        self.pending = ""
+
+class ImageBody:
+    """Page body whose <img> tags get dimensions and srcset as it is written."""
+    __slots__ = ("body", "images", "used")
+
+    def __init__(self, body, images, used=None):
+        self.body = body
+        self.images = images
+        self.used = used
+
+    def write_to(self, out):
+        writer = ImageTagWriter(out, self.images, self.used)
+        if hasattr(self.body, "write_to"):
+            self.body.write_to(writer)
+        else:
+            writer.write(self.body)
+        writer.flush()
@@ -1,16 +1,28 @@
 # inline_markdown.py
-from textnode import TextNode, TextType
+from textnode import TextNode, TextType, text_to_html
+import io
 import re
 
+# Inline delimiters in the order the chained splitters apply them; "**" is
+# tried before "*" so runs of asterisks tokenize the same way str.split does
+_DELIMITER_RE = re.compile(r"\*\*|[*_`]")
+_DELIMITER_PRIORITY = {"**": 0, "*": 1, "_": 2, "`": 3}
+_DELIMITER_TEXT_TYPES = {
+    "**": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+_IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK_RE = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def extract_markdown_images(text):
     """Extract markdown images and return list of (alt_text, url) tuples."""
-    matches = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
-    return matches
+    return _IMAGE_RE.findall(text)
 
 def extract_markdown_links(text):
     """Extract markdown links and return list of (anchor_text, url) tuples."""
-    matches = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
-    return matches
+    return _LINK_RE.findall(text)
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
@@ -122,8 +134,8 @@ def split_nodes_link(old_nodes):
     
     return new_nodes
 
-def text_to_textnodes(text):
-    """Convert raw markdown text into a list of TextNodes."""
+def _text_to_textnodes_chained(text):
+    """Convert raw markdown text into TextNodes by chaining the node splitters."""
     # Start with a single TEXT node containing all the text
     nodes = [TextNode(text, TextType.TEXT)]
     
@@ -135,4 +147,99 @@ def text_to_textnodes(text):
     nodes = split_nodes_image(nodes)
     nodes = split_nodes_link(nodes)
     
-    return nodes
\ No newline at end of file
+    return nodes
+
+def _emit_links(emit, text, start, end):
+    """Emit TEXT and LINK spans for text[start:end]."""
+    for match in _LINK_RE.finditer(text, start, end):
+        if match.start() > start:
+            emit(text[start:match.start()], TextType.TEXT, None)
+        emit(match.group(1), TextType.LINK, match.group(2))
+        start = match.end()
+    
+    if end > start:
+        emit(text[start:end], TextType.TEXT, None)
+
+def _emit_plain_text(emit, text, start, end):
+    """Emit TEXT, IMAGE and LINK spans for the plain text in text[start:end]."""
+    if start == end:
+        return
+    
+    # Fast path: without a "[" there can be no image or link
+    if text.find("[", start, end) == -1:
+        emit(text[start:end], TextType.TEXT, None)
+        return
+    
+    # Images are matched first, links only in the text between them
+    for match in _IMAGE_RE.finditer(text, start, end):
+        _emit_links(emit, text, start, match.start())
+        emit(match.group(1), TextType.IMAGE, match.group(2))
+        start = match.end()
+    
+    _emit_links(emit, text, start, end)
+
+def _scan_inline(text, emit):
+    """Feed each span of text to emit(text, text_type, url) in a single pass.
+
+    Produces the same spans as applying split_nodes_delimiter for "**", "*", "_"
+    and "`" followed by split_nodes_image and split_nodes_link. Delimiters inside
+    a span are literal unless they take precedence over the open one. Returns
+    False, possibly after emitting some spans, when such input or an unclosed
+    span means the chained splitters must decide (and raise their exact error).
+    """
+    open_delimiter = None
+    start = 0
+    
+    for match in _DELIMITER_RE.finditer(text):
+        delimiter = match.group()
+        if open_delimiter is None:
+            _emit_plain_text(emit, text, start, match.start())
+            open_delimiter = delimiter
+            start = match.end()
+        elif delimiter == open_delimiter:
+            if match.start() > start:
+                emit(text[start:match.start()], _DELIMITER_TEXT_TYPES[delimiter], None)
+            open_delimiter = None
+            start = match.end()
+        elif _DELIMITER_PRIORITY[delimiter] < _DELIMITER_PRIORITY[open_delimiter]:
+            return False
+    
+    if open_delimiter is not None:
+        return False
+    
+    _emit_plain_text(emit, text, start, len(text))
+    return True
+
+def text_to_textnodes(text):
+    """Convert raw markdown text into a list of TextNodes in a single pass."""
+    nodes = []
+    append = nodes.append
+    
+    def emit(span, text_type, url):
+        append(TextNode(span, text_type, url))
+    
+    if _scan_inline(text, emit):
+        return nodes
+    return _text_to_textnodes_chained(text)
+
+def write_inline_html(text, out):
+    """Render inline markdown straight to HTML on out, without building any nodes.
+
+    The output is identical to converting text_to_textnodes(text) with
+    text_node_to_html_node and joining each LeafNode's to_html().
+    """
+    parts = []
+    append = parts.append
+    
+    def emit(span, text_type, url):
+        append(text_to_html(span, text_type, url))
+    
+    if not _scan_inline(text, emit):
+        parts = [text_to_html(node.text, node.text_type, node.url) for node in _text_to_textnodes_chained(text)]
+    out.write("".join(parts))
+
+def inline_markdown_to_html(text):
+    """Render inline markdown straight to an HTML string."""
+    buffer = io.StringIO()
+    write_inline_html(text, buffer)
+    return buffer.getvalue()
@@ -0,0 +1,190 @@
+# links.py
+import html
+import os
+import posixpath
+import re
+from urllib.parse import unquote, urlsplit
+from block_markdown import iter_markdown_html_nodes
+from frontmatter import skip_front_matter
+from manifest import load_json, save_json
+import profiler
+
+LINKS_PATH = os.path.join(".build", "links.json")
+
+# The opening of the <a> and <img> tags markdown links and images render to
+_REFERENCE_RE = re.compile(r'<(a href|img src)="([^"]*)"')
+
+class ReferenceCollector:
+    """Collects the link and image urls of the HTML written to it.
+
+    Fed a page body while it is written, see CapturedBody, so the references
+    of a rendered page are known without reading its markdown again. A tag
+    split across two writes is held back until it is complete.
+    """
+
+    def __init__(self):
+        self.links = []
+        self.images = []
+        self.pending = ""
+
+    def write(self, text):
+        data = self.pending + text
+        # Text and attribute values are escaped, so a bare < always opens a tag
+        start = data.rfind("<")
+        if start != -1 and data.find(">", start) == -1:
+            data, self.pending = data[:start], data[start:]
+        else:
+            self.pending = ""
+        self._scan(data)
+
+    def _scan(self, data):
+        for match in _REFERENCE_RE.finditer(data):
+            references = self.links if match.group(1) == "a href" else self.images
+            references.append(html.unescape(match.group(2)))
+
+    def references(self):
+        """Return the collected (link urls, image urls)."""
+        self._scan(self.pending)
+        self.pending = ""
+        return self.links, self.images
+
+def extract_page_references(lines):
+    """Return the (link urls, image urls) of a markdown document, after its front matter.
+
+    The document is parsed as for rendering, so urls in code are left out
+    exactly as they are from the references of a rendered page.
+    """
+    collector = ReferenceCollector()
+    for node in iter_markdown_html_nodes(skip_front_matter(lines)):
+        node.write_to(collector)
+    return collector.references()
+
+def resolve_url(url, page_output):
+    """Return the output-relative path a url points to from a page, or None if it leaves the site.
+
+    Root-relative urls are relative to the site root, so they resolve the same
+    whatever basepath the site is served under.
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc:
+        return None
+    path = unquote(parts.path)
+    if not path:
+        # Only a fragment or query, pointing back at the page itself
+        return page_output
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname("/" + page_output), path)
+    resolved = posixpath.normpath(path).lstrip("/")
+    if resolved in ("", "."):
+        return "index.html"
+    if path.endswith("/"):
+        return posixpath.join(resolved, "index.html")
+    return resolved
+
+def find_output(target, outputs):
+    """Return the output file a resolved path is served from, or None if there is none.
+
+    Like a static file server, /blog/post is served by blog/post/index.html or
+    blog/post.html when there is no file of that exact name.
+    """
+    for candidate in (target, posixpath.join(target, "index.html"), target + ".html"):
+        if candidate in outputs:
+            return candidate
+    return None
+
+class LinkIndex:
+    """Site-wide index of the links and images on every page.
+
+    pages maps each markdown source, relative to the content directory, to its
+    output path, the size and mtime of the source when it was read, and its
+    links and images as [url, target] pairs. target is the output file the url
+    leads to, or None when it is external or broken. Pages are added while they
+    are rendered, and refresh() only reads the sources of the others that
+    changed since they were indexed.
+    """
+
+    def __init__(self, path=None, pages=None, content_dir="content", output_dir="docs"):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+
+    @classmethod
+    def load(cls, path=LINKS_PATH, content_dir="content", output_dir="docs"):
+        """Load the index of the last build, or start with no pages."""
+        pages = load_json(path, {}).get("pages")
+        return cls(path, pages if isinstance(pages, dict) else {}, content_dir, output_dir)
+
+    def subset(self):
+        """Return an empty index for the same content and output directories."""
+        return LinkIndex(None, None, self.content_dir, self.output_dir)
+
+    def add_page(self, from_path, dest_path, links, images):
+        """Index the links and images a page was just rendered with, keyed by its markdown source."""
+        stat = os.stat(from_path)
+        self.pages[os.path.relpath(from_path, self.content_dir)] = {
+            "output": os.path.relpath(dest_path, self.output_dir).replace(os.sep, "/"),
+            "source": [stat.st_size, stat.st_mtime_ns],
+            "links": [[url, None] for url in links],
+            "images": [[url, None] for url in images],
+        }
+
+    def save(self):
+        save_json({"pages": self.pages}, self.path)
+
+    def refresh(self, content_dir, page_outputs):
+        """Bring the index up to date with {markdown path: output path} pages.
+
+        Pages added since their source last changed are kept as they are.
+        Returns the number of pages that had to be read.
+        """
+        for rel in list(self.pages):
+            if rel not in page_outputs:
+                del self.pages[rel]
+
+        read = 0
+        for rel, output in page_outputs.items():
+            path = os.path.join(content_dir, rel)
+            stat = os.stat(path)
+            source = [stat.st_size, stat.st_mtime_ns]
+            output = output.replace(os.sep, "/")
+            entry = self.pages.get(rel)
+            if entry is not None and entry["source"] == source and entry["output"] == output:
+                continue
+            with profiler.stage("links", path) as record, open(path, 'r') as f:
+                links, images = extract_page_references(f)
+                record["bytes"] = stat.st_size
+            self.pages[rel] = {
+                "output": output,
+                "source": source,
+                "links": [[url, None] for url in links],
+                "images": [[url, None] for url in images],
+            }
+            read += 1
+        return read
+
+    def resolve(self, outputs):
+        """Point every reference at the output file it reaches, given the set of output paths.
+
+        Returns the broken internal references as sorted (page, kind, url)
+        tuples, kind being "link" or "image".
+        """
+        outputs = {output.replace(os.sep, "/") for output in outputs}
+        broken = []
+        for rel, entry in self.pages.items():
+            for kind, references in (("link", entry["links"]), ("image", entry["images"])):
+                for reference in references:
+                    target = resolve_url(reference[0], entry["output"])
+                    reference[1] = find_output(target, outputs) if target is not None else None
+                    if target is not None and reference[1] is None:
+                        broken.append((rel, kind, reference[0]))
+        return sorted(broken)
+
+    def backlinks(self):
+        """Return {output path: sorted markdown pages that link to it}."""
+        backlinks = {}
+        for rel, entry in self.pages.items():
+            for url, target in entry["links"]:
+                if target is not None and target != entry["output"]:
+                    backlinks.setdefault(target, set()).add(rel)
+        return {target: sorted(pages) for target, pages in backlinks.items()}
@@ -0,0 +1,163 @@
+# listings.py
+import json
+import os
+import posixpath
+import re
+from htmlnode import LeafNode, ParentNode
+from manifest import hash_text, load_json, save_json
+from frontmatter import as_list
+from artifacts import BLOG_DIR, page_url, summarize
+
+LISTINGS_PATH = os.path.join(".build", "listings.json")
+TAGS_DIR = "tags"
+
+# Posts per listing page
+PAGE_SIZE = 10
+
+def tag_slug(tag):
+    """Return the directory name of a tag's pages."""
+    return re.sub(r"[^\w-]+", "-", str(tag).lower()).strip("-") or "tag"
+
+def listing_page_path(base_dir, number):
+    """Return the output path of page number (from 1) of the listing in base_dir."""
+    if number == 1:
+        return f"{base_dir}/index.html"
+    return f"{base_dir}/page/{number}/index.html"
+
+def listing_entries(metadata, page_outputs, artifact_pages, directory=None, tag=None):
+    """Return the posts a listing shows, newest first, as dicts of url, title, date, summary and tags.
+
+    metadata is a MetadataIndex, page_outputs maps markdown paths to output
+    paths and artifact_pages is SiteArtifacts.pages, whose text collected during
+    rendering makes the summary unless the front matter has one.
+    """
+    entries = []
+    for rel, entry in metadata.query(directory=directory, tag=tag):
+        output = page_outputs.get(rel)
+        if output is None or (directory is not None and output == f"{directory}/index.html"):
+            continue
+        page_metadata = entry["metadata"]
+        title = str(entry["title"] or output)
+        summary = page_metadata.get("summary") or page_metadata.get("description")
+        if summary is None:
+            text = artifact_pages.get(output, {}).get("text", "")
+            # The collected text starts with the page's own h1
+            if text.startswith(title):
+                text = text[len(title):].lstrip()
+            summary = summarize(text)
+        entries.append({
+            "url": page_url(output),
+            "title": title,
+            "date": str(page_metadata.get("date", "")),
+            "summary": str(summary),
+            "tags": [str(tag) for tag in as_list(page_metadata.get("tags"))],
+        })
+    return entries
+
+def listing_content(title, entries, number, total, base_dir):
+    """Return the body of one listing page as an HTMLNode."""
+    items = []
+    for entry in entries:
+        children = [LeafNode("a", entry["title"], {"href": entry["url"]})]
+        if entry["date"]:
+            children.append(LeafNode("time", entry["date"], {"datetime": entry["date"]}))
+        if entry["summary"]:
+            children.append(LeafNode("p", entry["summary"]))
+        if entry["tags"]:
+            children.append(ParentNode("p", [
+                LeafNode("a", tag, {"href": page_url(listing_page_path(f"{TAGS_DIR}/{tag_slug(tag)}", 1))})
+                for tag in entry["tags"]
+            ], {"class": "tags"}))
+        items.append(ParentNode("li", children))
+
+    children = [LeafNode("h1", title)]
+    children.append(ParentNode("ul", items, {"class": "posts"}) if items else LeafNode("p", "Nothing here yet."))
+    if total > 1:
+        links = []
+        if number > 1:
+            links.append(LeafNode("a", "Newer", {"href": page_url(listing_page_path(base_dir, number - 1)),
+                                                 "rel": "prev"}))
+        links.append(LeafNode("span", f"Page {number} of {total}"))
+        if number < total:
+            links.append(LeafNode("a", "Older", {"href": page_url(listing_page_path(base_dir, number + 1)),
+                                                 "rel": "next"}))
+        children.append(ParentNode("nav", links, {"class": "pagination"}))
+    return ParentNode("div", children, {"class": "listing"})
+
+def paginate(title, entries, base_dir, page_size=PAGE_SIZE):
+    """Split a listing into pages.
+
+    Returns (output path, page title, content, signature) tuples; the signature
+    is a hash of everything the page shows.
+    """
+    chunks = [entries[start:start + page_size] for start in range(0, len(entries), page_size)] or [[]]
+    pages = []
+    for number, chunk in enumerate(chunks, 1):
+        page_title = title if number == 1 else f"{title} (page {number})"
+        signature = hash_text(json.dumps([page_title, chunk, number, len(chunks)], sort_keys=True))
+        pages.append((listing_page_path(base_dir, number), page_title,
+                      listing_content(page_title, chunk, number, len(chunks), base_dir), signature))
+    return pages
+
+def build_listing_pages(metadata, page_outputs, artifact_pages, page_size=PAGE_SIZE):
+    """Return the pages of the blog listing, the tag index and one listing per tag, see paginate."""
+    pages = paginate("Blog", listing_entries(metadata, page_outputs, artifact_pages, BLOG_DIR), BLOG_DIR, page_size)
+
+    tags = metadata.tags()
+    if tags:
+        tag_entries = [
+            {"url": page_url(listing_page_path(f"{TAGS_DIR}/{tag_slug(tag)}", 1)), "title": tag, "date": "",
+             "summary": f"{len(rels)} post(s)", "tags": []}
+            for tag, rels in sorted(tags.items())
+        ]
+        pages.extend(paginate("Tags", tag_entries, TAGS_DIR, len(tag_entries)))
+        for tag in sorted(tags):
+            entries = listing_entries(metadata, page_outputs, artifact_pages, tag=tag)
+            pages.extend(paginate(f"Tagged {tag}", entries, f"{TAGS_DIR}/{tag_slug(tag)}", page_size))
+    return pages
+
+class ListingIndex:
+    """Signatures of the listing pages of the last build, so unchanged ones are not rendered again.
+
+    pages maps each listing page's output path to the signature it was rendered
+    from, which also covers the template and basepath.
+    """
+
+    def __init__(self, path=None, pages=None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path=LISTINGS_PATH):
+        """Load the signatures of the last build, or start with none."""
+        return cls(path, load_json(path, {}))
+
+    def save(self):
+        save_json(self.pages, self.path)
+
+    def is_current(self, output_dir, rel, signature):
+        """Return True if the listing page at rel was rendered from signature and still exists."""
+        return self.pages.get(rel) == signature and os.path.isfile(os.path.join(output_dir, rel))
+
+    def remove_stale(self, output_dir, current):
+        """Delete the listing pages of the last build that are not in current, with emptied directories.
+
+        Returns the number of files removed.
+        """
+        removed = 0
+        for rel in sorted(set(self.pages) - set(current)):
+            del self.pages[rel]
+            path = os.path.join(output_dir, rel)
+            if not os.path.isfile(path):
+                continue
+            print(f"Removing stale listing: {path}")
+            os.remove(path)
+            removed += 1
+            parent = posixpath.dirname(rel)
+            while parent:
+                parent_path = os.path.join(output_dir, parent)
+                if not os.path.isdir(parent_path) or os.listdir(parent_path):
+                    break
+                os.rmdir(parent_path)
+                parent = posixpath.dirname(parent)
+        return removed
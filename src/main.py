@@ -2,12 +2,36 @@
 import os
 import shutil
 import sys
+import argparse
+import contextlib
+import io
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from block_markdown import markdown_to_html_node
+from block_markdown import markdown_to_html, markdown_to_html_node, MarkdownFileNode
+from htmlnode import escape_attribute, escape_text
+from frontmatter import METADATA_PATH, MetadataIndex, find_title, read_page_head, split_front_matter, template_values
+from template import load_template
+from manifest import hash_file, hash_text, new_manifest, load_manifest, save_manifest
+from sync import LINK_MODES, copy_file, sync_directory
+from cache import CACHE_DIR, RenderCache
+from context import BuildContext
+from outputs import OUTPUTS_PATH, HashingWriter, OutputIndex
+from pipeline import PIPELINE_DEPTH, run_pipeline
+from links import LINKS_PATH, LinkIndex, ReferenceCollector
+from artifacts import ARTIFACT_FILES, ARTIFACTS_PATH, CapturedBody, PageTextExtractor, SiteArtifacts
+from images import IMAGES_DIR, ImageBody, ImagePipeline
+from deps import BASEPATH_INPUT, DependencyGraph, InputStates, image_input
+from listings import LISTINGS_PATH, PAGE_SIZE, ListingIndex, build_listing_pages
+from compress import COMPRESSED_PATH, available_formats, compress_outputs, compressed_siblings, load_index
+import profiler
 
-def copy_static_to_public(public_dir="public"):
+MANIFEST_PATH = os.path.join(".build", "manifest.json")
+
+# Pages larger than this are parsed while being written instead of read whole
+STREAM_THRESHOLD = 1024 * 1024
+
+def copy_static_to_public(public_dir="public", static_dir="static"):
     """Copy all contents from static directory to public directory."""
-    static_dir = "static"
     
     # Delete the public directory if it exists
     if os.path.exists(public_dir):
@@ -36,7 +60,9 @@ def copy_directory_contents(src, dst):
         if os.path.isfile(src_path):
             # Copy the file
             print(f"Copying file: {src_path} -> {dst_path}")
-            shutil.copy(src_path, dst_path)
+            with profiler.stage("copy_static") as record:
+                shutil.copy(src_path, dst_path)
+                record["bytes"] = os.path.getsize(dst_path)
         else:
             # It's a directory, create it and recurse
             print(f"Creating directory: {dst_path}")
@@ -45,58 +71,327 @@ def copy_directory_contents(src, dst):
 
 def extract_title(markdown):
     """Extract the h1 title from a markdown document."""
-    lines = markdown.split("\n")
-    
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("# "):
-            # Remove the # and any leading/trailing whitespace
-            return stripped[2:].strip()
-    
-    raise Exception("No h1 header found in markdown")
+    title = find_title(markdown.split("\n"))
+    if title is None:
+        raise Exception("No h1 header found in markdown")
+    return title
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
-    """Generate an HTML page from markdown using a template."""
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    
-    # Read the markdown file
-    with open(from_path, 'r') as f:
-        markdown_content = f.read()
-    
-    # Read the template file
-    with open(template_path, 'r') as f:
-        template_content = f.read()
-    
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+def read_markdown_file(from_path):
+    """Read the markdown source of a page."""
+    with profiler.stage("read", from_path) as record:
+        with open(from_path, 'r') as f:
+            markdown_content = f.read()
+        record["bytes"] = len(markdown_content)
+    return markdown_content
+
+def render_markdown(from_path, markdown_content, cache=None):
+    """Return the title, body and front matter of the markdown read from from_path.
+
+    A title in the front matter takes precedence over the first h1.
+    """
+    metadata, body = split_front_matter(markdown_content)
+    if cache is not None:
+        with profiler.stage("cache", from_path):
+            cached = cache.get(markdown_content)
+        if cached is not None:
+            return cached[0], cached[1], metadata
     
-    # Extract the title
-    title = extract_title(markdown_content)
+    with profiler.stage("parse", from_path) as record:
+        # Extract the title
+        title = str(metadata["title"]) if "title" in metadata else extract_title(body)
+        if cache is None:
+            # Convert markdown to HTML nodes, written straight to the page
+            html_content = markdown_to_html_node(body)
+        else:
+            # Only the HTML is cached, so skip building the tree
+            html_content = markdown_to_html(body)
+        record["bytes"] = len(markdown_content)
     
-    # Replace placeholders in template
-    full_html = template_content.replace("{{ Title }}", title)
-    full_html = full_html.replace("{{ Content }}", html_content)
+    if cache is None:
+        return title, html_content, metadata
     
-    # Replace paths with basepath
-    full_html = full_html.replace('href="/', f'href="{basepath}')
-    full_html = full_html.replace('src="/', f'src="{basepath}')
+    with profiler.stage("cache", from_path):
+        cache.put(markdown_content, title, html_content)
+    return title, html_content, metadata
+
+def generate_page(from_path, template_path, dest_path, basepath="/", context=None):
+    """Generate an HTML page from markdown using a template.
+
+    The keys of the page's front matter fill the template's {{ Name }} slots
+    of the same name, e.g. {{ date }}.
+    The BuildContext decides what else happens: with a RenderCache, unchanged
+    markdown skips parsing entirely. With an OutputIndex, a page whose HTML is
+    byte-identical to the existing file is not rewritten, keeping its mtime.
+    With SiteArtifacts, the page's title and text are collected as it is
+    written. With an ImagePipeline, <img> tags get dimensions and srcset. With
+    a DependencyGraph, the files and images the page was rendered from are
+    recorded, and with a LinkIndex, the links and images the page shows.
+    Returns True if dest_path was written.
     
+    A "template" key in the front matter renders the page with that template
+    instead, relative to the directory of template_path.
+    """
+    context = context if context is not None else BuildContext()
+    title, html_content, page_metadata = load_page_body(from_path, context.cache)
+    page = prepare_page(from_path, dest_path, template_path, title, html_content, page_metadata, basepath, context)
+    print(f"Generating page from {from_path} to {dest_path} using {page.template.dependencies[0]}")
+    written = write_page(from_path, dest_path, lambda out: page.template.render_to(out, page.values), context.outputs)
+    finish_page(page, context)
+    return written
+
+class PreparedPage:
+    """A page ready to be written, and what collects its data while it is.
+
+    values fill the template's slots, see generate_page. While the page is
+    written, extractor collects its text for SiteArtifacts, used_images the
+    images it shows and references, a ReferenceCollector, its links and images
+    for a LinkIndex. Those not in the build are None.
+    """
+
+    def __init__(self, from_path, dest_path, title, metadata, template, values, extractor=None, used_images=None,
+                 references=None):
+        self.from_path = from_path
+        self.dest_path = dest_path
+        self.title = title
+        self.metadata = metadata
+        self.template = template
+        self.values = values
+        self.extractor = extractor
+        self.used_images = used_images if used_images is not None else set()
+        self.references = references
+
+def prepare_page(from_path, dest_path, template_path, title, body, page_metadata, basepath="/", context=None):
+    """Return the PreparedPage of a page whose markdown rendered to body."""
+    context = context if context is not None else BuildContext()
+    # Load the template, compiled once per build
+    with profiler.stage("template", from_path):
+        template = load_template(page_template_path(template_path, page_metadata), basepath)
+
+    values = front_matter_values(page_metadata)
+    values["Title"] = escape_text(title)
+    values["Content"] = body
+    page = PreparedPage(from_path, dest_path, title, page_metadata, template, values)
+    if context.images is not None:
+        values["Content"] = ImageBody(values["Content"], context.images, page.used_images)
+    if context.artifacts is not None:
+        page.extractor = PageTextExtractor()
+        values["Content"] = CapturedBody(values["Content"], page.extractor)
+    if context.links is not None:
+        page.references = ReferenceCollector()
+        values["Content"] = CapturedBody(values["Content"], page.references)
+    return page
+
+def finish_page(page, context):
+    """Collect a written PreparedPage into the SiteArtifacts, DependencyGraph and LinkIndex of a BuildContext."""
+    if context.artifacts is not None:
+        context.artifacts.add_page(page.dest_path, page.title, page.extractor.text(), page.metadata)
+    if context.deps is not None:
+        record_dependencies(context.deps, page.from_path, page.dest_path, page.template, page.used_images)
+    if context.links is not None:
+        context.links.add_page(page.from_path, page.dest_path, *page.references.references())
+
+def page_template_path(template_path, metadata):
+    """Return the template a page is rendered with, given its front matter."""
+    if "template" in metadata:
+        return os.path.join(os.path.dirname(template_path), str(metadata["template"]))
+    return template_path
+
+def record_dependencies(deps, from_path, dest_path, template, used_images):
+    """Record the inputs of a page in a DependencyGraph: its source, templates, basepath and images."""
+    inputs = [from_path, BASEPATH_INPUT] + template.dependencies + [image_input(rel) for rel in used_images]
+    deps.record(os.path.relpath(dest_path, deps.output_dir).replace(os.sep, "/"), inputs)
+
+def front_matter_values(metadata):
+    """Return a page's front matter as template slot values, escaped so they are safe in attributes too."""
+    return {key: escape_attribute(value) for key, value in template_values(metadata).items()}
+
+def load_page_body(from_path, cache=None, markdown_content=None):
+    """Return the title, body and front matter of a page, reading it unless its markdown is given.
+
+    Very large pages come back as a MarkdownFileNode that is parsed block by
+    block while being written, and never cached, so the whole document is never
+    held in memory.
+    """
+    if markdown_content is None:
+        if os.path.getsize(from_path) > STREAM_THRESHOLD:
+            metadata, title = read_page_head(from_path)
+            if title is None:
+                raise Exception("No h1 header found in markdown")
+            return str(title), MarkdownFileNode(from_path), metadata
+        markdown_content = read_markdown_file(from_path)
+    return render_markdown(from_path, markdown_content, cache)
+
+def write_page(from_path, dest_path, render_to, outputs=None):
+    """Write the HTML that render_to(out) produces to dest_path, atomically.
+
+    Returns True if dest_path was written, False if an OutputIndex showed it
+    already held the same bytes.
+    """
     # Create destination directory if it doesn't exist
     dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
     
-    # Write the HTML to the destination file
-    with open(dest_path, 'w') as f:
-        f.write(full_html)
+    # Stream the HTML into a temporary file, then move it into place; serialization
+    # and writing are interleaved, so they are profiled as one "render" stage
+    tmp_path = dest_path + ".tmp"
+    try:
+        with profiler.stage("render", from_path) as record, open(tmp_path, 'w') as f:
+            out = HashingWriter(f) if outputs is not None else f
+            render_to(out)
+            record["bytes"] = f.tell()
+        
+        if outputs is not None and outputs.is_unchanged(dest_path, out.hexdigest()):
+            os.remove(tmp_path)
+            print(f"Page unchanged at {dest_path}")
+            return False
+        
+        os.replace(tmp_path, dest_path)
+        if outputs is not None:
+            outputs.record(dest_path, out.hexdigest())
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     
     print(f"Page generated successfully at {dest_path}")
+    return True
+
+def render_page_job(job):
+    """Render a single page in a worker process, capturing its log output.
+
+    job is a (from_path, template_path, dest_path, basepath, profile, context)
+    tuple, context being the BuildContext.subset() of the page. Returns a (log,
+    error, profile events, written, context) tuple so the parent can print logs
+    in a stable order, report every failure instead of dying on the first one
+    and merge what the page recorded into its own BuildContext.
+    """
+    from_path, template_path, dest_path, basepath, profile, context = job
+    # Start from a clean profiler, a forked worker inherits the parent's events
+    if profile:
+        profiler.enable()
+    else:
+        profiler.disable()
+    log = io.StringIO()
+    error = None
+    written = False
+    try:
+        with contextlib.redirect_stdout(log):
+            written = generate_page(from_path, template_path, dest_path, basepath, context)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finished = profiler.disable()
+    # Only the indexes need to travel back to the parent
+    context.cache = context.images = None
+    return log.getvalue(), error, finished.events if finished else [], written, context
+
+def generate_pages_pipelined(pages, template_path, basepath="/", context=None, depth=PIPELINE_DEPTH):
+    """Generate pages with reading, rendering and writing overlapped in a pipeline.
+
+    A reader thread prefetches the markdown and a writer thread flushes the
+    finished HTML while the next pages render, which hides file system latency.
+    Returns the number of pages whose output file was actually written.
+    """
+    context = context if context is not None else BuildContext()
+
+    def read(page):
+        from_path, dest_path = page
+        if os.path.getsize(from_path) > STREAM_THRESHOLD:
+            # Left for the writer to stream, see load_page_body
+            return None
+        return read_markdown_file(from_path)
+
+    def render(page, markdown_content):
+        from_path, dest_path = page
+        title, html_content, page_metadata = load_page_body(from_path, context.cache, markdown_content)
+        prepared = prepare_page(from_path, dest_path, template_path, title, html_content, page_metadata, basepath,
+                                context)
+        if markdown_content is None:
+            render_to = lambda out: prepared.template.render_to(out, prepared.values)
+        else:
+            with profiler.stage("serialize", from_path) as record:
+                html = prepared.template.render(prepared.values)
+                record["bytes"] = len(html)
+            render_to = lambda out: out.write(html)
+        return prepared, render_to
+
+    def write(page, rendered):
+        from_path, dest_path = page
+        prepared, render_to = rendered
+        print(f"Generating page from {from_path} to {dest_path} using {prepared.template.dependencies[0]}")
+        written = write_page(from_path, dest_path, render_to, context.outputs)
+        finish_page(prepared, context)
+        return written
+
+    results = run_pipeline(pages, read, render, write, depth)
+    failures = [
+        f"  {from_path}: {type(error).__name__}: {error}"
+        for (from_path, dest_path), written, error in results
+        if error is not None
+    ]
+    if failures:
+        raise RuntimeError(f"{len(failures)} page(s) failed to generate:\n" + "\n".join(failures))
+    return sum(1 for page, written, error in results if written)
+
+def generate_pages(pages, template_path, basepath="/", jobs=1, context=None, pipeline=False):
+    """Generate a list of (markdown path, html path) pages, optionally in a process pool.
+
+    With pipeline set, a serial build overlaps its file I/O with rendering.
+    Returns the number of pages whose output file was actually written.
+    """
+    context = context if context is not None else BuildContext()
+    if pipeline and jobs <= 1 and len(pages) > 1:
+        return generate_pages_pipelined(pages, template_path, basepath, context)
+
+    if jobs <= 1 or len(pages) <= 1:
+        written = 0
+        for from_path, dest_path in pages:
+            written += generate_page(from_path, template_path, dest_path, basepath, context)
+        return written
+
+    profile = profiler.enabled()
+    page_jobs = [
+        (from_path, template_path, dest_path, basepath, profile, context.subset(dest_path))
+        for from_path, dest_path in pages
+    ]
+    chunksize = max(1, len(page_jobs) // (jobs * 4))
+    failures = []
+    written = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(render_page_job, page_jobs, chunksize=chunksize)
+        for (from_path, dest_path), result in zip(pages, results):
+            log, error, events, page_written, page_context = result
+            print(log, end="")
+            if profile:
+                profiler.active().events.extend(events)
+            if error is not None:
+                failures.append(f"  {from_path}: {error}")
+            written += page_written
+            context.merge(page_context)
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} page(s) failed to generate:\n" + "\n".join(failures))
+    return written
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", jobs=1, context=None,
+                             pipeline=False):
+    """Recursively generate HTML pages from markdown files in a directory.
+
+    Returns the number of pages whose output file was actually written.
+    """
+    if jobs > 1 or pipeline:
+        # Discover every page up front so they can be spread across workers
+        for directory in sorted(list_directories(dir_path_content)):
+            os.makedirs(os.path.join(dest_dir_path, directory), exist_ok=True)
+        pages = [
+            (os.path.join(dir_path_content, rel), os.path.join(dest_dir_path, page_output_path(rel)))
+            for rel in list_files(dir_path_content, '.md')
+        ]
+        return generate_pages(pages, template_path, basepath, jobs, context, pipeline)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
-    """Recursively generate HTML pages from markdown files in a directory."""
     # List all items in the content directory
     items = os.listdir(dir_path_content)
+    written = 0
     
     for item in items:
         content_path = os.path.join(dir_path_content, item)
@@ -110,7 +405,7 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
                 dest_path = os.path.join(dest_dir_path, html_filename)
                 
                 # Generate the page
-                generate_page(content_path, template_path, dest_path, basepath)
+                written += generate_page(content_path, template_path, dest_path, basepath, context)
         else:
             # It's a directory, create corresponding directory in dest and recurse
             new_content_dir = content_path
@@ -122,7 +417,291 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
                 os.makedirs(new_dest_dir)
             
             # Recurse into the subdirectory
-            generate_pages_recursive(new_content_dir, template_path, new_dest_dir, basepath)
+            written += generate_pages_recursive(new_content_dir, template_path, new_dest_dir, basepath,
+                                                context=context)
+
+    return written
+
+def list_files(dir_path, suffix=""):
+    """Return the sorted relative paths of all files under a directory ending in suffix."""
+    files = []
+    for root, dirs, filenames in os.walk(dir_path):
+        for filename in filenames:
+            if filename.endswith(suffix):
+                files.append(os.path.relpath(os.path.join(root, filename), dir_path))
+    return sorted(files)
+
+def list_directories(dir_path):
+    """Return the relative paths of all directories under a directory."""
+    directories = set()
+    for root, dirs, filenames in os.walk(dir_path):
+        for name in dirs:
+            directories.add(os.path.relpath(os.path.join(root, name), dir_path))
+    return directories
+
+def page_output_path(relative_path):
+    """Map a markdown path relative to the content directory to its html path."""
+    return os.path.join(os.path.dirname(relative_path), Path(relative_path).stem + '.html')
+
+def remove_output(output_dir, relative_path, keep_dirs):
+    """Delete a stale output file and prune directories a clean build would not create."""
+    dest_path = os.path.join(output_dir, relative_path)
+    if os.path.exists(dest_path):
+        print(f"Removing stale file: {dest_path}")
+        os.remove(dest_path)
+
+    parent = os.path.dirname(relative_path)
+    while parent and parent not in keep_dirs:
+        parent_path = os.path.join(output_dir, parent)
+        if not os.path.isdir(parent_path) or os.listdir(parent_path):
+            break
+        print(f"Removing empty directory: {parent_path}")
+        os.rmdir(parent_path)
+        parent = os.path.dirname(parent)
+
+def sync_static_to_public(public_dir="public", static_dir="static", content_dir="content",
+                          mode="copy", checksum=False, keep=()):
+    """Bring public directory in line with static without deleting it first.
+
+    Generated page outputs and site artifacts are left in place since they are
+    rewritten right after, as are any other paths in keep; everything else that
+    is not in static is removed.
+    """
+    keep = {page_output_path(rel) for rel in list_files(content_dir, '.md')} | set(ARTIFACT_FILES) | set(keep)
+    sync_directory(static_dir, public_dir, keep, mode, checksum)
+
+def generate_listings(metadata, artifacts, listings, template_path, output_dir, basepath="/", content_dir="content",
+                      outputs=None, page_size=PAGE_SIZE):
+    """Generate the paginated blog listing and tag pages from the MetadataIndex.
+
+    Summaries come from the text SiteArtifacts collected while the posts were
+    rendered, and the listing pages are collected into SiteArtifacts as well. A
+    listing page is only rendered again when what it shows, the template or its
+    partials, or the basepath changed. Returns a (written, unchanged) tuple.
+    """
+    page_outputs = {rel: page_output_path(rel).replace(os.sep, "/") for rel in list_files(content_dir, '.md')}
+    template = load_template(template_path, basepath)
+    template_hash = hash_text("".join(hash_file(path) for path in template.dependencies))
+
+    produced = set(page_outputs.values())
+    current = []
+    written = unchanged = 0
+    for rel, title, content, signature in build_listing_pages(metadata, page_outputs, artifacts.pages, page_size):
+        if rel in produced:
+            print(f"Skipping listing {rel}, a page is generated there")
+            continue
+        current.append(rel)
+        signature = hash_text("\0".join([template_hash, basepath, signature]))
+        if listings.is_current(output_dir, rel, signature) and rel in artifacts.pages:
+            unchanged += 1
+            continue
+        dest_path = os.path.join(output_dir, rel)
+        print(f"Generating listing {dest_path}")
+        extractor = PageTextExtractor()
+        values = {"Title": escape_text(title), "Content": CapturedBody(content, extractor)}
+        written += write_page(template_path, dest_path, lambda out: template.render_to(out, values), outputs)
+        artifacts.add_page(dest_path, title, extractor.text(), listing=True)
+        listings.pages[rel] = signature
+
+    listings.remove_stale(output_dir, current)
+    if listings.path is not None:
+        listings.save()
+    return written, unchanged
+
+def check_links(links, static_dir="static", content_dir="content", strict=False, generated=()):
+    """Bring the link index up to date and report broken internal links.
+
+    Pages indexed while they were rendered are not read again, only the
+    sources of the others that changed since they were indexed.
+
+    Links to generated outputs, such as listing pages, count as resolved.
+    Broken links and missing images are printed as warnings, or fail the build
+    with a RuntimeError when strict is set.
+    """
+    page_outputs = {rel: page_output_path(rel) for rel in list_files(content_dir, '.md')}
+    links.refresh(content_dir, page_outputs)
+    broken = links.resolve(set(list_files(static_dir)) | set(page_outputs.values()) | set(generated))
+    if links.path is not None:
+        links.save()
+
+    problems = [
+        f"  {os.path.join(content_dir, rel)}: {'missing image' if kind == 'image' else 'broken link'} {url}"
+        for rel, kind, url in broken
+    ]
+    if problems and strict:
+        raise RuntimeError(f"{len(problems)} broken link(s) found:\n" + "\n".join(problems))
+    if problems:
+        print(f"Warning: {len(problems)} broken link(s) found:\n" + "\n".join(problems))
+    return broken
+
+def build_incremental(static_dir, content_dir, template_path, output_dir, basepath="/",
+                      manifest_path=MANIFEST_PATH, jobs=1, link_mode="copy", context=None, pipeline=False):
+    """Rebuild only the outputs whose sources changed since the last recorded build.
+
+    Falls back to a clean build when there is no usable manifest, so the output
+    is always identical to what a full build would produce. The manifest keeps
+    a DependencyGraph of the sources, templates, partials and images each page
+    was rendered from, and a page is re-rendered only when one of those changed,
+    with the reasons printed; it becomes the deps of the BuildContext. Pages
+    missing from its SiteArtifacts are re-rendered too, so their data can be
+    collected. With an ImagePipeline, its variants are placed. With a
+    LinkIndex, the re-rendered pages are indexed.
+
+    Returns {output path: reasons} of the re-rendered pages, or None after a
+    full build.
+    """
+    context = context if context is not None else BuildContext()
+    images = context.images
+    static_hashes = {rel: hash_file(os.path.join(static_dir, rel)) for rel in list_files(static_dir)}
+    page_hashes = {rel: hash_file(os.path.join(content_dir, rel)) for rel in list_files(content_dir, '.md')}
+
+    manifest = new_manifest(basepath)
+    manifest["static"] = static_hashes
+    manifest["pages"] = page_hashes
+    image_keep = ()
+    if images is not None:
+        manifest["images"] = images.signature()
+        image_keep = images.variant_outputs()
+
+    states = InputStates(basepath, images, {os.path.join(content_dir, rel): h for rel, h in page_hashes.items()})
+
+    old_manifest = load_manifest(manifest_path)
+    if old_manifest is None or not os.path.isdir(output_dir):
+        print("No usable build manifest, running a full build...")
+        sync_static_to_public(output_dir, static_dir, content_dir, link_mode, keep=image_keep)
+        if images is not None:
+            images.place(output_dir, link_mode)
+        context.deps = DependencyGraph(output_dir)
+        generate_pages_recursive(content_dir, template_path, output_dir, basepath, jobs, context, pipeline)
+        save_dependencies(manifest, context.deps, states)
+        save_manifest(manifest, manifest_path)
+        return None
+
+    deps = context.deps = DependencyGraph(output_dir, old_manifest.get("deps", {}))
+    old_states = old_manifest.get("inputs", {})
+    # Pages rendered without the image pipeline recorded no images
+    images_toggled = ("images" in old_manifest) != ("images" in manifest)
+
+    page_outputs = {page_output_path(rel): rel for rel in page_hashes}
+    keep_dirs = list_directories(static_dir) | list_directories(content_dir)
+
+    # Remove outputs whose sources disappeared, unless another source still produces them
+    for rel in old_manifest["static"]:
+        if rel not in static_hashes and rel not in page_outputs:
+            remove_output(output_dir, rel, keep_dirs)
+    for rel in old_manifest["pages"]:
+        dest_rel = page_output_path(rel)
+        if rel not in page_hashes and dest_rel not in page_outputs and dest_rel not in static_hashes:
+            remove_output(output_dir, dest_rel, keep_dirs)
+
+    for directory in sorted(keep_dirs):
+        dest_dir = os.path.join(output_dir, directory)
+        if not os.path.exists(dest_dir):
+            print(f"Creating directory: {dest_dir}")
+            os.makedirs(dest_dir)
+
+    copied = set()
+    for rel, file_hash in static_hashes.items():
+        dst_path = os.path.join(output_dir, rel)
+        if old_manifest["static"].get(rel) != file_hash or not os.path.exists(dst_path):
+            src_path = os.path.join(static_dir, rel)
+            print(f"Copying file: {src_path} -> {dst_path}")
+            copy_file(src_path, dst_path, link_mode)
+            copied.add(rel)
+    if images is not None:
+        images.place(output_dir, link_mode)
+
+    to_render = []
+    rebuilt = {}
+    for dest_rel, rel in sorted(page_outputs.items()):
+        dest_path = os.path.join(output_dir, dest_rel)
+        graph_rel = dest_rel.replace(os.sep, "/")
+        if rel not in old_manifest["pages"]:
+            reasons = ["new page"]
+        elif not os.path.exists(dest_path):
+            reasons = ["output missing"]
+        elif dest_rel in copied:
+            reasons = ["overwritten by a static file"]
+        elif images_toggled:
+            reasons = ["image processing turned on" if images is not None else "image processing turned off"]
+        else:
+            reasons = deps.changed_inputs(graph_rel, old_states, states)
+        if not reasons and context.artifacts is not None and graph_rel not in context.artifacts.pages:
+            reasons = ["page data not collected"]
+        if reasons:
+            print(f"Rebuilding {dest_path}: {', '.join(reasons)}")
+            rebuilt[graph_rel] = reasons
+            to_render.append((os.path.join(content_dir, rel), dest_path))
+    written = generate_pages(to_render, template_path, basepath, jobs, context, pipeline)
+    rendered = len(to_render)
+
+    deps.prune({dest_rel.replace(os.sep, "/") for dest_rel in page_outputs})
+    save_dependencies(manifest, deps, states)
+    save_manifest(manifest, manifest_path)
+    print(f"Incremental build: {rendered} page(s) rendered, {written} written, "
+          f"{len(copied)} static file(s) copied")
+    return rebuilt
+
+def save_dependencies(manifest, deps, states):
+    """Store a DependencyGraph in a manifest, with the current hash of every input it names."""
+    manifest["deps"] = deps.outputs
+    manifest["inputs"] = {key: states.get(key) for key in sorted(deps.inputs())}
+
+def parse_args(argv):
+    """Parse the command line arguments of the site generator."""
+    parser = argparse.ArgumentParser(description="Build the static site into the docs directory.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served under")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"only rebuild outputs whose sources changed, tracked in {MANIFEST_PATH}")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes used to render pages (default: 1, serial)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="overlap reading and writing files with rendering when building serially")
+    parser.add_argument("--sync", action="store_true",
+                        help="update the output directory in place, copying only changed static files and "
+                             "leaving unchanged pages untouched (the default unless --clean)")
+    parser.add_argument("--clean", action="store_true",
+                        help="delete the output directory and recreate it from scratch, rewriting every file")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="copy",
+                        help="how static files are placed when syncing (default: copy)")
+    parser.add_argument("--checksum", action="store_true",
+                        help="compare static files by content hash instead of size and mtime when syncing")
+    parser.add_argument("--check-links", action="store_true",
+                        help="fail the build when a page links to a page or image that does not exist")
+    parser.add_argument("--images", action="store_true",
+                        help=f"give <img> tags width, height and a srcset of downscaled variants (variants need "
+                             f"Pillow), processed images are cached in {IMAGES_DIR}")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="origin the site is published at, e.g. https://example.github.io; "
+                             "enables sitemap.xml and the feed.xml RSS feed of the blog")
+    parser.add_argument("--search-index", action="store_true",
+                        help="write search.json with the title and text of every page")
+    parser.add_argument("--listings", action="store_true",
+                        help="generate paginated blog/ listing and tags/ pages from the front matter of the posts, "
+                             f"indexed in {METADATA_PATH}")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, metavar="N",
+                        help=f"posts per listing page (default: {PAGE_SIZE})")
+    parser.add_argument("--compress", action="store_true",
+                        help=f"write precompressed {' and '.join(available_formats())} copies of text outputs, "
+                             f"using --jobs worker processes; only changed files are recompressed")
+    parser.add_argument("--profile", action="store_true",
+                        help="report time, calls and bytes per build stage and the slowest pages")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="number of slowest pages listed by --profile (default: 10)")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write a Chrome trace JSON of the build stages (implies --profile)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"parse every page from scratch instead of using the render cache in {CACHE_DIR}")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="maximum size of the render cache in MiB (default: 256)")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.sync and args.clean:
+        parser.error("--sync and --clean cannot be combined")
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+    return args
 
 def main():
     # Change to the project root directory (parent of src)
@@ -130,21 +709,98 @@ def main():
     project_root = os.path.dirname(script_dir)
     os.chdir(project_root)
     
+    # `main.py serve` runs the development server instead of a one-off build
+    if sys.argv[1:2] == ["serve"]:
+        from serve import serve_main
+        serve_main(sys.argv[2:])
+        return
+    
     # Get basepath from command line argument, default to "/"
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+    args = parse_args(sys.argv[1:])
+    basepath = args.basepath
     
     print(f"Starting static site generator with basepath: {basepath}")
     
     # Use docs directory for GitHub Pages
     output_dir = "docs"
     
-    # Copy static files
-    copy_static_to_public(output_dir)
+    context = BuildContext(
+        cache=None if args.no_cache else RenderCache(CACHE_DIR, args.cache_size * 1024 * 1024),
+        outputs=OutputIndex.load(OUTPUTS_PATH),
+        links=LinkIndex.load(LINKS_PATH, "content", output_dir),
+    )
+    if args.site_url or args.search_index or args.listings:
+        # Listings summarize the text collected for the artifacts
+        context.artifacts = SiteArtifacts.load(output_dir, basepath, ARTIFACTS_PATH)
+    metadata = listings = None
+    if args.listings:
+        metadata = MetadataIndex.load("content", METADATA_PATH)
+        listings = ListingIndex.load(LISTINGS_PATH)
+    
+    images = None
+    if args.images:
+        images = context.images = ImagePipeline.load(IMAGES_DIR, basepath)
+        processed, cached = images.process("static")
+        print(f"Images: {processed} processed, {cached} cached")
+    
+    if args.profile or args.trace:
+        profiler.enable()
+    
+    try:
+        if args.incremental:
+            build_incremental("static", "content", "template.html", output_dir, basepath,
+                              jobs=args.jobs, link_mode=args.link_mode, context=context, pipeline=args.pipeline)
+        else:
+            # Sync static files in place, so the OutputIndex can leave unchanged pages alone
+            if not args.clean:
+                keep = set(images.variant_outputs()) if images is not None else set()
+                if args.compress:
+                    # Keep compressed copies so unchanged files are not compressed again
+                    keep |= compressed_siblings(load_index(COMPRESSED_PATH))
+                if listings is not None:
+                    keep |= set(listings.pages)
+                sync_static_to_public(output_dir, mode=args.link_mode, checksum=args.checksum, keep=keep)
+            else:
+                copy_static_to_public(output_dir)
+            if images is not None:
+                images.place(output_dir, args.link_mode)
+            
+            # Generate all pages recursively
+            written = generate_pages_recursive("content", "template.html", output_dir, basepath,
+                                               args.jobs, context, args.pipeline)
+            print(f"{written} page(s) written")
+        
+        if listings is not None:
+            written, unchanged = generate_listings(metadata, context.artifacts, listings, "template.html", output_dir,
+                                                   basepath, outputs=context.outputs, page_size=args.page_size)
+            print(f"Listings: {written} written, {unchanged} unchanged")
+        
+        if context.artifacts is not None:
+            for path in context.artifacts.write(args.site_url, args.search_index):
+                print(f"Wrote {path}")
+        
+        if args.compress:
+            compress_outputs(output_dir, args.jobs, COMPRESSED_PATH)
+        
+        check_links(context.links, strict=args.check_links, generated=listings.pages if listings is not None else ())
+    except RuntimeError as e:
+        context.outputs.save()
+        print(f"Site generation failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    context.outputs.save()
+    if metadata is not None and metadata.fresh:
+        metadata.save()
+    
+    if context.cache is not None:
+        context.cache.prune()
     
-    # Generate all pages recursively
-    generate_pages_recursive("content", "template.html", output_dir, basepath)
+    finished = profiler.disable()
+    if finished is not None:
+        print(finished.report(args.profile_top))
+        if args.trace:
+            finished.write_chrome_trace(args.trace)
+            print(f"Wrote Chrome trace to {args.trace}")
     
     print("Site generation complete!")
 
@@ -0,0 +1,59 @@
+# manifest.py
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+def hash_bytes(data):
+    """Return the hex sha256 digest of a bytes object."""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_text(text):
+    """Return the hex sha256 digest of a string encoded as utf-8."""
+    return hash_bytes(text.encode("utf-8"))
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Return the hex sha256 digest of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def new_manifest(basepath):
+    """Create an empty manifest for a build with the given basepath."""
+    return {
+        "version": MANIFEST_VERSION,
+        "basepath": basepath,
+        "static": {},
+        "pages": {},
+    }
+
+def load_json(path, default):
+    """Return the JSON value stored at path, or default if it is missing, corrupt or of another type."""
+    try:
+        with open(path, 'r') as f:
+            value = json.load(f)
+    except (OSError, ValueError):
+        return default
+    return value if isinstance(value, type(default)) else default
+
+def save_json(value, path, indent=None):
+    """Write a JSON value to path, replacing any previous file atomically."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f, indent=indent, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def load_manifest(path):
+    """Load a manifest from disk, returning None if it is missing, corrupt or outdated."""
+    manifest = load_json(path, {})
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def save_manifest(manifest, path):
+    """Write a manifest to disk, replacing any previous one atomically."""
+    save_json(manifest, path, indent=2)
@@ -0,0 +1,66 @@
+# outputs.py
+import hashlib
+import os
+from manifest import load_json, save_json
+
+OUTPUTS_PATH = os.path.join(".build", "outputs.json")
+
+class HashingWriter:
+    """Write-through wrapper that hashes everything written to a text file."""
+
+    def __init__(self, out):
+        self.out = out
+        self.digest = hashlib.sha256()
+
+    def write(self, text):
+        self.digest.update(text.encode("utf-8"))
+        return self.out.write(text)
+
+    def flush(self):
+        self.out.flush()
+
+    def tell(self):
+        return self.out.tell()
+
+    def hexdigest(self):
+        return self.digest.hexdigest()
+
+class OutputIndex:
+    """Hashes of the files written by previous builds.
+
+    Each entry maps an output path to [sha256, size, mtime_ns] as of when it was
+    written. An output only counts as unchanged while the file on disk still has
+    that size and mtime, so files edited or replaced behind our back get rewritten.
+    """
+
+    def __init__(self, path=None, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, path=OUTPUTS_PATH):
+        """Load the hashes of the last build, or start without any."""
+        return cls(path, load_json(path, {}))
+
+    def save(self):
+        save_json(self.entries, self.path)
+
+    def subset(self, dest_paths):
+        """Return an unsaved index holding only the given outputs."""
+        return OutputIndex(None, {path: self.entries[path] for path in dest_paths if path in self.entries})
+
+    def is_unchanged(self, dest_path, content_hash):
+        """Return True if dest_path still holds exactly the content with this hash."""
+        entry = self.entries.get(dest_path)
+        if entry is None or entry[0] != content_hash:
+            return False
+        try:
+            stat = os.stat(dest_path)
+        except FileNotFoundError:
+            return False
+        return [stat.st_size, stat.st_mtime_ns] == entry[1:]
+
+    def record(self, dest_path, content_hash):
+        """Remember the hash of a file that was just written."""
+        stat = os.stat(dest_path)
+        self.entries[dest_path] = [content_hash, stat.st_size, stat.st_mtime_ns]
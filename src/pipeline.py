@@ -0,0 +1,78 @@
+# pipeline.py
+import queue
+import threading
+
+# Items allowed to wait between two stages; bounds how many pages are in memory
+PIPELINE_DEPTH = 8
+
+_DONE = object()
+
+def run_pipeline(items, read, render, write, depth=PIPELINE_DEPTH):
+    """Pass every item through read, render and write stages that run concurrently.
+
+    read(item) runs on a reader thread and write(item, rendered) on a writer
+    thread, so blocking file I/O overlaps with render(item, data) on the calling
+    thread. The stages are joined by queues holding at most depth items each.
+    Items are written in order. A stage raising an Exception only fails its own
+    item; returns a list of (item, write result, exception or None) per item.
+    """
+    read_queue = queue.Queue(depth)
+    write_queue = queue.Queue(depth)
+    results = []
+    stop = threading.Event()
+
+    def reader():
+        for item in items:
+            if stop.is_set():
+                break
+            try:
+                read_queue.put((item, read(item), None))
+            except Exception as e:
+                read_queue.put((item, None, e))
+        read_queue.put(_DONE)
+
+    def writer():
+        while True:
+            entry = write_queue.get()
+            if entry is _DONE:
+                return
+            item, rendered, error = entry
+            result = None
+            if error is None and not stop.is_set():
+                try:
+                    result = write(item, rendered)
+                except Exception as e:
+                    error = e
+            results.append((item, result, error))
+
+    reader_thread = threading.Thread(target=reader, name="pipeline-reader", daemon=True)
+    writer_thread = threading.Thread(target=writer, name="pipeline-writer", daemon=True)
+    reader_thread.start()
+    writer_thread.start()
+    try:
+        while True:
+            entry = read_queue.get()
+            if entry is _DONE:
+                break
+            item, data, error = entry
+            rendered = None
+            if error is None:
+                try:
+                    rendered = render(item, data)
+                except Exception as e:
+                    error = e
+            write_queue.put((item, rendered, error))
+    except BaseException:
+        # Unblock the reader so it can notice the stop and exit
+        stop.set()
+        while reader_thread.is_alive():
+            try:
+                read_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        raise
+    finally:
+        write_queue.put(_DONE)
+        writer_thread.join()
+        reader_thread.join()
+    return results
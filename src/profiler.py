@@ -0,0 +1,116 @@
+# profiler.py
+import contextlib
+import json
+import os
+import threading
+import time
+
+_active = None
+
+class Profiler:
+    """Records timed build stages, optionally tied to the page being built."""
+
+    def __init__(self):
+        self.events = []
+
+    @contextlib.contextmanager
+    def stage(self, name, page=None):
+        """Time the enclosed block; set record["bytes"] to count the bytes it processed."""
+        record = {"bytes": 0}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.events.append({
+                "name": name,
+                "page": page,
+                "start": start,
+                "duration": time.perf_counter() - start,
+                "bytes": record["bytes"],
+                "pid": os.getpid(),
+                "tid": threading.get_native_id(),
+            })
+
+    def stage_totals(self):
+        """Return {stage: (calls, seconds, bytes)} summed over all events."""
+        return self._totals("name")
+
+    def page_totals(self):
+        """Return {page: (calls, seconds, bytes)} summed over the stages of each page."""
+        return self._totals("page")
+
+    def _totals(self, key):
+        totals = {}
+        for event in self.events:
+            if event[key] is None:
+                continue
+            calls, seconds, nbytes = totals.get(event[key], (0, 0.0, 0))
+            totals[event[key]] = (calls + 1, seconds + event["duration"], nbytes + event["bytes"])
+        return totals
+
+    def report(self, top=10):
+        """Format the per-stage totals and the slowest pages as tables."""
+        lines = [f"{'stage':<15} {'calls':>7} {'total ms':>10} {'MB':>9} {'MB/s':>9}"]
+        for name, (calls, seconds, nbytes) in sorted(self.stage_totals().items(), key=lambda item: -item[1][1]):
+            rate = nbytes / seconds / 1e6 if seconds and nbytes else 0.0
+            lines.append(f"{name:<15} {calls:>7} {seconds * 1000:>10.2f} {nbytes / 1e6:>9.3f} {rate:>9.2f}")
+
+        pages = sorted(self.page_totals().items(), key=lambda item: -item[1][1])[:top]
+        if pages:
+            lines.append("")
+            lines.append(f"Top {len(pages)} slowest pages:")
+            lines.append(f"{'calls':>7} {'total ms':>10} {'MB':>9}  page")
+            for page, (calls, seconds, nbytes) in pages:
+                lines.append(f"{calls:>7} {seconds * 1000:>10.2f} {nbytes / 1e6:>9.3f}  {page}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Return the events in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        origin = min((event["start"] for event in self.events), default=0.0)
+        trace_events = []
+        for event in self.events:
+            args = {"bytes": event["bytes"]}
+            if event["page"] is not None:
+                args["page"] = event["page"]
+            trace_events.append({
+                "name": event["name"],
+                "cat": "build",
+                "ph": "X",
+                "ts": (event["start"] - origin) * 1e6,
+                "dur": event["duration"] * 1e6,
+                "pid": event["pid"],
+                "tid": event.get("tid", event["pid"]),
+                "args": args,
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+def enable():
+    """Start recording stages into a fresh profiler and return it."""
+    global _active
+    _active = Profiler()
+    return _active
+
+def disable():
+    """Stop recording and return the profiler that was active, if any."""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+def enabled():
+    return _active is not None
+
+def active():
+    return _active
+
+@contextlib.contextmanager
+def stage(name, page=None):
+    """Time a stage on the active profiler; does nothing when profiling is off."""
+    if _active is None:
+        yield {"bytes": 0}
+        return
+    with _active.stage(name, page) as record:
+        yield record
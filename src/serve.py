@@ -0,0 +1,241 @@
+# serve.py
+import argparse
+import functools
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from main import (copy_static_to_public, generate_page, generate_pages_recursive,
+                  list_directories, page_output_path, remove_output)
+from context import BuildContext
+from deps import BASEPATH_INPUT, IMAGE_INPUT_PREFIX, DependencyGraph
+from sync import copy_file
+
+RELOAD_PATH = "/__livereload"
+
+RELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + RELOAD_PATH + "\")"
+    ".onmessage = function () { location.reload(); };</script>"
+)
+
+def snapshot_paths(paths):
+    """Return {file path: (mtime_ns, size)} for the given files and directory trees."""
+    snapshot = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, dirs, filenames in os.walk(path):
+            for filename in filenames:
+                file_path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def diff_snapshots(old, new):
+    """Return the (changed or added, removed) file paths between two snapshots."""
+    changed = {path for path, stamp in new.items() if old.get(path) != stamp}
+    removed = set(old) - set(new)
+    return changed, removed
+
+def watched_paths(static_dir, content_dir, template_path, deps):
+    """Return the sources to poll: the static and content trees and every template and partial pages use."""
+    templates = {
+        key for key in deps.inputs()
+        if key != BASEPATH_INPUT and not key.startswith((IMAGE_INPUT_PREFIX, content_dir + os.sep))
+    }
+    return [static_dir, content_dir, template_path] + sorted(templates - {template_path})
+
+def rebuild_changes(changed, removed, static_dir, content_dir, template_path, output_dir, deps, basepath="/"):
+    """Re-render or re-copy only the outputs affected by the changed source files.
+
+    deps is the DependencyGraph of the pages as last rendered; a changed
+    template or partial re-renders the pages that depend on it, and the graph
+    is kept up to date. Returns the sorted relative output paths that were
+    written or removed.
+    """
+    touched = set()
+    keep_dirs = list_directories(static_dir) | list_directories(content_dir)
+
+    # A template or partial re-renders the pages last rendered with it
+    for path in sorted(changed | removed):
+        if path.startswith(static_dir + os.sep) or path.startswith(content_dir + os.sep):
+            continue
+        changed = changed | {
+            key
+            for rel in deps.dependents(path)
+            for key in deps.outputs[rel]
+            if key.startswith(content_dir + os.sep) and key.endswith('.md') and key not in removed
+        }
+
+    for path in sorted(removed):
+        if path.startswith(static_dir + os.sep):
+            rel = os.path.relpath(path, static_dir)
+        elif path.startswith(content_dir + os.sep) and path.endswith('.md'):
+            rel = page_output_path(os.path.relpath(path, content_dir))
+            deps.outputs.pop(rel.replace(os.sep, "/"), None)
+        else:
+            continue
+        remove_output(output_dir, rel, keep_dirs)
+        touched.add(rel)
+
+    for path in sorted(changed):
+        if path.startswith(static_dir + os.sep):
+            rel = os.path.relpath(path, static_dir)
+            dest_path = os.path.join(output_dir, rel)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            copy_file(path, dest_path)
+            touched.add(rel)
+        elif path.startswith(content_dir + os.sep) and path.endswith('.md'):
+            rel = page_output_path(os.path.relpath(path, content_dir))
+            generate_page(path, template_path, os.path.join(output_dir, rel), basepath, BuildContext(deps=deps))
+            touched.add(rel)
+
+    return sorted(touched)
+
+class ReloadBroadcaster:
+    """Tells every connected browser to reload after a rebuild."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until the version moves past the given one or the timeout expires."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    """Serves the output directory, injecting the live reload script into HTML pages."""
+
+    broadcaster = None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == RELOAD_PATH:
+            self.send_reload_events()
+            return
+
+        file_path = self.translate_path(self.path)
+        if os.path.isdir(file_path):
+            file_path = os.path.join(file_path, "index.html")
+        if path.endswith("/") or path.endswith(".html"):
+            if os.path.isfile(file_path):
+                self.send_html(file_path)
+                return
+        super().do_GET()
+
+    def send_html(self, file_path):
+        with open(file_path, 'r') as f:
+            html = f.read()
+        if "</body>" in html:
+            html = html.replace("</body>", RELOAD_SCRIPT + "</body>", 1)
+        else:
+            html += RELOAD_SCRIPT
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_reload_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        version = self.broadcaster.version
+        try:
+            while True:
+                new_version = self.broadcaster.wait(version, timeout=15)
+                if new_version != version:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = new_version
+                else:
+                    # Keep the connection alive through proxies
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if not self.path.startswith(RELOAD_PATH):
+            super().log_message(format, *args)
+
+def start_server(output_dir, port, broadcaster):
+    """Serve output_dir on a background thread and return the server."""
+    handler = functools.partial(LiveReloadHandler, directory=output_dir)
+    LiveReloadHandler.broadcaster = broadcaster
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def watch(static_dir, content_dir, template_path, output_dir, basepath, broadcaster, deps, interval=0.5):
+    """Poll the sources forever, rebuilding and reloading browsers on every change.
+
+    deps is the DependencyGraph of the initial build, see rebuild_changes.
+    """
+    previous = snapshot_paths(watched_paths(static_dir, content_dir, template_path, deps))
+    while True:
+        time.sleep(interval)
+        # Pages may have started or stopped using a template or partial
+        current = snapshot_paths(watched_paths(static_dir, content_dir, template_path, deps))
+        changed, removed = diff_snapshots(previous, current)
+        previous = current
+        if not changed and not removed:
+            continue
+
+        start = time.perf_counter()
+        try:
+            touched = rebuild_changes(changed, removed, static_dir, content_dir,
+                                      template_path, output_dir, deps, basepath)
+        except Exception as e:
+            print(f"Rebuild failed: {type(e).__name__}: {e}")
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Rebuilt {len(touched)} output(s) in {elapsed:.1f} ms: {', '.join(touched)}")
+        broadcaster.notify()
+
+def parse_args(argv):
+    """Parse the command line arguments of the development server."""
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Build the site and serve it locally.")
+    parser.add_argument("--port", type=int, default=8888, help="port to serve on (default: 8888)")
+    parser.add_argument("--watch", action="store_true", help="rebuild changed pages and reload open browsers")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between change polls (default: 0.5)")
+    return parser.parse_args(argv)
+
+def serve_main(argv, output_dir="docs"):
+    """Entry point of `main.py serve`, run from the project root."""
+    args = parse_args(argv)
+    basepath = "/"
+
+    copy_static_to_public(output_dir)
+    deps = DependencyGraph(output_dir)
+    generate_pages_recursive("content", "template.html", output_dir, basepath, context=BuildContext(deps=deps))
+
+    broadcaster = ReloadBroadcaster()
+    server = start_server(output_dir, args.port, broadcaster)
+    print(f"Serving {output_dir} at http://localhost:{args.port}/")
+    try:
+        if args.watch:
+            print("Watching content, static and the templates for changes...")
+            watch("static", "content", "template.html", output_dir, basepath, broadcaster, deps, args.interval)
+        else:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
@@ -0,0 +1,185 @@
+# sync.py
+import os
+import shutil
+from manifest import hash_file
+import profiler
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+# ioctl request number for cloning a whole file on Linux (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+def _clone_file(src, dst):
+    """Copy src to dst sharing extents when the filesystem allows it.
+
+    Tries a FICLONE reflink, then copy_file_range (which filesystems may also
+    turn into a clone), and finally falls back to a regular copy.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            import fcntl
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except (ImportError, OSError):
+            pass
+
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+        shutil.copyfileobj(fsrc, fdst)
+
+def copy_file(src, dst, mode="copy"):
+    """Place a copy of src at dst using the given link mode, replacing dst atomically.
+
+    The source mtime is preserved so later syncs can compare by size and mtime.
+    Hard links fall back to a copy when src and dst are on different filesystems.
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {mode}")
+
+    with profiler.stage("copy_static") as record:
+        _place_file(src, dst, mode)
+        record["bytes"] = os.path.getsize(dst)
+
+def _place_file(src, dst, mode):
+    """Write src to a temporary file next to dst, then rename it over dst."""
+    tmp_path = dst + ".tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+    if mode == "hardlink":
+        try:
+            os.link(src, tmp_path)
+            os.replace(tmp_path, dst)
+            return
+        except OSError:
+            pass
+
+    try:
+        if mode == "reflink":
+            _clone_file(src, tmp_path)
+            shutil.copystat(src, tmp_path)
+        else:
+            shutil.copy2(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def is_up_to_date(src, dst, checksum=False):
+    """Return True if dst already holds the same content as src."""
+    if not os.path.isfile(dst) or os.path.islink(dst):
+        return False
+
+    src_stat = os.stat(src)
+    dst_stat = os.stat(dst)
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if os.path.samestat(src_stat, dst_stat):
+        return True
+    if checksum:
+        return hash_file(src) == hash_file(dst)
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+def _remove_path(path):
+    """Remove a file, symlink or directory tree."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+def sync_directory(src, dst, keep=(), mode="copy", checksum=False):
+    """Make dst mirror src, copying only files that changed.
+
+    Files are compared by size and mtime, or by content hash when checksum is
+    set. Anything in dst that is not in src is removed, except the relative
+    paths listed in keep (e.g. generated pages sharing the output directory).
+    Returns a (copied, unchanged, removed) tuple of file counts.
+    """
+    if not os.path.exists(src):
+        raise ValueError(f"Source directory {src} does not exist")
+
+    keep = set(keep)
+    # Directories holding kept files must survive the stale sweep too
+    keep_dirs = set()
+    for rel in keep:
+        parent = os.path.dirname(rel)
+        while parent:
+            keep_dirs.add(parent)
+            parent = os.path.dirname(parent)
+
+    copied = unchanged = removed = 0
+    source_files = set()
+    source_dirs = set()
+
+    os.makedirs(dst, exist_ok=True)
+    for root, dirs, filenames in os.walk(src):
+        rel_root = os.path.relpath(root, src)
+        if rel_root == ".":
+            rel_root = ""
+
+        for name in sorted(dirs):
+            rel = os.path.join(rel_root, name)
+            source_dirs.add(rel)
+            dst_path = os.path.join(dst, rel)
+            if os.path.lexists(dst_path) and not os.path.isdir(dst_path):
+                _remove_path(dst_path)
+            if not os.path.exists(dst_path):
+                print(f"Creating directory: {dst_path}")
+                os.mkdir(dst_path)
+
+        for name in sorted(filenames):
+            rel = os.path.join(rel_root, name)
+            source_files.add(rel)
+            src_path = os.path.join(src, rel)
+            dst_path = os.path.join(dst, rel)
+            if is_up_to_date(src_path, dst_path, checksum):
+                unchanged += 1
+                continue
+            if os.path.isdir(dst_path) and not os.path.islink(dst_path):
+                shutil.rmtree(dst_path)
+            print(f"Copying file: {src_path} -> {dst_path}")
+            copy_file(src_path, dst_path, mode)
+            copied += 1
+
+    # Sweep stale files bottom-up so emptied directories can be removed as well
+    for root, dirs, filenames in os.walk(dst, topdown=False):
+        rel_root = os.path.relpath(root, dst)
+        if rel_root == ".":
+            rel_root = ""
+
+        for name in filenames:
+            rel = os.path.join(rel_root, name)
+            if rel not in source_files and rel not in keep:
+                print(f"Removing stale file: {os.path.join(dst, rel)}")
+                os.remove(os.path.join(dst, rel))
+                removed += 1
+
+        for name in dirs:
+            rel = os.path.join(rel_root, name)
+            path = os.path.join(dst, rel)
+            if rel in source_dirs or rel in keep_dirs:
+                continue
+            if os.path.islink(path):
+                os.remove(path)
+                removed += 1
+            elif not os.listdir(path):
+                print(f"Removing empty directory: {path}")
+                os.rmdir(path)
+
+    print(f"Static sync: {copied} copied, {unchanged} unchanged, {removed} removed")
+    return copied, unchanged, removed
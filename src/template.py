@@ -0,0 +1,157 @@
+# template.py
+import io
+import os
+import re
+
+SLOT_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# {{> partial.html }} is replaced by that file, relative to the including template
+INCLUDE_RE = re.compile(r"\{\{>\s*([\w./-]+)\s*\}\}")
+
+# Root-relative attribute prefixes that get pointed at the basepath
+BASEPATH_PATTERNS = ('href="/', 'src="/')
+
+_template_cache = {}
+
+def rewrite_basepath(text, basepath):
+    """Point root-relative href and src attributes in text at the basepath."""
+    for pattern in BASEPATH_PATTERNS:
+        text = text.replace(pattern, pattern[:-1] + basepath)
+    return text
+
+class BasepathWriter:
+    """Write-through wrapper that points root-relative href and src attributes at a basepath.
+
+    A pattern split across two writes is held back until the next write, so the
+    result matches replacing the patterns in the finished text.
+    """
+
+    def __init__(self, out, basepath):
+        self.out = out
+        self.basepath = basepath
+        self.pending = ""
+
+    def _partial_match_length(self, data):
+        """Return the length of the longest suffix of data that starts a pattern."""
+        longest = max(len(pattern) for pattern in BASEPATH_PATTERNS) - 1
+        for length in range(min(longest, len(data)), 0, -1):
+            suffix = data[-length:]
+            if any(pattern.startswith(suffix) for pattern in BASEPATH_PATTERNS):
+                return length
+        return 0
+
+    def write(self, text):
+        data = self.pending + text
+        cut = len(data) - self._partial_match_length(data)
+        self.pending = data[cut:]
+        self.out.write(rewrite_basepath(data[:cut], self.basepath))
+
+    def flush(self):
+        """Write out any held-back text; it cannot contain a whole pattern."""
+        self.out.write(self.pending)
+        self.pending = ""
+
+class Template:
+    """A template compiled into static segments and the named slots between them.
+
+    segments always has one more entry than slots: segments[0], slots[0],
+    segments[1], ... The basepath rewrite has already been applied to the segments.
+    dependencies lists the files the template was read from, itself first and
+    then its partials.
+    """
+
+    def __init__(self, segments, slots, placeholders, basepath="/", dependencies=()):
+        self.segments = segments
+        self.slots = slots
+        self.placeholders = placeholders
+        self.basepath = basepath
+        self.dependencies = list(dependencies)
+
+    def render_to(self, out, values):
+        """Write the template to out, filling each slot from values.
+
+        A value may be a string or an HTMLNode, which is streamed with write_to.
+        Values also get the basepath rewrite. Slots without a value keep their
+        placeholder text.
+        """
+        value_out = out if self.basepath == "/" else BasepathWriter(out, self.basepath)
+        out.write(self.segments[0])
+        for slot, placeholder, segment in zip(self.slots, self.placeholders, self.segments[1:]):
+            value = values.get(slot)
+            if value is None:
+                out.write(placeholder)
+            elif hasattr(value, "write_to"):
+                value.write_to(value_out)
+            else:
+                value_out.write(value)
+            if value_out is not out:
+                value_out.flush()
+            out.write(segment)
+
+    def render(self, values):
+        """Return the filled-in template as a string."""
+        buffer = io.StringIO()
+        self.render_to(buffer, values)
+        return buffer.getvalue()
+
+def compile_template(template_content, basepath="/"):
+    """Split template text into static segments and {{ Name }} slots."""
+    segments = []
+    slots = []
+    placeholders = []
+    start = 0
+    for match in SLOT_RE.finditer(template_content):
+        segments.append(template_content[start:match.start()])
+        slots.append(match.group(1))
+        placeholders.append(match.group())
+        start = match.end()
+    segments.append(template_content[start:])
+
+    if basepath != "/":
+        segments = [rewrite_basepath(segment, basepath) for segment in segments]
+
+    return Template(segments, slots, placeholders, basepath)
+
+def read_template(template_path, dependencies=None, including=()):
+    """Return the text of a template with its {{> partial }} includes expanded.
+
+    Every file read is appended to dependencies. An include cycle raises a
+    ValueError.
+    """
+    if dependencies is None:
+        dependencies = []
+    if template_path in including:
+        raise ValueError(f"Template include cycle: {' -> '.join(including + (template_path,))}")
+    dependencies.append(template_path)
+    with open(template_path, 'r') as f:
+        text = f.read()
+    template_dir = os.path.dirname(template_path)
+    return INCLUDE_RE.sub(
+        lambda match: read_template(os.path.join(template_dir, match.group(1)), dependencies,
+                                    including + (template_path,)),
+        text,
+    )
+
+def _stats(paths):
+    stats = []
+    for path in paths:
+        stat = os.stat(path)
+        stats.append((stat.st_mtime_ns, stat.st_size))
+    return stats
+
+def load_template(template_path, basepath="/"):
+    """Return the compiled template at template_path, reading it only when it or a partial changed."""
+    key = (os.path.abspath(template_path), basepath)
+    cached = _template_cache.get(key)
+    if cached is not None:
+        try:
+            if cached[0] == _stats(cached[1].dependencies):
+                return cached[1]
+        except OSError:
+            pass
+
+    dependencies = []
+    template = compile_template(read_template(template_path, dependencies), basepath)
+    template.dependencies = dependencies
+    _template_cache[key] = (_stats(dependencies), template)
+    return template
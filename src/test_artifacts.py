@@ -0,0 +1,111 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from artifacts import CapturedBody, PageTextExtractor, SiteArtifacts, page_url
+from htmlnode import LeafNode, ParentNode
+from testutil import write_file
+
+class TestPageTextExtractor(unittest.TestCase):
+    def test_visible_text(self):
+        extractor = PageTextExtractor()
+        extractor.write("<div><h1>Title</h1><p>Some <b>bold</b> &amp; ")
+        extractor.write("<i>italic</i>\ntext</p><ul><li>one</li><li>two</li></ul></div>")
+        self.assertEqual(extractor.text(), "Title Some bold & italic text one two")
+
+    def test_limit(self):
+        extractor = PageTextExtractor(limit=10)
+        extractor.write("<p>" + "word " * 100 + "</p>")
+        self.assertEqual(len(extractor.text()), 10)
+
+    def test_captured_body_writes_and_extracts(self):
+        body = ParentNode("div", [LeafNode("p", "Hello"), LeafNode("p", "world")])
+        for value in (body, body.to_html()):
+            extractor = PageTextExtractor()
+            out = io.StringIO()
+            CapturedBody(value, extractor).write_to(out)
+            self.assertEqual(out.getvalue(), body.to_html())
+            self.assertEqual(extractor.text(), "Hello world")
+
+class TestPageUrl(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("blog/tom/index.html", "/StaticSite/"), "/StaticSite/blog/tom/")
+        self.assertEqual(page_url("about.html", "/base/"), "/base/about.html")
+
+class TestSiteArtifacts(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "docs")
+        self.artifacts = SiteArtifacts(self.output, "/base/", os.path.join(self.tmp.name, "artifacts.json"))
+        for rel, title, text in [
+            ("index.html", "Home", "Welcome"),
+            ("blog/post/index.html", "A <Post>", "word " * 100),
+            ("contact/index.html", "Contact", "Write to us"),
+        ]:
+            dest = os.path.join(self.output, rel)
+            write_file(dest, "<html></html>")
+            self.artifacts.add_page(dest, title, text.strip())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, name):
+        with open(os.path.join(self.output, name), 'r') as f:
+            return f.read()
+
+    def test_sitemap_lists_every_page(self):
+        sitemap = self.artifacts.sitemap("https://example.com/")
+        self.assertIn("<loc>https://example.com/base/</loc>", sitemap)
+        self.assertIn("<loc>https://example.com/base/blog/post/</loc>", sitemap)
+        self.assertIn("<loc>https://example.com/base/contact/</loc>", sitemap)
+
+    def test_feed_lists_blog_posts(self):
+        feed = self.artifacts.feed("https://example.com")
+        self.assertIn("<title>Home</title>", feed)
+        self.assertIn("<title>A &lt;Post&gt;</title>", feed)
+        self.assertIn("<link>https://example.com/base/blog/post/</link>", feed)
+        self.assertNotIn("Contact", feed)
+        self.assertIn("...</description>", feed)
+
+    def test_dates_and_drafts(self):
+        for name, metadata in [
+            ("older", {"date": "2023-01-01"}),
+            ("newer", {"date": "2024-06-01"}),
+            ("draft", {"date": "2024-07-01", "draft": True}),
+        ]:
+            dest = os.path.join(self.output, "blog", name, "index.html")
+            write_file(dest, "<html></html>")
+            self.artifacts.add_page(dest, name.title(), "text", metadata)
+
+        feed = self.artifacts.feed("https://example.com")
+        self.assertNotIn("Draft", feed)
+        self.assertLess(feed.index("<title>Newer</title>"), feed.index("<title>Older</title>"))
+        self.assertLess(feed.index("<title>Older</title>"), feed.index("<title>A &lt;Post&gt;</title>"))
+        self.assertIn("<pubDate>Sat, 01 Jun 2024 00:00:00 +0000</pubDate>", feed)
+        sitemap = self.artifacts.sitemap("https://example.com")
+        self.assertIn("<loc>https://example.com/base/blog/newer/</loc><lastmod>2024-06-01</lastmod>", sitemap)
+        self.assertNotIn("draft", sitemap)
+        self.assertNotIn("/base/blog/draft/", [entry["url"] for entry in self.artifacts.search_index()])
+
+    def test_search_index(self):
+        entries = self.artifacts.search_index()
+        self.assertEqual([entry["url"] for entry in entries], ["/base/", "/base/blog/post/", "/base/contact/"])
+        self.assertEqual(entries[2], {"url": "/base/contact/", "title": "Contact", "text": "Write to us"})
+
+    def test_write_without_site_url_only_writes_search_index(self):
+        written = self.artifacts.write(None, search_index=True)
+        self.assertEqual(written, [os.path.join(self.output, "search.json")])
+        self.assertEqual(len(json.loads(self.read("search.json"))), 3)
+
+    def test_write_prunes_removed_pages_and_persists(self):
+        os.remove(os.path.join(self.output, "contact", "index.html"))
+        self.artifacts.write("https://example.com", search_index=False)
+        self.assertNotIn("contact", self.read("sitemap.xml"))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "search.json")))
+        loaded = SiteArtifacts.load(self.output, "/base/", self.artifacts.path)
+        self.assertEqual(sorted(loaded.pages), ["blog/post/index.html", "index.html"])
+
+if __name__ == "__main__":
+    unittest.main()
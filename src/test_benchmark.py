@@ -0,0 +1,46 @@
+import json
+import random
+import unittest
+from benchmark import CORPORA, run_benchmarks, format_report, _stage_inline, _stage_inline_chained
+from block_markdown import markdown_to_blocks, markdown_to_html_node
+
+class TestBenchmark(unittest.TestCase):
+    def test_corpora_are_valid_markdown(self):
+        for name, generate in CORPORA.items():
+            markdown = generate(random.Random(0), 1)
+            self.assertTrue(markdown_to_html_node(markdown).to_html().startswith("<div>"), name)
+
+    def test_corpora_are_deterministic(self):
+        for generate in CORPORA.values():
+            self.assertEqual(generate(random.Random(3), 1), generate(random.Random(3), 1))
+
+    def test_chained_stage_matches_single_pass(self):
+        for name, generate in CORPORA.items():
+            blocks = markdown_to_blocks(generate(random.Random(0), 1))
+            self.assertEqual(_stage_inline_chained(blocks), _stage_inline(blocks), name)
+
+    def test_report_is_json_serializable(self):
+        report = run_benchmarks(size=1, pages=2, repeat=1, corpora=["mixed_page"])
+        stages = [(r["corpus"], r["stage"]) for r in report["results"]]
+        self.assertIn(("mixed_page", "markdown_to_html_node"), stages)
+        self.assertIn(("mixed_page", "text_to_textnodes_chained"), stages)
+        self.assertIn(("site_2_pages", "generate_pages_recursive"), stages)
+        self.assertEqual(json.loads(json.dumps(report)), report)
+
+    def test_node_memory_report(self):
+        report = run_benchmarks(size=1, repeat=1, corpora=["mixed_page"], node_memory=1000)
+        classes = [r["class"] for r in report["node_memory"]]
+        self.assertEqual(classes, ["TextNode", "LeafNode", "ParentNode"])
+        for r in report["node_memory"]:
+            self.assertLess(r["slotted_bytes"], r["dict_bytes"])
+        self.assertGreater(report["page_memory"]["nodes"], 0)
+        self.assertIn("huge_lists page", format_report(report))
+
+    def test_format_report_with_baseline(self):
+        report = {"results": [{"corpus": "c", "stage": "s", "seconds": 2.0, "bytes": 10,
+                               "mb_per_s": 0.0, "peak_kib": 1.0}]}
+        baseline = {"results": [dict(report["results"][0], seconds=1.0)]}
+        self.assertIn("+100.0%", format_report(report, baseline))
+
+if __name__ == "__main__":
+    unittest.main()
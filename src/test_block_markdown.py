@@ -1,6 +1,11 @@
 # test_block_markdown.py
+import io
+import os
+import random
+import tempfile
 import unittest
-from block_markdown import markdown_to_blocks, block_to_block_type, BlockType, markdown_to_html_node
+from block_markdown import markdown_to_blocks, block_to_block_type, BlockType, markdown_to_html_node, markdown_to_html, iter_markdown_blocks, MarkdownFileNode, register_block_type, unregister_block_type
+from htmlnode import LeafNode, ParentNode
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -207,6 +212,17 @@ the **same** even with inline stuff
             html,
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
+
+    def test_codeblock_is_escaped(self):
+        node = markdown_to_html_node("```\n<div class=\"x\">&nbsp;</div>\n```")
+        self.assertEqual(
+            node.to_html(),
+            '<div><pre><code>&lt;div class="x"&gt;&amp;nbsp;&lt;/div&gt;\n</code></pre></div>',
+        )
+
+    def test_inline_text_is_escaped(self):
+        node = markdown_to_html_node("[< Back Home](/) and **a & b**")
+        self.assertEqual(node.to_html(), '<div><p><a href="/">&lt; Back Home</a> and <b>a &amp; b</b></p></div>')
     
     def test_heading(self):
         md = """
@@ -258,6 +274,92 @@ the **same** even with inline stuff
         self.assertIn("<li>First item</li>", html)
         self.assertIn("<li>Second item</li>", html)
         self.assertIn("<li>Third item with <i>italic</i></li>", html)
-    
+
+class TestStreamingBlockParser(unittest.TestCase):
+    def split_blocks(self, markdown):
+        # The original splitting rule: split on blank lines, strip, drop empties
+        return [block.strip() for block in markdown.split("\n\n") if block.strip()]
+    
+    def test_matches_split_on_random_documents(self):
+        rng = random.Random(42)
+        pieces = ["a", "b c", "\n", "\n\n", "\n\n\n", " ", "  \n", "\t", "# h", "- x", "```"]
+        for _ in range(3000):
+            markdown = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(markdown_to_blocks(markdown), self.split_blocks(markdown), repr(markdown))
+    
+    def test_consumes_file_lines(self):
+        md = "# Title\n\nA paragraph\nover two lines\n\n\n- a\n- b\n"
+        blocks = list(iter_markdown_blocks(io.StringIO(md)))
+        self.assertEqual(blocks, [["# Title"], ["A paragraph", "over two lines"], ["- a", "- b"]])
+    
+    def test_whitespace_only_line_does_not_end_block(self):
+        blocks = list(iter_markdown_blocks(["first", "   ", "second"]))
+        self.assertEqual(blocks, [["first", "   ", "second"]])
+    
+    def test_markdown_file_node_matches_tree(self):
+        md = "# Title\n\n> quote\n> more\n\n```\ncode\n```\n\n1. one\n2. **two**\n\nThe [end](/x)."
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, 'w') as f:
+                f.write(md)
+            self.assertEqual(MarkdownFileNode(path).to_html(), markdown_to_html_node(md).to_html())
+
+    def test_tree_less_html_matches_tree(self):
+        md = "## Sub _head_\n\n> a `q`\n>b\n\n```py\nx = 1\n```\n\n- **x**\n- [y](/y)\n\n1. one\n2. ![i](/i.png)\n\nA <p> & \"q\"\nline"
+        self.assertEqual(markdown_to_html(md), markdown_to_html_node(md).to_html())
+    
+    def test_tree_less_html_matches_tree_on_random_documents(self):
+        rng = random.Random(7)
+        pieces = ["a", "*b*", "`c`", "\n", "\n\n", "# ", "## ", "> ", "- ", "1. ", "2. ", "```", "[l](u)"]
+        for _ in range(2000):
+            md = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            try:
+                expected = markdown_to_html_node(md).to_html()
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    markdown_to_html(md)
+                continue
+            self.assertEqual(markdown_to_html(md), expected, repr(md))
+
+class TestBlockRegistry(unittest.TestCase):
+    def test_register_new_block_type(self):
+        rule = register_block_type(
+            "rule",
+            lambda lines: lines == ["---"],
+            lambda lines: LeafNode("hr", ""),
+            first_chars="-",
+        )
+        try:
+            self.assertEqual(block_to_block_type("---"), "rule")
+            self.assertEqual(markdown_to_html_node("a\n\n---").to_html(), "<div><p>a</p><hr></hr></div>")
+            self.assertEqual(markdown_to_html("a\n\n---"), "<div><p>a</p><hr></hr></div>")
+            # Lists starting with "-" still reach the built-in rule
+            self.assertEqual(block_to_block_type("- item"), BlockType.UNORDERED_LIST)
+        finally:
+            unregister_block_type(rule)
+        self.assertEqual(block_to_block_type("---"), BlockType.PARAGRAPH)
+    
+    def test_prepend_overrides_builtin(self):
+        rule = register_block_type(
+            "note",
+            lambda lines: lines[0].startswith("> Note:"),
+            lambda lines: ParentNode("aside", [LeafNode(None, lines[0][8:])]),
+            first_chars=">",
+            prepend=True,
+        )
+        try:
+            self.assertEqual(markdown_to_html_node("> Note: hi").to_html(), "<div><aside>hi</aside></div>")
+            self.assertEqual(block_to_block_type("> quote"), BlockType.QUOTE)
+        finally:
+            unregister_block_type(rule)
+    
+    def test_rule_for_any_first_char(self):
+        rule = register_block_type("upper", lambda lines: lines[0].isupper(), lambda lines: LeafNode("strong", lines[0]))
+        try:
+            self.assertEqual(block_to_block_type("LOUD"), "upper")
+            self.assertEqual(block_to_block_type("# LOUD"), BlockType.HEADING)
+        finally:
+            unregister_block_type(rule)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from cache import RenderCache, parser_version
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RenderCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("# Title"))
+        self.cache.put("# Title", "Title", "<div><h1>Title</h1></div>")
+        self.assertEqual(self.cache.get("# Title"), ("Title", "<div><h1>Title</h1></div>"))
+
+    def test_key_depends_on_content(self):
+        self.cache.put("# A", "A", "<div>a</div>")
+        self.assertIsNone(self.cache.get("# B"))
+
+    def test_parser_version_is_stable(self):
+        self.assertEqual(parser_version(), parser_version())
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.put("# A", "A", "<div>a</div>")
+        path = self.cache._entry_path(self.cache.key("# A"))
+        with open(path, 'w') as f:
+            f.write("{")
+        self.assertIsNone(self.cache.get("# A"))
+
+    def test_prune_evicts_least_recently_used(self):
+        for i, name in enumerate(["old", "use", "new"]):
+            self.cache.put(name, name, "x" * 100)
+            path = self.cache._entry_path(self.cache.key(name))
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+        # Reading an entry makes it the most recently used
+        self.cache.get("use")
+        entry_size = os.path.getsize(self.cache._entry_path(self.cache.key("old")))
+        self.cache.max_bytes = entry_size * 2
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertIsNone(self.cache.get("old"))
+        self.assertIsNotNone(self.cache.get("use"))
+        self.assertIsNotNone(self.cache.get("new"))
+
+    def test_prune_within_budget(self):
+        self.cache.put("# A", "A", "<div>a</div>")
+        self.assertEqual(self.cache.prune(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
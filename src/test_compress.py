@@ -0,0 +1,79 @@
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+import unittest
+import compress
+from compress import compress_outputs, compress_data, load_index
+from testutil import write_file
+
+class TestCompressOutputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "docs")
+        self.index = os.path.join(self.tmp.name, ".build", "compressed.json")
+        write_file(os.path.join(self.output, "index.html"), "<p>home</p>" * 100)
+        write_file(os.path.join(self.output, "blog", "post", "index.html"), "<p>post</p>" * 100)
+        write_file(os.path.join(self.output, "index.css"), "body { color: black }\n" * 50)
+        write_file(os.path.join(self.output, "tiny.css"), "a {}")
+        write_file(os.path.join(self.output, "images", "cat.png"), "x" * 1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_compress(self, jobs=1):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return compress_outputs(self.output, jobs, self.index, (".gz",))
+
+    def read_gzip(self, rel):
+        with gzip.open(os.path.join(self.output, rel + ".gz"), 'rt') as f:
+            return f.read()
+
+    def test_text_outputs_get_gzip_siblings(self):
+        self.assertEqual(self.run_compress(), (3, 0))
+        self.assertEqual(self.read_gzip("index.html"), "<p>home</p>" * 100)
+        self.assertEqual(self.read_gzip("index.css"), "body { color: black }\n" * 50)
+        self.assertFalse(os.path.exists(os.path.join(self.output, "tiny.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "images", "cat.png.gz")))
+
+    def test_only_changed_files_are_recompressed(self):
+        self.run_compress()
+        self.assertEqual(self.run_compress(), (0, 3))
+        write_file(os.path.join(self.output, "index.html"), "<p>changed</p>" * 100)
+        self.assertEqual(self.run_compress(), (1, 2))
+        self.assertEqual(self.read_gzip("index.html"), "<p>changed</p>" * 100)
+
+    def test_missing_sibling_is_recreated(self):
+        self.run_compress()
+        os.remove(os.path.join(self.output, "index.css.gz"))
+        self.assertEqual(self.run_compress(), (1, 2))
+
+    def test_siblings_of_removed_files_are_deleted(self):
+        self.run_compress()
+        os.remove(os.path.join(self.output, "blog", "post", "index.html"))
+        self.run_compress()
+        self.assertFalse(os.path.exists(os.path.join(self.output, "blog", "post", "index.html.gz")))
+        self.assertNotIn("blog/post/index.html", load_index(self.index))
+
+    def test_parallel_matches_serial(self):
+        self.run_compress(jobs=3)
+        parallel = self.read_gzip("blog/post/index.html")
+        with open(os.path.join(self.output, "blog", "post", "index.html.gz"), 'rb') as f:
+            parallel_bytes = f.read()
+        with open(os.path.join(self.output, "blog", "post", "index.html"), 'rb') as f:
+            self.assertEqual(parallel_bytes, compress_data(f.read(), ".gz"))
+        self.assertEqual(parallel, "<p>post</p>" * 100)
+
+    def test_gzip_is_deterministic(self):
+        self.assertEqual(compress_data(b"same" * 100, ".gz"), compress_data(b"same" * 100, ".gz"))
+
+    @unittest.skipUnless(compress.brotli is not None, "brotli is not installed")
+    def test_brotli(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            compress_outputs(self.output, 1, self.index, (".gz", ".br"))
+        with open(os.path.join(self.output, "index.html.br"), 'rb') as f:
+            self.assertEqual(compress.brotli.decompress(f.read()), ("<p>home</p>" * 100).encode())
+
+if __name__ == "__main__":
+    unittest.main()
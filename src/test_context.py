@@ -0,0 +1,48 @@
+import pickle
+import unittest
+from artifacts import SiteArtifacts
+from cache import RenderCache
+from context import BuildContext
+from deps import DependencyGraph
+from links import LinkIndex
+from outputs import OutputIndex
+
+class TestBuildContext(unittest.TestCase):
+    def setUp(self):
+        self.context = BuildContext(
+            cache=RenderCache("cache"),
+            outputs=OutputIndex(None, {"docs/a.html": ["a", 1, 1], "docs/b.html": ["b", 1, 1]}),
+            artifacts=SiteArtifacts("docs"),
+            deps=DependencyGraph("docs", {"b.html": ["content/b.md"]}),
+            links=LinkIndex(None, {"b.md": {}}),
+        )
+
+    def test_subset_holds_only_the_page(self):
+        subset = pickle.loads(pickle.dumps(self.context.subset("docs/a.html")))
+        self.assertEqual(subset.cache.cache_dir, "cache")
+        self.assertEqual(subset.outputs.entries, {"docs/a.html": ["a", 1, 1]})
+        self.assertEqual(subset.artifacts.pages, {})
+        self.assertEqual(subset.deps.outputs, {})
+        self.assertEqual(subset.links.pages, {})
+        self.assertIsNone(subset.images)
+
+    def test_merge_adds_what_the_subset_recorded(self):
+        subset = self.context.subset("docs/a.html")
+        subset.outputs.entries["docs/a.html"] = ["new", 2, 2]
+        subset.artifacts.pages["a.html"] = {"title": "A", "text": "A"}
+        subset.deps.record("a.html", ["content/a.md"])
+        subset.links.pages["a.md"] = {}
+        self.context.merge(subset)
+        self.assertEqual(self.context.outputs.entries["docs/a.html"], ["new", 2, 2])
+        self.assertIn("docs/b.html", self.context.outputs.entries)
+        self.assertEqual(list(self.context.artifacts.pages), ["a.html"])
+        self.assertEqual(sorted(self.context.deps.outputs), ["a.html", "b.html"])
+        self.assertEqual(sorted(self.context.links.pages), ["a.md", "b.md"])
+
+    def test_merge_skips_indexes_not_in_the_build(self):
+        context = BuildContext()
+        context.merge(context.subset("docs/a.html"))
+        self.assertIsNone(context.outputs)
+
+if __name__ == "__main__":
+    unittest.main()
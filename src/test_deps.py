@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+from deps import BASEPATH_INPUT, DependencyGraph, InputStates, image_input
+from images import ImagePipeline
+
+class TestInputStates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "page.md")
+        with open(self.path, 'w') as f:
+            f.write("# Page")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_states(self):
+        images = ImagePipeline(basepath="/")
+        images.images = {"a.png": {"width": 8, "height": 4, "variants": []}}
+        states = InputStates("/", images)
+        self.assertEqual(states.get(self.path), InputStates().get(self.path))
+        self.assertIsNone(states.get(os.path.join(self.tmp, "missing.md")))
+        self.assertNotEqual(states.get(BASEPATH_INPUT), InputStates("/base/").get(BASEPATH_INPUT))
+        self.assertIsNotNone(states.get(image_input("a.png")))
+        self.assertIsNone(states.get(image_input("b.png")))
+        self.assertIsNone(InputStates().get(image_input("a.png")))
+
+    def test_known_states_are_not_recomputed(self):
+        self.assertEqual(InputStates(known={self.path: "abc"}).get(self.path), "abc")
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph("docs")
+        self.graph.record("index.html", ["index.md", "template.html", BASEPATH_INPUT, "index.md"])
+        self.graph.record("post.html", ["post.md", "post.html", BASEPATH_INPUT])
+        self.old_states = {"index.md": "1", "template.html": "2", "post.md": "3", "post.html": "4",
+                           BASEPATH_INPUT: "5"}
+
+    def test_record(self):
+        self.assertEqual(self.graph.outputs["index.html"], [BASEPATH_INPUT, "index.md", "template.html"])
+        self.assertEqual(self.graph.dependents(BASEPATH_INPUT), ["index.html", "post.html"])
+        self.assertEqual(self.graph.dependents("template.html"), ["index.html"])
+
+    def test_changed_inputs(self):
+        states = InputStates(known=dict(self.old_states, **{"template.html": "changed", "post.md": None}))
+        self.assertEqual(self.graph.changed_inputs("index.html", self.old_states, states), ["template.html changed"])
+        self.assertEqual(self.graph.changed_inputs("post.html", self.old_states, states), ["post.md removed"])
+        self.assertEqual(self.graph.changed_inputs("other.html", self.old_states, states),
+                         ["no recorded dependencies"])
+
+    def test_unchanged(self):
+        states = InputStates(known=self.old_states)
+        self.assertEqual(self.graph.changed_inputs("index.html", self.old_states, states), [])
+
+    def test_prune_and_subset(self):
+        self.graph.prune({"index.html"})
+        self.assertEqual(list(self.graph.outputs), ["index.html"])
+        self.assertEqual(self.graph.inputs(), {BASEPATH_INPUT, "index.md", "template.html"})
+        subset = self.graph.subset()
+        self.assertEqual((subset.output_dir, subset.outputs), ("docs", {}))
+
+if __name__ == "__main__":
+    unittest.main()
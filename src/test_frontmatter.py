@@ -0,0 +1,132 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from frontmatter import (
+    MetadataIndex, parse_front_matter, read_page_head, skip_front_matter, split_front_matter, template_values,
+)
+from testutil import write_file
+
+POST = """---
+title: "Hello: World"
+date: 2024-05-01
+tags: [elves, rings]
+draft: false
+order: 3
+---
+# Heading
+
+Body text
+"""
+
+class TestParseFrontMatter(unittest.TestCase):
+    def test_values(self):
+        metadata, body = split_front_matter(POST)
+        self.assertEqual(metadata, {
+            "title": "Hello: World", "date": "2024-05-01", "tags": ["elves", "rings"], "draft": False, "order": 3,
+        })
+        self.assertEqual(body, "# Heading\n\nBody text\n")
+
+    def test_block_list_and_comments(self):
+        metadata = parse_front_matter(["# a comment", "tags:", "  - one", "  - 'two'", "author: Tolkien"])
+        self.assertEqual(metadata, {"tags": ["one", "two"], "author": "Tolkien"})
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["not a key value pair"])
+
+    def test_without_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\n---\n"), ({}, "# Title\n\n---\n"))
+
+    def test_unclosed_front_matter_is_body(self):
+        markdown = "---\ntitle: x\n\n# Title"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_skip_front_matter(self):
+        self.assertEqual("".join(skip_front_matter(io.StringIO(POST))), "# Heading\n\nBody text\n")
+        self.assertEqual("".join(skip_front_matter(io.StringIO("# Title\ntext\n"))), "# Title\ntext\n")
+
+    def test_template_values(self):
+        self.assertEqual(template_values({"tags": ["a", "b"], "draft": True, "order": 3}),
+                         {"tags": "a, b", "draft": "true", "order": "3"})
+
+class TestReadPageHead(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_title_from_front_matter(self):
+        path = os.path.join(self.tmp, "post.md")
+        write_file(path, POST)
+        metadata, title = read_page_head(path)
+        self.assertEqual(title, "Hello: World")
+        self.assertEqual(metadata["tags"], ["elves", "rings"])
+
+    def test_title_from_heading(self):
+        path = os.path.join(self.tmp, "page.md")
+        write_file(path, "---\ndate: 2024-01-01\n---\n\nintro\n# Heading\n")
+        self.assertEqual(read_page_head(path), ({"date": "2024-01-01"}, "Heading"))
+        write_file(path, "# Plain\n\ntext")
+        self.assertEqual(read_page_head(path), ({}, "Plain"))
+        write_file(path, "no title")
+        self.assertEqual(read_page_head(path), ({}, None))
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.path = os.path.join(self.tmp, "metadata.json")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        for name, date, tags, draft in [
+            ("old", "2023-01-01", "[elves]", "false"),
+            ("new", "2024-06-01", "[elves, rings]", "false"),
+            ("wip", "2024-07-01", "[rings]", "true"),
+        ]:
+            write_file(os.path.join(self.content, "blog", name, "index.md"),
+                       f"---\ndate: {date}\ntags: {tags}\ndraft: {draft}\n---\n# {name.title()}\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_query(self):
+        index = MetadataIndex.load(self.content, self.path)
+        posts = index.query(directory="blog")
+        self.assertEqual([rel for rel, entry in posts],
+                         [os.path.join("blog", "new", "index.md"), os.path.join("blog", "old", "index.md")])
+        self.assertEqual(posts[0][1]["title"], "New")
+        self.assertEqual(len(index.query(include_drafts=True)), 4)
+        self.assertEqual([rel for rel, entry in index.query(tag="rings")], [os.path.join("blog", "new", "index.md")])
+        self.assertEqual(index.tags(), {
+            "elves": [os.path.join("blog", "new", "index.md"), os.path.join("blog", "old", "index.md")],
+            "rings": [os.path.join("blog", "new", "index.md")],
+        })
+
+    def test_built_lazily(self):
+        index = MetadataIndex.load(self.content, self.path)
+        self.assertFalse(index.fresh)
+        self.assertEqual(index.pages, {})
+        self.assertEqual(index.get("index.md")["title"], "Home")
+        self.assertTrue(index.fresh)
+
+    def test_only_changed_pages_are_read_again(self):
+        index = MetadataIndex.load(self.content, self.path)
+        self.assertEqual(index.refresh(), 4)
+        index.save()
+
+        index = MetadataIndex.load(self.content, self.path)
+        self.assertEqual(index.refresh(), 0)
+        write_file(os.path.join(self.content, "index.md"), "---\ntitle: Welcome home\n---\n# Home")
+        os.remove(os.path.join(self.content, "blog", "old", "index.md"))
+        self.assertEqual(index.refresh(), 1)
+        self.assertEqual(index.get("index.md")["title"], "Welcome home")
+        self.assertIsNone(index.get(os.path.join("blog", "old", "index.md")))
+
+    def test_corrupt_index_starts_empty(self):
+        write_file(self.path, "not json")
+        self.assertEqual(MetadataIndex.load(self.content, self.path).pages, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import threading
+import unittest
+import highlight
+from highlight import clear_snippet_cache, get_lexer, register_lexer, snippet_cache_info
+from block_markdown import markdown_to_html_node
+
+class TestHighlight(unittest.TestCase):
+    def setUp(self):
+        clear_snippet_cache()
+
+    def test_python(self):
+        self.assertEqual(
+            highlight.highlight('def f():\n    return "x" # done', "python"),
+            '<span class="hl-keyword">def</span> f():\n'
+            '    <span class="hl-keyword">return</span> <span class="hl-string">"x"</span> '
+            '<span class="hl-comment"># done</span>',
+        )
+
+    def test_code_is_escaped(self):
+        self.assertEqual(
+            highlight.highlight("a < b && c > 'd'", "js"),
+            'a &lt; b &amp;&amp; c &gt; <span class="hl-string">\'d\'</span>',
+        )
+
+    def test_language_aliases_share_a_lexer(self):
+        self.assertIs(get_lexer("py"), get_lexer("Python"))
+        self.assertIs(get_lexer("sh"), get_lexer("bash"))
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight.highlight("x = 1", "cobol"))
+
+    def test_text_is_preserved(self):
+        samples = {
+            "python": 'x = f"{y}" + \'\'\'multi\nline\'\'\'\n@decorator\nclass A: pass  # 0x1F',
+            "json": '{"key": [1, 2.5e3, true, null, "v"]}',
+            "bash": 'echo "$HOME" ${PATH} # comment\nfor f in *; do echo $f; done',
+            "css": "a:hover { color: #fff !important; margin: -1.5em 0 }",
+            "html": '<!-- c --><a href="/x" class=\'y\'>text</a>',
+        }
+        for language, code in samples.items():
+            html = highlight.highlight(code, language)
+            stripped = html
+            for token in ("keyword", "string", "comment", "number", "builtin", "decorator",
+                          "variable", "attr", "tag"):
+                stripped = stripped.replace(f'<span class="hl-{token}">', "")
+            stripped = stripped.replace("</span>", "")
+            stripped = stripped.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
+            self.assertEqual(stripped, code, language)
+
+    def test_repeated_snippets_are_highlighted_once(self):
+        code = "import os\nprint(os.getcwd())"
+        first = highlight.highlight(code, "python")
+        self.assertEqual(highlight.highlight(code, "py"), first)
+        self.assertEqual(snippet_cache_info(), {"hits": 1, "misses": 1, "size": 1})
+
+    def test_cache_is_bounded(self):
+        size = highlight.SNIPPET_CACHE_SIZE
+        highlight.SNIPPET_CACHE_SIZE = 2
+        try:
+            for i in range(5):
+                highlight.highlight(f"x = {i}", "python")
+            self.assertEqual(snippet_cache_info()["size"], 2)
+        finally:
+            highlight.SNIPPET_CACHE_SIZE = size
+
+    def test_cache_is_shared_between_threads(self):
+        size = highlight.SNIPPET_CACHE_SIZE
+        highlight.SNIPPET_CACHE_SIZE = 8
+        errors = []
+
+        def render(offset):
+            try:
+                for i in range(300):
+                    highlight.highlight(f"x = {(i + offset) % 20}", "python")
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=render, args=(offset,)) for offset in range(4)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            highlight.SNIPPET_CACHE_SIZE = size
+        self.assertEqual(errors, [])
+        info = snippet_cache_info()
+        self.assertEqual(info["hits"] + info["misses"], 1200)
+        self.assertEqual(info["size"], 8)
+
+    def test_lexer_is_compiled_once(self):
+        lexer = register_lexer(["testlang"], [("keyword", r"\bfoo\b")])
+        self.assertIsNone(lexer._regex)
+        highlight.highlight("foo bar", "testlang")
+        compiled = lexer._regex
+        highlight.highlight("bar foo", "testlang")
+        self.assertIs(lexer._regex, compiled)
+
+class TestFencedCodeBlocks(unittest.TestCase):
+    def test_language_is_highlighted(self):
+        node = markdown_to_html_node("```python\nreturn None\n```")
+        self.assertEqual(
+            node.to_html(),
+            '<div><pre><code class="language-python"><span class="hl-keyword">return</span> '
+            '<span class="hl-keyword">None</span>\n</code></pre></div>',
+        )
+
+    def test_unknown_language_keeps_class(self):
+        node = markdown_to_html_node("```brainfuck\n+[-]\n```")
+        self.assertEqual(node.to_html(), '<div><pre><code class="language-brainfuck">+[-]\n</code></pre></div>')
+
+    def test_no_language_is_unchanged(self):
+        node = markdown_to_html_node("```\nx = 1\n```")
+        self.assertEqual(node.to_html(), "<div><pre><code>x = 1\n</code></pre></div>")
+
+    def test_language_cannot_inject_attributes(self):
+        node = markdown_to_html_node('```js" onclick="x\nlet a\n```')
+        self.assertIn('<code class="language-js">', node.to_html())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
 import unittest
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, LeafNode, ParentNode
 
 class TestHTMLNode(unittest.TestCase):
+    def test_slotted(self):
+        for node in [HTMLNode("p", "x"), LeafNode("b", "x"), ParentNode("p", [])]:
+            self.assertFalse(hasattr(node, "__dict__"))
+    
     def test_props_to_html(self):
         node = HTMLNode(
             "a",
@@ -0,0 +1,163 @@
+import io
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+import images
+from images import ImageBody, ImagePipeline, ImageTagWriter, image_size, variant_path
+
+def png_bytes(width, height):
+    """Return a valid RGB PNG of the given size with noisy pixels."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    rows = b"".join(
+        b"\x00" + bytes((x * 7 + y * 13 + (x * y) % 251) % 256 for x in range(width * 3))
+        for y in range(height)
+    )
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows, 0))
+            + chunk(b"IEND", b""))
+
+def write_bytes(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size_of(self, data):
+        path = os.path.join(self.tmp.name, "image")
+        write_bytes(path, data)
+        return image_size(path)
+
+    def test_png(self):
+        self.assertEqual(self.size_of(png_bytes(30, 20)), (30, 20))
+
+    def test_gif(self):
+        self.assertEqual(self.size_of(b"GIF89a" + struct.pack("<HH", 640, 480) + b"\x00" * 20), (640, 480))
+
+    def test_jpeg(self):
+        app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        sof0 = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, 600, 800) + b"\x00" * 10
+        self.assertEqual(self.size_of(b"\xff\xd8" + app0 + sof0), (800, 600))
+
+    def test_webp_vp8x(self):
+        data = b"RIFF" + b"\x00" * 4 + b"WEBPVP8X" + b"\x00" * 8 + (1199).to_bytes(3, "little") + (799).to_bytes(3, "little")
+        self.assertEqual(self.size_of(data), (1200, 800))
+
+    def test_not_an_image(self):
+        self.assertIsNone(self.size_of(b"Zone.Identifier"))
+
+class TestImageTagWriter(unittest.TestCase):
+    def setUp(self):
+        self.images = ImagePipeline(basepath="/base/")
+        self.images.images = {
+            "images/cat.png": {"width": 1000, "height": 500, "variants": [[480, 240, "cached-480.png"]]},
+            "images/dot.png": {"width": 4, "height": 4, "variants": []},
+        }
+
+    def test_attributes(self):
+        self.assertEqual(self.images.attributes("/images/dot.png"), ' width="4" height="4"')
+        self.assertEqual(
+            self.images.attributes("/images/cat.png"),
+            ' width="1000" height="500" srcset="/base/images/cat-480w.png 480w, /base/images/cat.png 1000w"'
+            ' sizes="(max-width: 1000px) 100vw, 1000px"',
+        )
+        self.assertEqual(self.images.attributes("https://example.com/images/cat.png"), "")
+        self.assertEqual(self.images.attributes("/images/unknown.png"), "")
+
+    def test_srcset_is_escaped(self):
+        self.images.images["images/a&b\".png"] = {"width": 100, "height": 50, "variants": [[40, 20, "cached-40.png"]]}
+        self.assertIn(
+            ' srcset="/base/images/a&amp;b&quot;-40w.png 40w, /base/images/a&amp;b&quot;.png 100w"',
+            self.images.attributes("/images/a&amp;b&quot;.png"),
+        )
+
+    def test_tags_split_across_writes(self):
+        html = '<p>A <img src="/images/dot.png" alt="dot"></img> and <img src="/x.png" alt="x"></img></p>'
+        expected = html.replace('dot.png"', 'dot.png" width="4" height="4"')
+        for split in range(len(html)):
+            out = io.StringIO()
+            writer = ImageTagWriter(out, self.images)
+            writer.write(html[:split])
+            writer.write(html[split:])
+            writer.flush()
+            self.assertEqual(out.getvalue(), expected, split)
+
+    def test_image_body(self):
+        out = io.StringIO()
+        ImageBody('<img src="/images/dot.png" alt="">', self.images).write_to(out)
+        self.assertEqual(out.getvalue(), '<img src="/images/dot.png" width="4" height="4" alt="">')
+
+class TestImagePipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.output = os.path.join(self.tmp.name, "docs")
+        self.cache_dir = os.path.join(self.tmp.name, ".build", "images")
+        write_bytes(os.path.join(self.static, "images", "big.png"), png_bytes(120, 60))
+        write_bytes(os.path.join(self.static, "images", "notes.txt"), b"not an image")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def pipeline(self):
+        return ImagePipeline.load(self.cache_dir, widths=(40, 80, 200))
+
+    def test_dimensions_and_cache(self):
+        pipeline = self.pipeline()
+        self.assertEqual(pipeline.process(self.static), (1, 0))
+        self.assertEqual(pipeline.images["images/big.png"]["width"], 120)
+        self.assertEqual(pipeline.images["images/big.png"]["height"], 60)
+        pipeline.place(self.output)
+
+        pipeline = self.pipeline()
+        self.assertEqual(pipeline.process(self.static), (0, 1))
+
+    def test_changed_image_is_processed_again(self):
+        pipeline = self.pipeline()
+        pipeline.process(self.static)
+        signature = pipeline.signature()
+        write_bytes(os.path.join(self.static, "images", "big.png"), png_bytes(100, 60))
+        self.assertEqual(pipeline.process(self.static), (1, 0))
+        self.assertNotEqual(pipeline.signature(), signature)
+        self.assertEqual(len(pipeline.entries), 1)
+
+    @unittest.skipUnless(images.Image is not None, "Pillow is not installed")
+    def test_variants_are_made_and_placed(self):
+        pipeline = self.pipeline()
+        pipeline.process(self.static)
+        variants = pipeline.images["images/big.png"]["variants"]
+        self.assertEqual([variant[:2] for variant in variants], [[40, 20], [80, 40]])
+        self.assertEqual(pipeline.place(self.output), 2)
+        self.assertEqual(image_size(os.path.join(self.output, "images", "big-40w.png")), (40, 20))
+        self.assertEqual(pipeline.place(self.output), 0)
+
+        os.remove(os.path.join(self.static, "images", "big.png"))
+        pipeline.process(self.static)
+        pipeline.place(self.output)
+        self.assertFalse(os.path.exists(os.path.join(self.output, "images", "big-40w.png")))
+
+    @unittest.skipUnless(images.Image is not None, "Pillow is not installed")
+    def test_resized_variants_are_in_srcset(self):
+        write_bytes(os.path.join(self.static, "images", "a&b.png"), png_bytes(120, 60))
+        pipeline = ImagePipeline.load(self.cache_dir, "/base/", widths=(40,))
+        pipeline.process(self.static)
+        self.assertEqual(
+            pipeline.attributes("/images/a&amp;b.png"),
+            ' width="120" height="60" srcset="/base/images/a&amp;b-40w.png 40w, /base/images/a&amp;b.png 120w"'
+            ' sizes="(max-width: 120px) 100vw, 120px"',
+        )
+
+    def test_variant_path(self):
+        self.assertEqual(variant_path("images/cat.png", 480), "images/cat-480w.png")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 # test_inline_markdown.py
 import unittest
 from textnode import TextNode, TextType
-from inline_markdown import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes
+import random
+from inline_markdown import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, _text_to_textnodes_chained, inline_markdown_to_html
+from textnode import text_node_to_html_node
 
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_code_single(self):
@@ -443,5 +445,72 @@ class TestSplitNodesDelimiter(unittest.TestCase):
         self.assertTrue(any(node.text_type == TextType.IMAGE for node in nodes))
         self.assertTrue(any(node.text_type == TextType.LINK for node in nodes))
 
+class TestSinglePassTokenizer(unittest.TestCase):
+    def assertMatchesChained(self, text):
+        try:
+            expected = _text_to_textnodes_chained(text)
+        except ValueError as e:
+            with self.assertRaises(ValueError) as cm:
+                text_to_textnodes(text)
+            self.assertEqual(str(cm.exception), str(e), text)
+            return
+        self.assertListEqual(text_to_textnodes(text), expected, text)
+    
+    def test_delimiters_inside_spans_are_literal(self):
+        self.assertMatchesChained("**a_b** and `x*y` and _c`d_")
+    
+    def test_links_with_delimiters_in_url(self):
+        self.assertMatchesChained("[link](/a_b_c) and ![img](/x*y*z.png)")
+    
+    def test_runs_of_asterisks(self):
+        for text in ["***a***", "****", "**a***b*", "*a**b**c*", "x****y"]:
+            self.assertMatchesChained(text)
+    
+    def test_image_inside_link_like_text(self):
+        self.assertMatchesChained("[a](b![c)](d) and !![e](f) [g](h")
+    
+    def test_unmatched_delimiter_error(self):
+        for text in ["**unclosed", "*a **b** c*", "`code _x` y_", "a_b"]:
+            self.assertMatchesChained(text)
+    
+    def test_random_inputs_match_chained_splitters(self):
+        rng = random.Random(1234)
+        alphabet = ["a", "b", " ", "*", "**", "_", "`", "[", "]", "(", ")", "!", "![x](y)", "[l](u)"]
+        for _ in range(5000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 14)))
+            self.assertMatchesChained(text)
+
+class TestInlineMarkdownToHtml(unittest.TestCase):
+    def tree_html(self, text):
+        return "".join(text_node_to_html_node(node).to_html() for node in text_to_textnodes(text))
+    
+    def test_all_span_types(self):
+        text = "Plain **bold** _it_ *it2* `code` [link](/a) ![img](/b.png)"
+        self.assertEqual(
+            inline_markdown_to_html(text),
+            'Plain <b>bold</b> <i>it</i> <i>it2</i> <code>code</code> <a href="/a">link</a> <img src="/b.png" alt="img"></img>',
+        )
+    
+    def test_conflicting_delimiters_raise(self):
+        with self.assertRaises(ValueError):
+            inline_markdown_to_html("*a `b* c`")
+    
+    def test_unmatched_delimiter_raises(self):
+        with self.assertRaises(ValueError):
+            inline_markdown_to_html("**unclosed")
+    
+    def test_random_inputs_match_tree(self):
+        rng = random.Random(99)
+        alphabet = ["a", " ", "*", "**", "_", "`", "[", "]", "(", ")", "!", "![x](y)", "[l](u)"]
+        for _ in range(3000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 14)))
+            try:
+                expected = self.tree_html(text)
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    inline_markdown_to_html(text)
+                continue
+            self.assertEqual(inline_markdown_to_html(text), expected, text)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import unittest
-from htmlnode import LeafNode
+from htmlnode import LeafNode, SafeHTML, escape_attribute, escape_text
 
 class TestLeafNode(unittest.TestCase):
     def test_leaf_to_html_p(self):
@@ -34,6 +34,30 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("span", "Highlighted text", {"class": "highlight"})
         self.assertEqual(node.to_html(), '<span class="highlight">Highlighted text</span>')
     
+    def test_leaf_to_html_escapes_text(self):
+        node = LeafNode("code", 'if a < b && c > "d":')
+        self.assertEqual(node.to_html(), '<code>if a &lt; b &amp;&amp; c &gt; "d":</code>')
+    
+    def test_leaf_to_html_no_tag_escapes_text(self):
+        node = LeafNode(None, "< Back Home")
+        self.assertEqual(node.to_html(), "&lt; Back Home")
+    
+    def test_leaf_to_html_safe_html_is_not_escaped(self):
+        node = LeafNode("code", SafeHTML('<span class="hl-keyword">def</span> &amp;'))
+        self.assertEqual(node.to_html(), '<code><span class="hl-keyword">def</span> &amp;</code>')
+    
+    def test_leaf_to_html_escapes_props(self):
+        node = LeafNode("a", "Link", {"href": '/search?q="x"&y=<z>'})
+        self.assertEqual(node.to_html(), '<a href="/search?q=&quot;x&quot;&amp;y=&lt;z&gt;">Link</a>')
+    
+    def test_escape_fast_path_returns_same_string(self):
+        text = "Nothing to escape here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attribute(text), text)
+    
+    def test_escape_attribute_quotes(self):
+        self.assertEqual(escape_attribute("it's \"x\""), "it&#x27;s &quot;x&quot;")
+    
     def test_leaf_repr(self):
         node = LeafNode("p", "Hello", {"class": "text"})
         self.assertEqual(repr(node), "LeafNode(p, Hello, {'class': 'text'})")
@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+import unittest
+from links import LinkIndex, ReferenceCollector, extract_page_references, find_output, resolve_url
+from testutil import write_file
+
+class TestExtractPageReferences(unittest.TestCase):
+    def test_links_and_images(self):
+        markdown = "# Title\n\n[home](/) and ![cat](/images/cat.png)\n\n- [post](/blog/post)"
+        links, images = extract_page_references(markdown.split("\n"))
+        self.assertEqual(links, ["/", "/blog/post"])
+        self.assertEqual(images, ["/images/cat.png"])
+
+    def test_code_is_skipped(self):
+        markdown = "```\n[not a link](/nowhere)\n```\n\n[link](/somewhere) and `[code](/missing)`"
+        links, images = extract_page_references(markdown.split("\n"))
+        self.assertEqual(links, ["/somewhere"])
+
+    def test_front_matter_is_skipped(self):
+        markdown = "---\nsummary: see [x](/missing)\n---\n# Title\n\n![cat](/cat.png)"
+        self.assertEqual(extract_page_references(markdown.split("\n")), ([], ["/cat.png"]))
+
+class TestReferenceCollector(unittest.TestCase):
+    def test_collects_links_and_images_split_across_writes(self):
+        collector = ReferenceCollector()
+        html = ('<p><a href="/blog/post">post</a> <img src="/images/cat.png" alt="cat"></p>'
+                '<pre><code>&lt;a href="/nowhere"&gt;</code></pre><a href="/search?q=a&amp;b=c">find</a>')
+        for start in range(0, len(html), 7):
+            collector.write(html[start:start + 7])
+        self.assertEqual(collector.references(), (["/blog/post", "/search?q=a&b=c"], ["/images/cat.png"]))
+
+class TestResolveUrl(unittest.TestCase):
+    def test_root_relative(self):
+        self.assertEqual(resolve_url("/", "blog/post/index.html"), "index.html")
+        self.assertEqual(resolve_url("/blog/post", "index.html"), "blog/post")
+        self.assertEqual(resolve_url("/blog/", "index.html"), "blog/index.html")
+
+    def test_relative_to_page(self):
+        self.assertEqual(resolve_url("../other", "blog/post/index.html"), "blog/other")
+        self.assertEqual(resolve_url("cat.png", "blog/post/index.html"), "blog/post/cat.png")
+
+    def test_fragment_and_query_are_ignored(self):
+        self.assertEqual(resolve_url("/contact?x=1#form", "index.html"), "contact")
+        self.assertEqual(resolve_url("#top", "blog/index.html"), "blog/index.html")
+
+    def test_external(self):
+        self.assertIsNone(resolve_url("https://www.boot.dev", "index.html"))
+        self.assertIsNone(resolve_url("mailto:me@example.com", "index.html"))
+        self.assertIsNone(resolve_url("//cdn.example.com/x.js", "index.html"))
+
+    def test_find_output(self):
+        outputs = {"index.html", "blog/post/index.html", "about.html", "images/cat.png"}
+        self.assertEqual(find_output("blog/post", outputs), "blog/post/index.html")
+        self.assertEqual(find_output("about", outputs), "about.html")
+        self.assertEqual(find_output("images/cat.png", outputs), "images/cat.png")
+        self.assertIsNone(find_output("images/dog.png", outputs))
+
+class TestLinkIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.path = os.path.join(self.tmp, ".build", "links.json")
+        write_file(os.path.join(self.content, "index.md"),
+                   "# Home\n\n[post](/blog/post) [gone](/blog/gone) [ext](https://example.com)")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"),
+                   "# Post\n\n[home](/) ![cat](/images/cat.png) ![dog](/images/dog.png)")
+        self.page_outputs = {"index.md": "index.html", os.path.join("blog", "post", "index.md"): os.path.join("blog", "post", "index.html")}
+        self.outputs = {"index.html", "blog/post/index.html", "images/cat.png"}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_reports_broken_links_and_missing_images(self):
+        index = LinkIndex(self.path)
+        index.refresh(self.content, self.page_outputs)
+        broken = index.resolve(self.outputs)
+        self.assertEqual(broken, [
+            (os.path.join("blog", "post", "index.md"), "image", "/images/dog.png"),
+            ("index.md", "link", "/blog/gone"),
+        ])
+        self.assertEqual(index.pages["index.md"]["links"], [
+            ["/blog/post", "blog/post/index.html"],
+            ["/blog/gone", None],
+            ["https://example.com", None],
+        ])
+
+    def test_backlinks(self):
+        index = LinkIndex(self.path)
+        index.refresh(self.content, self.page_outputs)
+        index.resolve(self.outputs)
+        self.assertEqual(index.backlinks(), {
+            "blog/post/index.html": ["index.md"],
+            "index.html": [os.path.join("blog", "post", "index.md")],
+        })
+
+    def test_refresh_only_reads_changed_pages(self):
+        index = LinkIndex(self.path)
+        self.assertEqual(index.refresh(self.content, self.page_outputs), 2)
+        index.save()
+
+        index = LinkIndex.load(self.path)
+        self.assertEqual(index.refresh(self.content, self.page_outputs), 0)
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[longer text now](/blog/post)")
+        self.assertEqual(index.refresh(self.content, self.page_outputs), 1)
+        self.assertEqual(index.resolve(self.outputs), [(os.path.join("blog", "post", "index.md"), "image", "/images/dog.png")])
+
+    def test_added_pages_are_not_read_again(self):
+        index = LinkIndex(self.path, content_dir=self.content, output_dir=os.path.join(self.tmp, "docs"))
+        index.add_page(os.path.join(self.content, "index.md"), os.path.join(self.tmp, "docs", "index.html"),
+                       ["/blog/post"], [])
+        self.assertEqual(index.refresh(self.content, self.page_outputs), 1)
+        self.assertEqual(index.pages["index.md"]["links"], [["/blog/post", None]])
+
+    def test_code_spans_are_not_links(self):
+        index = LinkIndex(self.path)
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWrite `[x](/missing)` for a link")
+        index.refresh(self.content, self.page_outputs)
+        self.assertEqual(index.pages["index.md"]["links"], [])
+        self.assertNotIn(("index.md", "link", "/missing"), index.resolve(self.outputs))
+
+    def test_removed_pages_are_dropped(self):
+        index = LinkIndex(self.path)
+        index.refresh(self.content, self.page_outputs)
+        del self.page_outputs["index.md"]
+        index.refresh(self.content, self.page_outputs)
+        self.assertEqual(list(index.pages), [os.path.join("blog", "post", "index.md")])
+
+    def test_corrupt_index_loads_empty(self):
+        write_file(self.path, "{}")
+        self.assertEqual(LinkIndex.load(self.path).pages, {})
+
+if __name__ == "__main__":
+    unittest.main()
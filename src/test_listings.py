@@ -0,0 +1,107 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from frontmatter import MetadataIndex
+from listings import ListingIndex, build_listing_pages, listing_entries, listing_page_path, paginate, tag_slug
+from testutil import write_file
+
+class TestListingHelpers(unittest.TestCase):
+    def test_tag_slug(self):
+        self.assertEqual(tag_slug("Middle Earth"), "middle-earth")
+        self.assertEqual(tag_slug("C++"), "c")
+        self.assertEqual(tag_slug("!!"), "tag")
+
+    def test_listing_page_path(self):
+        self.assertEqual(listing_page_path("blog", 1), "blog/index.html")
+        self.assertEqual(listing_page_path("blog", 3), "blog/page/3/index.html")
+
+    def test_paginate(self):
+        entries = [{"url": f"/p{i}/", "title": f"Post {i}", "date": "", "summary": "", "tags": []} for i in range(5)]
+        pages = paginate("Blog", entries, "blog", 2)
+        self.assertEqual([page[0] for page in pages],
+                         ["blog/index.html", "blog/page/2/index.html", "blog/page/3/index.html"])
+        self.assertEqual([page[1] for page in pages], ["Blog", "Blog (page 2)", "Blog (page 3)"])
+        middle = pages[1][2].to_html()
+        self.assertIn('<a href="/blog/" rel="prev">Newer</a>', middle)
+        self.assertIn('<a href="/blog/page/3/" rel="next">Older</a>', middle)
+        self.assertIn("Page 2 of 3", middle)
+        self.assertEqual(len({page[3] for page in pages}), 3)
+
+    def test_empty_listing_has_one_page(self):
+        pages = paginate("Blog", [], "blog")
+        self.assertEqual(len(pages), 1)
+        self.assertIn("Nothing here yet.", pages[0][2].to_html())
+
+class TestBuildListingPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "blog", "old", "index.md"),
+                   "---\ndate: 2023-01-01\ntags: [Elves]\n---\n# Old <post>")
+        write_file(os.path.join(self.content, "blog", "new", "index.md"),
+                   "---\ndate: 2024-01-01\ntags: [Elves, Rings]\nsummary: Hand written\n---\n# New")
+        write_file(os.path.join(self.content, "blog", "wip", "index.md"), "---\ndraft: true\n---\n# Draft")
+        self.metadata = MetadataIndex(self.content)
+        self.page_outputs = {
+            os.path.join("blog", name, "index.md"): f"blog/{name}/index.html" for name in ("old", "new", "wip")
+        }
+        self.page_outputs["index.md"] = "index.html"
+        self.artifact_pages = {"blog/old/index.html": {"title": "Old <post>", "text": "Old <post> Body of the post"}}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_entries(self):
+        entries = listing_entries(self.metadata, self.page_outputs, self.artifact_pages, "blog")
+        self.assertEqual(entries, [
+            {"url": "/blog/new/", "title": "New", "date": "2024-01-01", "summary": "Hand written",
+             "tags": ["Elves", "Rings"]},
+            {"url": "/blog/old/", "title": "Old <post>", "date": "2023-01-01", "summary": "Body of the post",
+             "tags": ["Elves"]},
+        ])
+
+    def test_pages(self):
+        pages = {rel: content.to_html() for rel, title, content, signature in
+                 build_listing_pages(self.metadata, self.page_outputs, self.artifact_pages)}
+        self.assertEqual(sorted(pages), ["blog/index.html", "tags/elves/index.html", "tags/index.html",
+                                         "tags/rings/index.html"])
+        self.assertIn('<a href="/blog/old/">Old &lt;post&gt;</a>', pages["blog/index.html"])
+        self.assertIn('<a href="/tags/rings/">Rings</a>', pages["blog/index.html"])
+        self.assertNotIn("Draft", pages["blog/index.html"])
+        self.assertIn("2 post(s)", pages["tags/index.html"])
+        self.assertNotIn("/blog/old/", pages["tags/rings/index.html"])
+
+class TestListingIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmp, "docs")
+        self.path = os.path.join(self.tmp, "listings.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip_and_is_current(self):
+        listings = ListingIndex(self.path, {"blog/index.html": "abc"})
+        listings.save()
+        listings = ListingIndex.load(self.path)
+        self.assertFalse(listings.is_current(self.output, "blog/index.html", "abc"))
+        write_file(os.path.join(self.output, "blog", "index.html"), "<html></html>")
+        self.assertTrue(listings.is_current(self.output, "blog/index.html", "abc"))
+        self.assertFalse(listings.is_current(self.output, "blog/index.html", "def"))
+
+    def test_remove_stale(self):
+        write_file(os.path.join(self.output, "tags", "gone", "index.html"), "<html></html>")
+        write_file(os.path.join(self.output, "tags", "index.html"), "<html></html>")
+        listings = ListingIndex(self.path, {"tags/gone/index.html": "a", "tags/index.html": "b"})
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(listings.remove_stale(self.output, ["tags/index.html"]), 1)
+        self.assertEqual(listings.pages, {"tags/index.html": "b"})
+        self.assertFalse(os.path.exists(os.path.join(self.output, "tags", "gone")))
+        self.assertTrue(os.path.exists(os.path.join(self.output, "tags", "index.html")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,659 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import main
+import profiler
+from cache import RenderCache
+from context import BuildContext
+from outputs import OutputIndex
+from links import LinkIndex
+from artifacts import SiteArtifacts
+from images import ImagePipeline
+from frontmatter import MetadataIndex
+from listings import ListingIndex
+from test_images import png_bytes
+from main import generate_page, copy_static_to_public, generate_pages_recursive, build_incremental, generate_pages
+from testutil import write_file
+
+TEMPLATE = '<html><title>{{ Title }}</title><link href="/index.css"><body>{{ Content }}</body></html>'
+
+def snapshot(dir_path):
+    files = {}
+    for root, dirs, filenames in os.walk(dir_path):
+        for name in dirs:
+            files[os.path.relpath(os.path.join(root, name), dir_path) + "/"] = None
+        for name in filenames:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, dir_path)] = f.read()
+    return files
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.static = os.path.join(self.tmp, "static")
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.manifest = os.path.join(self.tmp, ".build", "manifest.json")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "a.png"), "png")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post)")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nSome **text**")
+        write_file(self.template, TEMPLATE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def clean_build(self, basepath="/"):
+        output = os.path.join(self.tmp, "clean")
+        with contextlib.redirect_stdout(io.StringIO()):
+            copy_static_to_public(output, self.static)
+            generate_pages_recursive(self.content, self.template, output, basepath)
+        return snapshot(output)
+
+    def incremental_build(self, basepath="/"):
+        output = os.path.join(self.tmp, "docs")
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            build_incremental(self.static, self.content, self.template, output, basepath, self.manifest)
+        return snapshot(output), log.getvalue()
+
+    def test_first_build_matches_clean_build(self):
+        output, log = self.incremental_build()
+        self.assertIn("full build", log)
+        self.assertEqual(output, self.clean_build())
+
+    def test_no_changes_renders_nothing(self):
+        self.incremental_build()
+        output, log = self.incremental_build()
+        self.assertIn("0 page(s) rendered, 0 written, 0 static file(s) copied", log)
+        self.assertEqual(output, self.clean_build())
+
+    def test_changed_page_only(self):
+        self.incremental_build()
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nFixed typo")
+        output, log = self.incremental_build()
+        self.assertIn("1 page(s) rendered, 1 written, 0 static file(s) copied", log)
+        self.assertEqual(output, self.clean_build())
+
+    def test_template_change_renders_all(self):
+        self.incremental_build()
+        write_file(self.template, TEMPLATE.replace("<body>", "<body class='x'>"))
+        output, log = self.incremental_build()
+        self.assertIn("2 page(s) rendered", log)
+        self.assertEqual(output, self.clean_build())
+
+    def test_basepath_change_renders_all(self):
+        self.incremental_build()
+        output, log = self.incremental_build("/StaticSite/")
+        self.assertIn("2 page(s) rendered", log)
+        self.assertEqual(output, self.clean_build("/StaticSite/"))
+
+    def test_removed_sources_are_deleted(self):
+        self.incremental_build()
+        shutil.rmtree(os.path.join(self.content, "blog"))
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        output, log = self.incremental_build()
+        self.assertNotIn("blog/post/index.html", output)
+        self.assertEqual(output, self.clean_build())
+
+    def test_rebuild_reasons(self):
+        self.incremental_build()
+        output = os.path.join(self.tmp, "docs")
+        write_file(os.path.join(self.content, "contact.md"), "# Contact")
+        with contextlib.redirect_stdout(io.StringIO()):
+            rebuilt = build_incremental(self.static, self.content, self.template, output, "/base/", self.manifest)
+        self.assertEqual(rebuilt, {
+            "blog/post/index.html": ["basepath changed"],
+            "contact.html": ["new page"],
+            "index.html": ["basepath changed"],
+        })
+
+    def test_partial_change_renders_dependent_pages_only(self):
+        write_file(os.path.join(self.tmp, "footer.html"), "<footer>v1</footer>")
+        write_file(self.template, TEMPLATE.replace("</body>", "{{> footer.html }}</body>"))
+        write_file(os.path.join(self.tmp, "post.html"), "<article>{{ Title }}{{ Content }}</article>")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "---\ntemplate: post.html\n---\n# Post")
+        self.incremental_build()
+
+        write_file(os.path.join(self.tmp, "footer.html"), "<footer>v2</footer>")
+        output, log = self.incremental_build()
+        self.assertIn(f"{os.path.join(self.tmp, 'footer.html')} changed", log)
+        self.assertIn("1 page(s) rendered", log)
+        self.assertIn(b"<footer>v2</footer>", output["index.html"])
+        self.assertEqual(output[os.path.join("blog", "post", "index.html")], b"<article>Post<div><h1>Post</h1></div></article>")
+
+        write_file(os.path.join(self.tmp, "post.html"), "<main>{{ Title }}</main>")
+        output, log = self.incremental_build()
+        self.assertIn("1 page(s) rendered", log)
+        self.assertEqual(output[os.path.join("blog", "post", "index.html")], b"<main>Post</main>")
+        self.assertEqual(output, self.clean_build())
+
+    def test_parallel_and_pipelined_builds_record_dependencies(self):
+        output = os.path.join(self.tmp, "docs")
+        for kwargs in ({"jobs": 2}, {"pipeline": True}):
+            shutil.rmtree(os.path.join(self.tmp, ".build"), ignore_errors=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_incremental(self.static, self.content, self.template, output, "/", self.manifest, **kwargs)
+                write_file(os.path.join(self.content, "index.md"), f"# Home\n\nchanged for {kwargs}")
+                rebuilt = build_incremental(self.static, self.content, self.template, output, "/", self.manifest,
+                                            **kwargs)
+            self.assertEqual(rebuilt, {"index.html": [f"{os.path.join(self.content, 'index.md')} changed"]})
+
+    def test_changed_static_file(self):
+        self.incremental_build()
+        write_file(os.path.join(self.static, "index.css"), "body { color: red }")
+        output, log = self.incremental_build()
+        self.assertIn("0 page(s) rendered, 0 written, 1 static file(s) copied", log)
+        self.assertEqual(output, self.clean_build())
+
+class TestOutputIndexBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.template = os.path.join(self.tmp, "template.html")
+        self.page = os.path.join(self.tmp, "index.md")
+        self.dest = os.path.join(self.tmp, "index.html")
+        write_file(self.template, TEMPLATE)
+        write_file(self.page, "# Home\n\nSome **text**")
+        self.outputs = OutputIndex(os.path.join(self.tmp, "outputs.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def render(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_page(self.page, self.template, self.dest, context=BuildContext(outputs=self.outputs))
+
+    def test_identical_output_is_not_rewritten(self):
+        self.assertTrue(self.render())
+        os.utime(self.dest, ns=(10**9, 10**9))
+        self.outputs.record(self.dest, self.outputs.entries[self.dest][0])
+        self.assertFalse(self.render())
+        self.assertEqual(os.stat(self.dest).st_mtime_ns, 10**9)
+        self.assertFalse(os.path.exists(self.dest + ".tmp"))
+
+    def test_changed_output_is_written(self):
+        self.render()
+        write_file(self.page, "# Home\n\nOther text")
+        self.assertTrue(self.render())
+        with open(self.dest, 'r') as f:
+            self.assertIn("Other text", f.read())
+
+    def test_externally_modified_output_is_rewritten(self):
+        self.render()
+        write_file(self.dest, "tampered")
+        self.assertTrue(self.render())
+        with open(self.dest, 'r') as f:
+            self.assertIn("<b>text</b>", f.read())
+
+    def test_default_build_syncs_in_place(self):
+        self.assertFalse(main.parse_args([]).clean)
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main.parse_args(["--sync", "--clean"])
+
+        static = os.path.join(self.tmp, "static")
+        content = os.path.join(self.tmp, "content")
+        output = os.path.join(self.tmp, "docs")
+        write_file(os.path.join(static, "index.css"), "body {}")
+        write_file(os.path.join(content, "index.md"), "# Home")
+        written = []
+        for _ in range(2):
+            # What main() does without --clean
+            with contextlib.redirect_stdout(io.StringIO()):
+                main.sync_static_to_public(output, static, content)
+                written.append(generate_pages_recursive(content, self.template, output,
+                                                                context=BuildContext(outputs=self.outputs)))
+        self.assertEqual(written, [1, 0])
+
+    def test_parallel_build_updates_index(self):
+        pages = [(self.page, self.dest)]
+        other = os.path.join(self.tmp, "other.md")
+        write_file(other, "# Other")
+        pages.append((other, os.path.join(self.tmp, "other.html")))
+        with contextlib.redirect_stdout(io.StringIO()):
+            context = BuildContext(outputs=self.outputs)
+            self.assertEqual(generate_pages(pages, self.template, jobs=2, context=context), 2)
+            self.assertEqual(generate_pages(pages, self.template, jobs=2, context=context), 0)
+        self.assertEqual(sorted(self.outputs.entries), sorted(dest for _, dest in pages))
+
+class TestPipelinedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        write_file(self.template, TEMPLATE)
+        for i in range(5):
+            write_file(os.path.join(self.content, "blog", f"post{i}", "index.md"), f"# Post {i}\n\n**body** {i}")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post0)")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def build(self, name, pipeline, cache=None, outputs=None):
+        output = os.path.join(self.tmp, name)
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            generate_pages_recursive(self.content, self.template, output, "/base/",
+                                     context=BuildContext(cache=cache, outputs=outputs), pipeline=pipeline)
+        return snapshot(output), log.getvalue()
+
+    def test_pipelined_matches_serial(self):
+        serial, _ = self.build("serial", False)
+        pipelined, log = self.build("pipelined", True)
+        self.assertEqual(serial, pipelined)
+        self.assertEqual(log.count("Page generated successfully"), 6)
+
+    def test_pipelined_with_cache_and_outputs(self):
+        serial, _ = self.build("serial", False)
+        cache = RenderCache(os.path.join(self.tmp, "cache"))
+        outputs = OutputIndex(os.path.join(self.tmp, "outputs.json"))
+        self.build("pipelined", True, cache, outputs)
+        pipelined, log = self.build("pipelined", True, cache, outputs)
+        self.assertEqual(serial, pipelined)
+        self.assertEqual(log.count("Page unchanged"), 6)
+
+    def test_pipelined_streams_large_pages(self):
+        serial, _ = self.build("serial", False)
+        threshold = main.STREAM_THRESHOLD
+        main.STREAM_THRESHOLD = 0
+        try:
+            pipelined, _ = self.build("pipelined", True)
+        finally:
+            main.STREAM_THRESHOLD = threshold
+        self.assertEqual(serial, pipelined)
+
+    def test_pipelined_fills_front_matter_slots(self):
+        write_file(self.template, '<html><title>{{ Title }} - {{ site }}</title><body>{{ Content }}</body></html>')
+        for i in range(2):
+            write_file(os.path.join(self.content, "blog", f"post{i}", "index.md"),
+                       f"---\nsite: Middle Earth\n---\n# Post {i}")
+        serial, _ = self.build("serial", False)
+        pipelined, _ = self.build("pipelined", True)
+        self.assertEqual(serial, pipelined)
+        self.assertIn(b"- Middle Earth</title>", pipelined[os.path.join("blog", "post0", "index.html")])
+
+    def test_pipelined_reports_all_failures(self):
+        write_file(os.path.join(self.content, "blog", "post1", "index.md"), "no title")
+        write_file(os.path.join(self.content, "blog", "post3", "index.md"), "no title either")
+        with self.assertRaises(RuntimeError) as cm:
+            self.build("pipelined", True)
+        self.assertIn("2 page(s) failed", str(cm.exception))
+        self.assertIn("post1", str(cm.exception))
+        self.assertIn("post3", str(cm.exception))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "pipelined", "blog", "post4", "index.html")))
+
+class TestSiteArtifactsBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.static = os.path.join(self.tmp, "static")
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(self.template, TEMPLATE)
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome **home**")
+        for i in range(3):
+            write_file(os.path.join(self.content, "blog", f"post{i}", "index.md"), f"# Post {i}\n\nText of post {i}")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def collect(self, name, **kwargs):
+        artifacts = SiteArtifacts(os.path.join(self.tmp, name))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, artifacts.output_dir,
+                                     context=BuildContext(artifacts=artifacts), **kwargs)
+        return artifacts
+
+    def test_pages_are_collected_in_every_build_mode(self):
+        serial = self.collect("serial")
+        self.assertEqual(serial.pages["index.html"], {"title": "Home", "text": "Home Welcome home"})
+        self.assertEqual(serial.pages["blog/post1/index.html"]["text"], "Post 1 Text of post 1")
+        self.assertEqual(self.collect("parallel", jobs=2).pages, serial.pages)
+        self.assertEqual(self.collect("pipelined", pipeline=True).pages, serial.pages)
+
+    def test_collecting_does_not_change_output(self):
+        self.collect("with")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, os.path.join(self.tmp, "without"))
+        self.assertEqual(snapshot(os.path.join(self.tmp, "with")), snapshot(os.path.join(self.tmp, "without")))
+
+    def test_incremental_build_collects_missing_pages(self):
+        output = os.path.join(self.tmp, "docs")
+        manifest = os.path.join(self.tmp, "manifest.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_incremental(self.static, self.content, self.template, output, "/", manifest)
+            artifacts = SiteArtifacts(output)
+            build_incremental(self.static, self.content, self.template, output, "/", manifest,
+                              context=BuildContext(artifacts=artifacts))
+        self.assertEqual(len(artifacts.pages), 4)
+
+class TestListingsBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.output = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        write_file(self.template, TEMPLATE)
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        for i in range(3):
+            self.write_post(i)
+        self.metadata_path = os.path.join(self.tmp, "metadata.json")
+        self.listings = ListingIndex(os.path.join(self.tmp, "listings.json"))
+        self.artifacts = SiteArtifacts(self.output)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_post(self, i, tags="[lore]"):
+        write_file(os.path.join(self.content, "blog", f"post{i}", "index.md"),
+                   f"---\ndate: 2024-01-0{i + 1}\ntags: {tags}\n---\n# Post {i}\n\nText of post {i}")
+
+    def build(self, basepath="/"):
+        metadata = MetadataIndex.load(self.content, self.metadata_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.output, basepath,
+                                     context=BuildContext(artifacts=self.artifacts))
+            result = main.generate_listings(metadata, self.artifacts, self.listings, self.template, self.output, basepath,
+                                            self.content, page_size=2)
+        metadata.save()
+        return result
+
+    def read(self, rel):
+        with open(os.path.join(self.output, rel), 'r') as f:
+            return f.read()
+
+    def test_listing_pages(self):
+        self.assertEqual(self.build("/base/"), (5, 0))
+        first = self.read("blog/index.html")
+        self.assertIn("<title>Blog</title>", first)
+        self.assertLess(first.index("Post 2"), first.index("Post 1"))
+        self.assertIn('<a href="/base/blog/post2/">Post 2</a>', first)
+        self.assertIn("<p>Text of post 2</p>", first)
+        self.assertIn('href="/base/blog/page/2/" rel="next"', first)
+        self.assertIn("Post 0", self.read("blog/page/2/index.html"))
+        self.assertIn("3 post(s)", self.read("tags/index.html"))
+
+    def test_unchanged_listings_are_not_rendered(self):
+        self.build()
+        self.assertEqual(self.build(), (0, 5))
+
+    def test_listing_pages_are_site_artifacts(self):
+        self.build()
+        sitemap = self.artifacts.sitemap("https://x.io")
+        self.assertIn("<loc>https://x.io/blog/</loc>", sitemap)
+        self.assertIn("<loc>https://x.io/blog/page/2/</loc>", sitemap)
+        self.assertIn("<loc>https://x.io/tags/lore/</loc>", sitemap)
+        self.assertIn({"url": "/blog/", "title": "Blog", "text": self.artifacts.pages["blog/index.html"]["text"]},
+                      self.artifacts.search_index())
+        self.assertIn("Post 2", self.artifacts.pages["blog/index.html"]["text"])
+        self.assertNotIn("/blog/page/2/", self.artifacts.feed("https://x.io"))
+
+        # Listings missing from the artifacts are rendered again even when unchanged
+        del self.artifacts.pages["tags/index.html"]
+        self.assertEqual(self.build(), (1, 4))
+        self.assertIn("tags/index.html", self.artifacts.pages)
+
+    def test_changed_metadata_renders_affected_listings(self):
+        self.build()
+        self.write_post(0, "[lore, elves]")
+        written, unchanged = self.build()
+        # Only the second page of each listing shows the post; the tag index and new tag page change too
+        self.assertEqual((written, unchanged), (4, 2))
+        self.assertIn("Post 0", self.read("tags/elves/index.html"))
+
+    def test_stale_listings_are_removed(self):
+        self.build()
+        shutil.rmtree(os.path.join(self.content, "blog", "post0"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.output, "blog", "page")))
+
+    def test_generated_listings_resolve_links(self):
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog/)")
+        self.build()
+        links = LinkIndex()
+        static = os.path.join(self.tmp, "static")
+        os.makedirs(static)
+        self.assertEqual(main.check_links(links, static, self.content, strict=True, generated=self.listings.pages), [])
+
+class TestImagesBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.static = os.path.join(self.tmp, "static")
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.output = os.path.join(self.tmp, "docs")
+        self.manifest = os.path.join(self.tmp, "manifest.json")
+        self.cache_dir = os.path.join(self.tmp, "images")
+        write_file(self.template, TEMPLATE)
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n![dot](/images/dot.png)")
+        write_file(os.path.join(self.content, "other.md"), "# Other")
+        self.write_image(8, 4)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_image(self, width, height):
+        os.makedirs(os.path.join(self.static, "images"), exist_ok=True)
+        with open(os.path.join(self.static, "images", "dot.png"), 'wb') as f:
+            f.write(png_bytes(width, height))
+
+    def build(self):
+        images = ImagePipeline.load(self.cache_dir, "/base/")
+        images.process(self.static)
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            build_incremental(self.static, self.content, self.template, self.output, "/base/", self.manifest,
+                              context=BuildContext(images=images))
+        with open(os.path.join(self.output, "index.html"), 'r') as f:
+            return f.read(), log.getvalue()
+
+    def test_img_tags_get_dimensions(self):
+        html, log = self.build()
+        self.assertIn('<img src="/base/images/dot.png" width="8" height="4" alt="dot">', html)
+
+    def test_changed_image_re_renders_pages_using_it(self):
+        self.build()
+        html, log = self.build()
+        self.assertIn("0 page(s) rendered", log)
+        self.write_image(6, 6)
+        html, log = self.build()
+        self.assertIn("1 page(s) rendered", log)
+        self.assertIn(f"Rebuilding {os.path.join(self.output, 'index.html')}: image:images/dot.png changed", log)
+        self.assertIn('width="6" height="6"', html)
+
+class TestCheckLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.static = os.path.join(self.tmp, "static")
+        self.content = os.path.join(self.tmp, "content")
+        write_file(os.path.join(self.static, "images", "a.png"), "png")
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post) ![a](/images/a.png)")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\n![b](/images/b.png)")
+        self.links = LinkIndex(os.path.join(self.tmp, "links.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_warns_about_broken_links(self):
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            broken = main.check_links(self.links, self.static, self.content)
+        self.assertEqual(broken, [(os.path.join("blog", "post", "index.md"), "image", "/images/b.png")])
+        self.assertIn("missing image /images/b.png", log.getvalue())
+        self.assertTrue(os.path.exists(self.links.path))
+
+    def test_strict_fails_the_build(self):
+        with self.assertRaises(RuntimeError) as cm:
+            main.check_links(self.links, self.static, self.content, strict=True)
+        self.assertIn("1 broken link(s)", str(cm.exception))
+
+    def test_rendered_pages_are_not_read_again(self):
+        output = os.path.join(self.tmp, "docs")
+        template = os.path.join(self.tmp, "template.html")
+        write_file(template, TEMPLATE)
+        for jobs, pipeline in ((1, False), (2, False), (1, True)):
+            links = LinkIndex(os.path.join(self.tmp, "links.json"), content_dir=self.content, output_dir=output)
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_recursive(self.content, template, output, "/base/", jobs, BuildContext(links=links),
+                                         pipeline)
+            self.assertEqual(links.pages["index.md"]["links"], [["/blog/post", None]])
+            self.assertEqual(links.refresh(self.content, {rel: main.page_output_path(rel) for rel in links.pages}), 0)
+            with contextlib.redirect_stdout(io.StringIO()):
+                broken = main.check_links(links, self.static, self.content)
+            self.assertEqual(broken, [(os.path.join("blog", "post", "index.md"), "image", "/images/b.png")])
+
+    def test_no_broken_links(self):
+        write_file(os.path.join(self.static, "images", "b.png"), "png")
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            self.assertEqual(main.check_links(self.links, self.static, self.content, strict=True), [])
+        self.assertEqual(log.getvalue(), "")
+
+class TestRenderCacheBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.template = os.path.join(self.tmp, "template.html")
+        self.page = os.path.join(self.tmp, "index.md")
+        write_file(self.template, TEMPLATE)
+        write_file(self.page, "# Home\n\n[link](/x) and **bold**")
+        self.cache = RenderCache(os.path.join(self.tmp, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def page_markdown(self):
+        with open(self.page, 'r') as f:
+            return f.read()
+
+    def render(self, name, cache, basepath="/"):
+        dest = os.path.join(self.tmp, name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_page(self.page, self.template, dest, basepath, BuildContext(cache=cache))
+        with open(dest, 'r') as f:
+            return f.read()
+
+    def test_cached_render_matches_uncached(self):
+        expected = self.render("plain.html", None, "/base/")
+        self.assertEqual(self.render("miss.html", self.cache, "/base/"), expected)
+        self.assertEqual(self.render("hit.html", self.cache, "/base/"), expected)
+
+    def test_large_pages_are_streamed(self):
+        expected = self.render("whole.html", None, "/base/")
+        threshold = main.STREAM_THRESHOLD
+        main.STREAM_THRESHOLD = 0
+        try:
+            self.assertEqual(self.render("streamed.html", self.cache, "/base/"), expected)
+        finally:
+            main.STREAM_THRESHOLD = threshold
+        self.assertIsNone(self.cache.get(self.page_markdown()))
+
+    def test_title_is_escaped(self):
+        write_file(self.page, "# Fish & <Chips>\n\ntext")
+        html = self.render("page.html", self.cache)
+        self.assertIn("<title>Fish &amp; &lt;Chips&gt;</title>", html)
+        self.assertIn("<h1>Fish &amp; &lt;Chips&gt;</h1>", html)
+
+    def test_front_matter_fills_template_slots(self):
+        write_file(self.template, '<title>{{ Title }}</title><time>{{ date }}</time><p>{{ tags }}</p>{{ Content }}')
+        write_file(self.page, "---\ntitle: Fish & Chips\ndate: 2024-05-01\ntags: [a, <b>]\n---\n# Heading\n\ntext")
+        expected = "<title>Fish &amp; Chips</title><time>2024-05-01</time><p>a, &lt;b&gt;</p>"
+        for cache in (None, self.cache, self.cache):
+            html = self.render("page.html", cache)
+            self.assertTrue(html.startswith(expected), html)
+            self.assertIn("<div><h1>Heading</h1><p>text</p></div>", html)
+            self.assertNotIn("2024-05-01</p>", html)
+
+    def test_front_matter_in_attributes(self):
+        write_file(self.template, '<meta name="description" content="{{ description }}">{{ Content }}')
+        write_file(self.page, '---\ndescription: Say "hi" <now>\n---\n# Heading')
+        html = self.render("page.html", None)
+        self.assertTrue(html.startswith('<meta name="description" content="Say &quot;hi&quot; &lt;now&gt;">'), html)
+
+    def test_front_matter_of_streamed_pages(self):
+        write_file(self.page, "---\ndate: 2024-05-01\n---\n# Heading\n\ntext")
+        expected = self.render("whole.html", None)
+        threshold = main.STREAM_THRESHOLD
+        main.STREAM_THRESHOLD = 0
+        try:
+            self.assertEqual(self.render("streamed.html", None), expected)
+        finally:
+            main.STREAM_THRESHOLD = threshold
+        self.assertIn("<title>Heading</title>", expected)
+        self.assertNotIn("date", expected)
+
+    def test_cache_hit_skips_parsing(self):
+        self.render("miss.html", self.cache)
+        self.cache.put(self.page_markdown(), "Cached", "<div>from cache</div>")
+        self.assertIn("<title>Cached</title>", self.render("hit.html", self.cache))
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        write_file(self.template, TEMPLATE)
+        for i in range(6):
+            write_file(os.path.join(self.content, "blog", f"post{i}", "index.md"), f"# Post {i}\n\n_body_ {i}")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        os.makedirs(os.path.join(self.content, "empty"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def build(self, name, jobs):
+        output = os.path.join(self.tmp, name)
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            generate_pages_recursive(self.content, self.template, output, "/", jobs)
+        return snapshot(output), log.getvalue()
+
+    def test_parallel_matches_serial(self):
+        serial, _ = self.build("serial", 1)
+        parallel, _ = self.build("parallel", 3)
+        self.assertEqual(serial, parallel)
+
+    def test_parallel_log_order_is_deterministic(self):
+        _, first = self.build("first", 3)
+        _, second = self.build("second", 4)
+        self.assertEqual(first.replace("first", ""), second.replace("second", ""))
+
+    def test_parallel_reports_all_failures(self):
+        write_file(os.path.join(self.content, "broken1.md"), "no title")
+        write_file(os.path.join(self.content, "broken2.md"), "still no title")
+        with self.assertRaises(RuntimeError) as cm:
+            self.build("parallel", 2)
+        message = str(cm.exception)
+        self.assertIn("2 page(s) failed", message)
+        self.assertIn("broken1.md", message)
+        self.assertIn("broken2.md", message)
+
+    def test_parallel_with_cache(self):
+        serial, _ = self.build("serial", 1)
+        cache = RenderCache(os.path.join(self.tmp, "cache"))
+        for name in ["cold", "warm"]:
+            output = os.path.join(self.tmp, name)
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_recursive(self.content, self.template, output, "/", 3, BuildContext(cache=cache))
+            self.assertEqual(snapshot(output), serial)
+
+    def test_parallel_profile_collects_worker_events(self):
+        prof = profiler.enable()
+        try:
+            self.build("profiled", 3)
+        finally:
+            profiler.disable()
+        pages = prof.page_totals()
+        self.assertEqual(len(pages), 7)
+        self.assertTrue(all(calls > 0 and nbytes > 0 for calls, seconds, nbytes in pages.values()))
+        self.assertEqual(prof.stage_totals()["parse"][0], 7)
+        # No cache is active, so there is no cache stage to report
+        self.assertNotIn("cache", prof.stage_totals())
+
+    def test_generate_pages_empty(self):
+        generate_pages([], self.template, "/", 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from manifest import hash_file, hash_text, load_json, new_manifest, load_manifest, save_json, save_manifest
+
+class TestManifest(unittest.TestCase):
+    def test_hash_file_matches_hash_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, 'w') as f:
+                f.write("# Hello")
+            self.assertEqual(hash_file(path), hash_text("# Hello"))
+
+    def test_hash_text_differs(self):
+        self.assertNotEqual(hash_text("a"), hash_text("b"))
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "nested", "manifest.json")
+            manifest = new_manifest("/")
+            manifest["pages"]["index.md"] = "123"
+            save_manifest(manifest, path)
+            self.assertEqual(load_manifest(path), manifest)
+
+    def test_load_missing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(load_manifest(os.path.join(tmp, "missing.json")))
+
+    def test_load_corrupt(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            with open(path, 'w') as f:
+                f.write("{not json")
+            self.assertIsNone(load_manifest(path))
+
+    def test_load_wrong_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            manifest = new_manifest("/")
+            manifest["version"] = -1
+            save_manifest(manifest, path)
+            self.assertIsNone(load_manifest(path))
+
+    def test_json_round_trip_and_fallback(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "nested", "index.json")
+            self.assertEqual(load_json(path, {}), {})
+            save_json({"a": [1, 2]}, path)
+            self.assertEqual(load_json(path, {}), {"a": [1, 2]})
+            self.assertEqual(load_json(path, []), [])
+            self.assertFalse(os.path.exists(path + ".tmp"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import io
+import os
+import tempfile
+import unittest
+from manifest import hash_text
+from outputs import HashingWriter, OutputIndex
+
+class TestHashingWriter(unittest.TestCase):
+    def test_hashes_what_is_written(self):
+        out = io.StringIO()
+        writer = HashingWriter(out)
+        writer.write("<p>caf")
+        writer.write("é</p>")
+        self.assertEqual(out.getvalue(), "<p>café</p>")
+        self.assertEqual(writer.hexdigest(), hash_text("<p>café</p>"))
+
+class TestOutputIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, ".build", "outputs.json")
+        self.dest = os.path.join(self.tmp.name, "index.html")
+        with open(self.dest, 'w') as f:
+            f.write("<p>hi</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_recorded_output_is_unchanged(self):
+        index = OutputIndex(self.path)
+        index.record(self.dest, hash_text("<p>hi</p>"))
+        self.assertTrue(index.is_unchanged(self.dest, hash_text("<p>hi</p>")))
+        self.assertFalse(index.is_unchanged(self.dest, hash_text("<p>bye</p>")))
+
+    def test_touched_or_missing_output_is_changed(self):
+        index = OutputIndex(self.path)
+        index.record(self.dest, hash_text("<p>hi</p>"))
+        os.utime(self.dest, ns=(1, 1))
+        self.assertFalse(index.is_unchanged(self.dest, hash_text("<p>hi</p>")))
+        os.remove(self.dest)
+        self.assertFalse(index.is_unchanged(self.dest, hash_text("<p>hi</p>")))
+
+    def test_save_and_load(self):
+        index = OutputIndex(self.path)
+        index.record(self.dest, hash_text("<p>hi</p>"))
+        index.save()
+        loaded = OutputIndex.load(self.path)
+        self.assertEqual(loaded.entries, index.entries)
+        self.assertTrue(loaded.is_unchanged(self.dest, hash_text("<p>hi</p>")))
+
+    def test_corrupt_index_loads_empty(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write("[")
+        self.assertEqual(OutputIndex.load(self.path).entries, {})
+
+    def test_subset(self):
+        index = OutputIndex(self.path)
+        index.record(self.dest, hash_text("<p>hi</p>"))
+        subset = index.subset([self.dest, "missing.html"])
+        self.assertIsNone(subset.path)
+        self.assertEqual(subset.entries, index.entries)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 from htmlnode import ParentNode, LeafNode
 
@@ -98,6 +99,33 @@ class TestParentNode(unittest.TestCase):
             parent.to_html(),
             "<section><div><span>nested</span></div><p>paragraph</p></section>",
         )
+    
+    def test_write_to_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")]),
+                LeafNode("a", "link", {"href": "/x"}),
+            ],
+            {"class": "outer"},
+        )
+        out = io.StringIO()
+        node.write_to(out)
+        self.assertEqual(out.getvalue(), node.to_html())
+    
+    def test_write_to_streams_fragments(self):
+        fragments = []
+        
+        class Collector:
+            def write(self, text):
+                fragments.append(text)
+        
+        ParentNode("p", [LeafNode("b", "x"), LeafNode(None, "y")]).write_to(Collector())
+        self.assertEqual(fragments, ["<p>", "<b>x</b>", "y", "</p>"])
+    
+    def test_write_to_no_children(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", None).write_to(io.StringIO())
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+import threading
+import unittest
+from pipeline import run_pipeline
+
+class TestRunPipeline(unittest.TestCase):
+    def test_items_flow_through_all_stages_in_order(self):
+        written = []
+        results = run_pipeline(
+            range(20),
+            lambda item: item * 2,
+            lambda item, data: data + 1,
+            lambda item, rendered: written.append(rendered) or rendered,
+            depth=2,
+        )
+        self.assertEqual(written, [item * 2 + 1 for item in range(20)])
+        self.assertEqual([item for item, result, error in results], list(range(20)))
+        self.assertTrue(all(error is None for item, result, error in results))
+
+    def test_stages_run_on_separate_threads(self):
+        threads = {}
+        def record(stage):
+            # Thread objects, not idents: a finished thread's ident can be reused by the next one
+            threads[stage] = threading.current_thread()
+        run_pipeline([1], lambda item: record("read"), lambda item, data: record("render"),
+                     lambda item, rendered: record("write"))
+        self.assertIs(threads["render"], threading.current_thread())
+        self.assertEqual(threads["read"].name, "pipeline-reader")
+        self.assertEqual(threads["write"].name, "pipeline-writer")
+
+    def test_failures_only_affect_their_item(self):
+        def read(item):
+            if item == 1:
+                raise OSError("unreadable")
+            return item
+        def render(item, data):
+            if item == 2:
+                raise ValueError("bad markdown")
+            return data
+        written = []
+        results = run_pipeline(range(4), read, render, lambda item, rendered: written.append(item))
+        self.assertEqual(written, [0, 3])
+        errors = {item: type(error) for item, result, error in results if error is not None}
+        self.assertEqual(errors, {1: OSError, 2: ValueError})
+
+    def test_reader_stays_within_queue_bound(self):
+        read = []
+        rendered = []
+        def render(item, data):
+            # Items read but not yet rendered never exceed the queue depth plus the one in hand
+            self.assertLessEqual(len(read) - len(rendered), 3)
+            rendered.append(item)
+        run_pipeline(range(50), read.append, render, lambda item, data: None, depth=2)
+        self.assertEqual(len(rendered), 50)
+
+    def test_interrupt_in_render_stops_pipeline(self):
+        def render(item, data):
+            if item == 3:
+                raise KeyboardInterrupt
+        written = []
+        with self.assertRaises(KeyboardInterrupt):
+            run_pipeline(range(100), lambda item: item, render, lambda item, data: written.append(item), depth=2)
+        self.assertLessEqual(len(written), 3)
+
+if __name__ == "__main__":
+    unittest.main()
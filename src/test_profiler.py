@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import unittest
+import profiler
+from profiler import Profiler
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self):
+        profiler.disable()
+
+    def test_stage_records_bytes_and_page(self):
+        prof = Profiler()
+        with prof.stage("parse", "a.md") as record:
+            record["bytes"] = 42
+        self.assertEqual(len(prof.events), 1)
+        self.assertEqual(prof.events[0]["name"], "parse")
+        self.assertEqual(prof.events[0]["page"], "a.md")
+        self.assertEqual(prof.events[0]["bytes"], 42)
+
+    def test_stage_totals(self):
+        prof = Profiler()
+        for nbytes in [10, 20]:
+            with prof.stage("read", "a.md") as record:
+                record["bytes"] = nbytes
+        calls, seconds, nbytes = prof.stage_totals()["read"]
+        self.assertEqual((calls, nbytes), (2, 30))
+
+    def test_page_totals(self):
+        prof = Profiler()
+        for name, nbytes in [("read", 10), ("parse", 10), ("write", 25)]:
+            with prof.stage(name, "a.md") as record:
+                record["bytes"] = nbytes
+        with prof.stage("links"):
+            pass
+        calls, seconds, nbytes = prof.page_totals()["a.md"]
+        self.assertEqual((calls, nbytes), (3, 45))
+        self.assertEqual(list(prof.page_totals()), ["a.md"])
+
+    def test_report_lists_slowest_pages_first(self):
+        prof = Profiler()
+        for page, duration in [("fast.md", 0.001), ("slow.md", 0.5), ("mid.md", 0.1)]:
+            prof.events.append({"name": "parse", "page": page, "start": 0.0,
+                                "duration": duration, "bytes": 2_000_000, "pid": 1})
+        report = prof.report(top=2)
+        self.assertIn("      1     500.00     2.000  slow.md", report)
+        self.assertIn("Top 2 slowest pages", report)
+        self.assertLess(report.index("slow.md"), report.index("mid.md"))
+        self.assertNotIn("fast.md", report)
+
+    def test_chrome_trace(self):
+        prof = Profiler()
+        with prof.stage("render", "a.md"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            prof.write_chrome_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+        event = trace["traceEvents"][0]
+        self.assertEqual((event["name"], event["ph"], event["args"]["page"]), ("render", "X", "a.md"))
+
+    def test_module_stage_is_noop_when_disabled(self):
+        with profiler.stage("parse") as record:
+            record["bytes"] = 1
+        self.assertFalse(profiler.enabled())
+
+    def test_enable_and_disable(self):
+        prof = profiler.enable()
+        with profiler.stage("parse"):
+            pass
+        self.assertIs(profiler.disable(), prof)
+        self.assertEqual(len(prof.events), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.request
+from context import BuildContext
+from deps import DependencyGraph
+from main import generate_pages_recursive
+from serve import (ReloadBroadcaster, RELOAD_SCRIPT, diff_snapshots, rebuild_changes,
+                   snapshot_paths, start_server, watched_paths)
+from testutil import write_file
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+class TestWatchRebuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.static = os.path.join(self.tmp, "static")
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.output = os.path.join(self.tmp, "docs")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post")
+        write_file(self.template, TEMPLATE)
+        self.sources = [self.static, self.content, self.template]
+        self.deps = DependencyGraph(self.output)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def rebuild(self, changed, removed):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return rebuild_changes(changed, removed, self.static, self.content,
+                                   self.template, self.output, self.deps)
+
+    def build(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.output, context=BuildContext(deps=self.deps))
+
+    def test_diff_snapshots(self):
+        before = snapshot_paths(self.sources)
+        write_file(os.path.join(self.content, "index.md"), "# Home page")
+        os.remove(os.path.join(self.static, "index.css"))
+        changed, removed = diff_snapshots(before, snapshot_paths(self.sources))
+        self.assertEqual(changed, {os.path.join(self.content, "index.md")})
+        self.assertEqual(removed, {os.path.join(self.static, "index.css")})
+
+    def test_changed_page_renders_only_that_page(self):
+        touched = self.rebuild({os.path.join(self.content, "blog", "post", "index.md")}, set())
+        self.assertEqual(touched, [os.path.join("blog", "post", "index.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "index.html")))
+
+    def test_template_change_renders_all_pages(self):
+        self.build()
+        touched = self.rebuild({self.template}, set())
+        self.assertEqual(touched, [os.path.join("blog", "post", "index.html"), "index.html"])
+
+    def test_partial_change_renders_dependent_pages_only(self):
+        footer = os.path.join(self.tmp, "footer.html")
+        post_template = os.path.join(self.tmp, "post.html")
+        write_file(footer, "<footer>v1</footer>")
+        write_file(post_template, "<article>{{ Content }}{{> footer.html }}</article>")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "---\ntemplate: post.html\n---\n# Post")
+        self.build()
+        self.assertEqual(watched_paths(self.static, self.content, self.template, self.deps),
+                         self.sources + sorted([footer, post_template]))
+
+        write_file(footer, "<footer>v2</footer>")
+        touched = self.rebuild({footer}, set())
+        self.assertEqual(touched, [os.path.join("blog", "post", "index.html")])
+        with open(os.path.join(self.output, "blog", "post", "index.html"), 'r') as f:
+            self.assertIn("<footer>v2</footer>", f.read())
+
+        # The page no longer uses the partial once it switches templates
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post")
+        self.rebuild({os.path.join(self.content, "blog", "post", "index.md")}, set())
+        self.assertEqual(self.rebuild({footer}, set()), [])
+        self.assertEqual(watched_paths(self.static, self.content, self.template, self.deps), self.sources)
+
+    def test_static_change_and_removal(self):
+        touched = self.rebuild({os.path.join(self.static, "index.css")}, set())
+        self.assertEqual(touched, ["index.css"])
+        self.assertTrue(os.path.exists(os.path.join(self.output, "index.css")))
+        touched = self.rebuild(set(), {os.path.join(self.static, "index.css")})
+        self.assertEqual(touched, ["index.css"])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "index.css")))
+
+class TestLiveReloadServer(unittest.TestCase):
+    def test_serves_pages_with_reload_script(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_file(os.path.join(tmp, "index.html"), "<html><body>hi</body></html>")
+            server = start_server(tmp, 0, ReloadBroadcaster())
+            try:
+                port = server.server_address[1]
+                with contextlib.redirect_stderr(io.StringIO()):
+                    html = urllib.request.urlopen(f"http://127.0.0.1:{port}/").read().decode()
+            finally:
+                server.shutdown()
+                server.server_close()
+            self.assertEqual(html, "<html><body>hi" + RELOAD_SCRIPT + "</body></html>")
+
+    def test_broadcaster_wakes_waiters(self):
+        broadcaster = ReloadBroadcaster()
+        threading.Timer(0.01, broadcaster.notify).start()
+        self.assertEqual(broadcaster.wait(0, timeout=5), 1)
+
+if __name__ == "__main__":
+    unittest.main()
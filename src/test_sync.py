@@ -0,0 +1,98 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from sync import copy_file, is_up_to_date, sync_directory
+from testutil import write_file
+
+def read_file(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+class TestSyncDirectory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp, "static")
+        self.dst = os.path.join(self.tmp, "docs")
+        write_file(os.path.join(self.src, "index.css"), "body {}")
+        write_file(os.path.join(self.src, "images", "a.png"), "png")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def sync(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sync_directory(self.src, self.dst, **kwargs)
+
+    def test_initial_sync_copies_everything(self):
+        self.assertEqual(self.sync(), (2, 0, 0))
+        self.assertEqual(read_file(os.path.join(self.dst, "images", "a.png")), "png")
+
+    def test_second_sync_copies_nothing(self):
+        self.sync()
+        self.assertEqual(self.sync(), (0, 2, 0))
+
+    def test_changed_file_is_recopied(self):
+        self.sync()
+        write_file(os.path.join(self.src, "index.css"), "body { color: red }")
+        self.assertEqual(self.sync(), (1, 1, 0))
+        self.assertEqual(read_file(os.path.join(self.dst, "index.css")), "body { color: red }")
+
+    def test_same_size_change_detected_by_mtime(self):
+        self.sync()
+        path = os.path.join(self.src, "index.css")
+        write_file(path, "body {!")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.sync(), (1, 1, 0))
+
+    def test_checksum_ignores_mtime_only_changes(self):
+        self.sync()
+        path = os.path.join(self.src, "index.css")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.sync(checksum=True), (0, 2, 0))
+
+    def test_stale_files_removed_but_kept_paths_survive(self):
+        self.sync()
+        write_file(os.path.join(self.dst, "old", "gone.html"), "x")
+        write_file(os.path.join(self.dst, "blog", "post", "index.html"), "page")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        copied, unchanged, removed = self.sync(keep={os.path.join("blog", "post", "index.html")})
+        self.assertEqual(removed, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "old")))
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images", "a.png")))
+        self.assertTrue(os.path.isdir(os.path.join(self.dst, "images")))
+        self.assertEqual(read_file(os.path.join(self.dst, "blog", "post", "index.html")), "page")
+
+    def test_hardlink_mode(self):
+        self.sync(mode="hardlink")
+        self.assertTrue(os.path.samefile(os.path.join(self.src, "index.css"), os.path.join(self.dst, "index.css")))
+        self.assertEqual(self.sync(mode="hardlink"), (0, 2, 0))
+
+    def test_reflink_mode_falls_back_to_copy(self):
+        self.sync(mode="reflink")
+        self.assertEqual(read_file(os.path.join(self.dst, "index.css")), "body {}")
+        self.assertEqual(self.sync(mode="reflink"), (0, 2, 0))
+
+    def test_missing_source(self):
+        with self.assertRaises(ValueError):
+            sync_directory(os.path.join(self.tmp, "missing"), self.dst)
+
+class TestCopyFile(unittest.TestCase):
+    def test_copy_preserves_mtime(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "a.txt")
+            dst = os.path.join(tmp, "b.txt")
+            write_file(src, "hello")
+            copy_file(src, dst)
+            self.assertTrue(is_up_to_date(src, dst))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            copy_file("a", "b", "symlink")
+
+if __name__ == "__main__":
+    unittest.main()
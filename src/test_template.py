@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+import unittest
+from htmlnode import ParentNode, LeafNode
+from template import BasepathWriter, compile_template, load_template
+
+class TestBasepathWriter(unittest.TestCase):
+    def rewrite(self, chunks, basepath="/StaticSite/"):
+        out = io.StringIO()
+        writer = BasepathWriter(out, basepath)
+        for chunk in chunks:
+            writer.write(chunk)
+        writer.flush()
+        return out.getvalue()
+
+    def test_matches_replace_on_whole_document(self):
+        html = '<a href="/blog">x</a><img src="/a.png"><a href="https://x">y</a>'
+        expected = html.replace('href="/', 'href="/StaticSite/').replace('src="/', 'src="/StaticSite/')
+        self.assertEqual(self.rewrite([html]), expected)
+
+    def test_pattern_split_across_writes(self):
+        html = '<a href="/blog">x</a><img src="/a.png">'
+        expected = '<a href="/StaticSite/blog">x</a><img src="/StaticSite/a.png">'
+        for cut in range(len(html) + 1):
+            self.assertEqual(self.rewrite([html[:cut], html[cut:]]), expected)
+
+    def test_one_character_writes(self):
+        self.assertEqual(self.rewrite(list('src="/x" href="')), 'src="/StaticSite/x" href="')
+
+class TestCompiledTemplate(unittest.TestCase):
+    def test_segments_and_slots(self):
+        template = compile_template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.segments, ["<title>", "</title><body>", "</body>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+    
+    def test_render_strings_and_nodes(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}")
+        html = template.render({"Title": "Hi", "Content": ParentNode("p", [LeafNode("b", "x")])})
+        self.assertEqual(html, "<title>Hi</title><p><b>x</b></p>")
+    
+    def test_arbitrary_slots(self):
+        template = compile_template("<p>{{ Author }} on {{Date}}</p>")
+        self.assertEqual(template.render({"Author": "Bilbo", "Date": "today"}), "<p>Bilbo on today</p>")
+    
+    def test_missing_slot_keeps_placeholder(self):
+        template = compile_template("<p>{{ Unknown }}</p>")
+        self.assertEqual(template.render({}), "<p>{{ Unknown }}</p>")
+    
+    def test_basepath_applied_to_template_and_values(self):
+        template_text = '<link href="/index.css"><title>{{ Title }}</title>{{ Content }}'
+        content = ParentNode("p", [LeafNode("a", "home", {"href": "/"}), LeafNode("img", "", {"src": "/a.png"})])
+        html = compile_template(template_text, "/base/").render({"Title": "T", "Content": content})
+        expected = (
+            compile_template(template_text).render({"Title": "T", "Content": content})
+            .replace('href="/', 'href="/base/')
+            .replace('src="/', 'src="/base/')
+        )
+        self.assertEqual(html, expected)
+    
+    def test_load_template_reloads_on_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, 'w') as f:
+                f.write("<p>{{ Title }}</p>")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            with open(path, 'w') as f:
+                f.write("<h1>{{ Title }}</h1>!")
+            self.assertEqual(load_template(path).render({"Title": "x"}), "<h1>x</h1>!")
+
+    def test_includes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "partials"))
+            path = os.path.join(tmp, "template.html")
+            header = os.path.join(tmp, "partials", "header.html")
+            with open(path, 'w') as f:
+                f.write("{{> partials/header.html }}<main>{{ Content }}</main>")
+            with open(header, 'w') as f:
+                f.write('<h1>{{ Title }}</h1><a href="/">home</a>')
+            template = load_template(path, "/base/")
+            self.assertEqual(template.dependencies, [path, header])
+            self.assertEqual(template.render({"Title": "T", "Content": "c"}),
+                             '<h1>T</h1><a href="/base/">home</a><main>c</main>')
+
+            # Changing only the partial reloads the template
+            with open(header, 'w') as f:
+                f.write("<h2>{{ Title }}</h2>!")
+            self.assertEqual(load_template(path, "/base/").render({"Title": "T", "Content": "c"}),
+                             "<h2>T</h2>!<main>c</main>")
+
+    def test_include_cycle(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, 'w') as f:
+                f.write("{{> template.html }}")
+            with self.assertRaises(ValueError):
+                load_template(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,15 @@
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from textnode import TextNode, TextType, text_node_to_html_node, text_to_html
 
 
 class TestTextNode(unittest.TestCase):
+    def test_slotted(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
     def test_eq(self):
         node = TextNode("This is a text node", TextType.BOLD)
         node2 = TextNode("This is a text node", TextType.BOLD)
@@ -83,6 +89,18 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("test", "invalid_type")
         with self.assertRaises(ValueError):
             text_node_to_html_node(node)
+    
+    def test_text_to_html_escapes_like_nodes(self):
+        cases = [
+            TextNode("a < b & c", TextType.TEXT),
+            TextNode("<b>", TextType.BOLD),
+            TextNode("x > y", TextType.CODE),
+            TextNode("Q&A", TextType.LINK, "/faq?a=1&b=2"),
+            TextNode('a "quoted" alt', TextType.IMAGE, "/img.png"),
+        ]
+        for node in cases:
+            self.assertEqual(text_to_html(node.text, node.text_type, node.url), text_node_to_html_node(node).to_html())
+        self.assertEqual(text_to_html("a < b", TextType.TEXT), "a &lt; b")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,8 @@
+# testutil.py
+import os
+
+def write_file(path, content):
+    """Write a text file, creating its directory first."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
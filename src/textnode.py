@@ -1,5 +1,5 @@
 from enum import Enum
-from htmlnode import LeafNode
+from htmlnode import LeafNode, escape_attribute, escape_text
 
 class TextType(Enum):
     TEXT = "text"
@@ -10,6 +10,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+    
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -21,6 +23,29 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
     
+_TEXT_TYPE_TAGS = {
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
+def text_to_html(text, text_type, url=None):
+    """Render a span straight to HTML, exactly as text_node_to_html_node(...).to_html() would."""
+    if text_type == TextType.TEXT:
+        return escape_text(text)
+    
+    tag = _TEXT_TYPE_TAGS.get(text_type)
+    if tag is not None:
+        return f"<{tag}>{escape_text(text)}</{tag}>"
+    
+    if text_type == TextType.LINK:
+        return f'<a href="{escape_attribute(url)}">{escape_text(text)}</a>'
+    
+    if text_type == TextType.IMAGE:
+        return f'<img src="{escape_attribute(url)}" alt="{escape_attribute(text)}"></img>'
+    
+    raise ValueError(f"Invalid text type: {text_type}")
+
 def text_node_to_html_node(text_node):
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text)